@@ -5,7 +5,7 @@ import random
 
 class FinancialAgent:
     def __init__(self, info_api: InfoAPI, llm_model="gemini-3-pro-preview"):
-        self.llm = LLMWrapper(provider="gemini", model=llm_model)
+        self.llm = LLMWrapper(provider="gemini", model=llm_model, label="FinancialAgent")
         self.logger = get_logger("FinancialAgent")
         self.info_api = info_api
 
@@ -34,6 +34,15 @@ class FinancialAgent:
         """
         分析单个物品的价格表现
         """
+        return self.llm.simple_ask(self._item_price_prompt(item_name, current_price, purchase_price))
+
+    async def aanalyze_item_price(self, item_name, current_price, purchase_price):
+        """
+        analyze_item_price 的异步版本, 用于对多个物品并发分析
+        """
+        return await self.llm.asimple_ask(self._item_price_prompt(item_name, current_price, purchase_price))
+
+    def _item_price_prompt(self, item_name, current_price, purchase_price):
         pnl_percent = ((current_price - purchase_price) / purchase_price) * 100
         
         prompt = f"""
@@ -45,4 +54,4 @@ class FinancialAgent:
         
         Is this a good time to take profit or cut loss? Answer in 1 short sentence.
         """
-        return self.llm.simple_ask(prompt)
+        return prompt
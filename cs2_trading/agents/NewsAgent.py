@@ -7,18 +7,11 @@ from cs2_trading.utils.logger import get_logger
 class NewsAgent(AgentBase):
     def __init__(self, client: Optional[Any] = None, llm_model: Optional[str] = None):
         # Explicitly enable search for NewsAgent if using Gemini
+        llm_kwargs = {}
         if llm_model and "gemini" in llm_model.lower():
-             # We need to hack this a bit because AgentBase calls get_llm internally
-             # Ideally AgentBase should accept kwargs to pass to get_llm
-             pass 
-             
-        super().__init__(client, llm_model)
-        
-        # Post-init configuration for search if needed
-        if self.llm and self.llm.provider == "gemini":
-             # Re-initialize LLMWrapper with search enabled specifically for NewsAgent
-             from cs2_trading.llm.wrapper import LLMWrapper
-             self.llm = LLMWrapper(provider="gemini", model=llm_model, enable_search=True)
+            llm_kwargs["enable_search"] = True
+
+        super().__init__(client, llm_model, llm_kwargs=llm_kwargs)
 
         self.logger = get_logger("NewsAgent")
         # Default sources - can be extended
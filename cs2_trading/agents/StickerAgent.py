@@ -1,6 +1,7 @@
 from cs2_trading.agents.base import AgentBase
 from cs2_trading.data.api import InfoAPI
 from cs2_trading.agents.DataReducingAgent import DataReducingAgent
+from cs2_trading.agents.schemas import FINDER_SCHEMA, parse_json, parse_names
 import re
 from typing import List, Any
 
@@ -89,23 +90,26 @@ class StickerFinder(AgentBase):
     '''
     function: work(news: str) -> list
     '''
-    def __init__(self, client=None, llm_model=None):
-        super().__init__(client, llm_model)
-        # Prefer a very simple, one-item-per-line output to improve robustness.
+    def __init__(self, client=None, llm_model=None, memory_policy="stateless", **memory_kwargs):
+        super().__init__(client, llm_model, memory_policy=memory_policy, **memory_kwargs)
+        # Output is constrained to FINDER_SCHEMA; the line-based parser below only
+        # matters for providers without structured output.
         self.default_system_prompt = (
             "你是一个CS2游戏印花饰品嗅探专家。\n"
             "请从给定的新闻中找出最多 5 个相关的印花饰品名称。\n"
-            "非常重要：只输出名称，每行一个，不要解释、不要编号、不要 JSON，不要其它文本。\n"
+            "非常重要：只返回 JSON {\"names\": [名称, ...]}，不要解释、不要其它文本。\n"
             "注意：只提取印花（Sticker），忽略任何枪械皮肤（Skin）或探员（Agent）。\n"
-            "例如：\nZywOo 上海 全息\n绿龙 金色\n如果没有找到任何印花，请只返回单行 EMPTY。"
+            "例如：{\"names\": [\"ZywOo 上海 全息\", \"绿龙 金色\"]}\n如果没有找到任何印花，请返回 {\"names\": []}。"
         )
         self.add_system_message(self.default_system_prompt)
 
     def work(self, news: str) -> list:
-        prompt = f"请根据下面的新闻找出印花名称，注意只返回每行一个名称（最多5个），否则返回 EMPTY:\n\n{news}\n\n"
-        response = self.get_response(prompt)
+        prompt = f"请根据下面的新闻找出印花名称（最多5个），没有则返回空列表:\n\n{news}\n\n"
+        response = self.get_response(prompt, response_schema=FINDER_SCHEMA)
 
-        names = parse_names_from_response(response, max_items=5)
+        names = parse_names(parse_json(response))
+        if names is None:
+            names = parse_names_from_response(response, max_items=5)
 
         # Treat sentinel replies like 'EMPTY' as no results. Models may return the
         # literal word EMPTY when nothing is found — we must not treat that as a
@@ -125,14 +129,9 @@ class StickerFinder(AgentBase):
                     break
             return out
 
+        # An empty list is a valid structured answer ("no stickers today"), so no re-ask.
         names = _filter_empty_tokens(names)
 
-        # if parsing failed or returned empty, retry once with a stricter reminder
-        if not names:
-            response = self.get_response("你必须严格只返回每行一个名称，最多5个；如果没有则返回 EMPTY。请仅输出结果，不要解释。\n\n" + news)
-            names = parse_names_from_response(response, max_items=5)
-            names = _filter_empty_tokens(names)
-
         print("finder", names)
         return names
 
@@ -1,34 +1,90 @@
+import asyncio
 from typing import Any, Dict, List, Optional
 from pathlib import Path
-from cs2_trading.llm.wrapper import LLMWrapper, get_llm
+from cs2_trading.llm.wrapper import LLMWrapper, get_llm, estimate_tokens
+
+# Memory policies:
+# - "full":         keep every turn (original behaviour)
+# - "stateless":    keep only system messages; every request is independent
+# - "last_n":       keep system messages plus the last `max_turns` user/assistant turns
+# - "token_budget": once the history exceeds `max_prompt_tokens`, summarise it via kill_and_reborn
+MEMORY_POLICIES = ("full", "stateless", "last_n", "token_budget")
+
+DEFAULT_LAST_WORDS_PROMPT = "请你好好总结一下目前所有的分析与决策, 汇总成一段不超过300字的文字并输出, 我要把它交给接替你的智能体."
 
 class AgentBase:
-    def __init__(self, client: Optional[Any] = None, llm_model: Optional[str] = None):
+    def __init__(self, client: Optional[Any] = None, llm_model: Optional[str] = None,
+                 memory_policy: str = "full", max_turns: Optional[int] = None, max_prompt_tokens: Optional[int] = None,
+                 llm_kwargs: Optional[Dict[str, Any]] = None):
         # If client is passed, use it (legacy support). 
         # If not, try to create a wrapper based on llm_model.
         if client:
             self.llm = None # Legacy client handling inside get_response
             self.client = client
         else:
-            self.llm = get_llm(llm_model)
+            self.llm = get_llm(llm_model, label=type(self).__name__, **(llm_kwargs or {}))
             self.client = None
             
         self.llm_model = llm_model
         self.memory: List[Dict[str, str]] = []
         self.last_words: Optional[str] = None
 
+        if memory_policy not in MEMORY_POLICIES:
+            raise ValueError(f"Unknown memory policy: {memory_policy}")
+        if memory_policy == "last_n" and not max_turns:
+            raise ValueError("memory_policy='last_n' requires max_turns")
+        if memory_policy == "token_budget" and not max_prompt_tokens:
+            raise ValueError("memory_policy='token_budget' requires max_prompt_tokens")
+        self.memory_policy = memory_policy
+        self.max_turns = max_turns
+        self.max_prompt_tokens = max_prompt_tokens
+        self.last_words_prompt = DEFAULT_LAST_WORDS_PROMPT
+        self.last_prompt_tokens = 0
+        self._reborning = False
+        self._alock: Optional[asyncio.Lock] = None
+        self._alock_loop = None
+
     def add_system_message(self, message: str) -> None:
         self.memory.append({'role': 'system', 'content': message})
 
-    def get_response(self, user_prompt: str) -> str:
+    def get_response(self, user_prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
         # Prepare messages
         messages = self.memory + [{'role': 'user', 'content': user_prompt}]
-        
+        content = self._call(messages, user_prompt, response_schema)
+        self._remember(user_prompt, content)
+        self._enforce_memory_policy()
+        return content
+
+    async def aget_response(self, user_prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Asyncio variant of `get_response`.
+        Calls on the same agent are serialised: each one sees the memory left by the
+        previous call, so turns are never lost or interleaved. Run several agents
+        (or stateless requests through `LLMWrapper.achat`) for real parallelism.
+        """
+        async with self._async_lock():
+            messages = self.memory + [{'role': 'user', 'content': user_prompt}]
+            content = await self._acall(messages, user_prompt, response_schema)
+            self._remember(user_prompt, content)
+            # A token-budget rollover issues a (blocking) summary call; keep it off the loop.
+            await asyncio.to_thread(self._enforce_memory_policy)
+            return content
+
+    def _async_lock(self) -> asyncio.Lock:
+        # asyncio locks belong to one event loop; make a fresh one per loop (e.g. per asyncio.run).
+        loop = asyncio.get_running_loop()
+        if self._alock is None or self._alock_loop is not loop:
+            self._alock = asyncio.Lock()
+            self._alock_loop = loop
+        return self._alock
+
+    def _call(self, messages: List[Dict[str, str]], user_prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        self.last_prompt_tokens = estimate_tokens(messages)
         content = ""
         
         # New Wrapper Logic
         if self.llm:
-            content = self.llm.chat(messages)
+            content = self.llm.chat(messages, response_schema=response_schema)
             
         # Legacy Logic (keep for backward compatibility if client was passed directly)
         elif self.client:
@@ -46,12 +102,55 @@ class AgentBase:
         else:
             content = f"[no-llm] echo: {user_prompt}"
 
+        return content
+
+    async def _acall(self, messages: List[Dict[str, str]], user_prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        self.last_prompt_tokens = estimate_tokens(messages)
+        if self.llm:
+            return await self.llm.achat(messages, response_schema=response_schema)
+        # Legacy clients are synchronous; keep them off the event loop.
+        return await asyncio.to_thread(self._call, messages, user_prompt)
+
+    def _remember(self, user_prompt: str, content: str) -> None:
+        if self.memory_policy == "stateless" and not self._reborning:
+            return
         self.memory.append({'role': 'user', 'content': user_prompt})
         self.memory.append({'role': 'assistant', 'content': content})
-        return content
+
+    def _enforce_memory_policy(self) -> None:
+        if self.memory_policy == "last_n":
+            system = [m for m in self.memory if m['role'] == 'system']
+            turns = [m for m in self.memory if m['role'] != 'system']
+            self.memory = system + turns[-2 * self.max_turns:]
+        elif self.memory_policy == "token_budget" and not self._reborning:
+            if self.prompt_tokens() > self.max_prompt_tokens:
+                self._reborning = True
+                try:
+                    self.kill_and_reborn(self.last_words_prompt, self._base_system_prompt())
+                finally:
+                    self._reborning = False
+
+    def _base_system_prompt(self) -> str:
+        for m in self.memory:
+            if m['role'] == 'system':
+                return m['content']
+        return ""
+
+    def prompt_tokens(self) -> int:
+        """Estimated size (tokens) of the history that is resent with every request."""
+        return estimate_tokens(self.memory)
+
+    def prompt_size(self) -> Dict[str, int]:
+        return {
+            "messages": len(self.memory),
+            "chars": sum(len(m['content'] or "") for m in self.memory),
+            "tokens": self.prompt_tokens(),
+            "last_request_tokens": self.last_prompt_tokens,
+        }
 
     def kill_and_reborn(self, last_words_prompt: str, system_prompt: str) -> None:
         last_words = self.get_response(last_words_prompt)
+        self.last_words = last_words
         self.memory = []
         self.add_system_message(system_prompt)
         self.memory.append({'role': 'system', 'content': f'以下是上一位与用户对话的智能体最后总结的内容:\n\n{last_words}\n\n你需要阅读并且理解, 在他的基础上继续与用户对话.'})
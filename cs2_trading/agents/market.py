@@ -1,15 +1,21 @@
 from cs2_trading.agents.base import AgentBase
+from cs2_trading.agents.schemas import (
+    SCORE_SCHEMA, BATCH_SCORE_SCHEMA, DECISION_SCHEMA, BATCH_DECISION_SCHEMA,
+    ScoreResult, TradeDecision, parse_json,
+)
 from cs2_trading.data.inventory import Stuff
-import json
-import re
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class StickerScorer(AgentBase):
     """
     Agent responsible for scoring a sticker based on news sentiment.
+    Every score is independent of previous ones, so no history is kept by default.
     """
-    def __init__(self, client=None, llm_model=None):
-        super().__init__(client, llm_model)
+    def __init__(self, client=None, llm_model=None, memory_policy="stateless", **memory_kwargs):
+        super().__init__(client, llm_model, memory_policy=memory_policy, **memory_kwargs)
         self.system_prompt = (
             "你是一个CS2饰品市场情绪分析师。\n"
             "请根据提供的新闻，对指定的印花进行打分（0-100分）。\n"
@@ -19,24 +25,20 @@ class StickerScorer(AgentBase):
         )
         self.add_system_message(self.system_prompt)
 
-    def score(self, sticker_name: str, news: str) -> dict:
+    def score(self, sticker_name: str, news: str) -> ScoreResult:
         prompt = f"印花名称: {sticker_name}\n\n相关新闻:\n{news}\n\n请打分:"
-        response = self.get_response(prompt)
+        response = self.get_response(prompt, response_schema=SCORE_SCHEMA)
         
-        # Parse JSON
-        try:
-            # Try to find JSON block
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                return json.loads(json_str)
-            else:
-                # Fallback if no JSON found
-                return {"score": 50, "reason": "无法解析模型输出", "raw": response}
-        except Exception as e:
-            return {"score": 50, "reason": f"解析错误: {e}", "raw": response}
-
-    def score_batch(self, sticker_names: list[str], news: str) -> dict:
+        result = ScoreResult.from_obj(parse_json(response), raw=response)
+        if result is None:
+            return ScoreResult(score=50, reason="无法解析模型输出", raw=response)
+        return result
+
+    def score_batch(self, sticker_names: list[str], news: str) -> dict[str, ScoreResult]:
+        """
+        Score many stickers in one constrained-JSON request.
+        Returns {name: ScoreResult}; names the model omitted are simply absent.
+        """
         if not sticker_names:
             return {}
             
@@ -45,51 +47,40 @@ class StickerScorer(AgentBase):
             f"相关新闻:\n{news}\n\n"
             f"任务: 对以下印花进行批量打分: {names_str}\n"
             "要求:\n"
-            "1. 必须返回合法的JSON格式。\n"
-            "2. 不要使用Markdown代码块(```json ... ```)，直接返回JSON字符串。\n"
-            "3. JSON结构: 键是印花名称，值是 {\"score\": int, \"reason\": str}。\n"
-            "4. 确保包含列表中的所有印花。\n"
-            "例如: {\"印花A\": {\"score\": 80, \"reason\": \"理由...\"}, \"印花B\": {\"score\": 40, \"reason\": \"理由...\"}}"
+            "1. 必须返回合法的JSON格式, 不要使用Markdown代码块。\n"
+            "2. JSON结构: {\"scores\": [{\"name\": 印花名称, \"score\": int, \"reason\": str}, ...]}。\n"
+            "3. 确保包含列表中的所有印花, name 与列表中的名称完全一致。\n"
+            "例如: {\"scores\": [{\"name\": \"印花A\", \"score\": 80, \"reason\": \"理由...\"}, {\"name\": \"印花B\", \"score\": 40, \"reason\": \"理由...\"}]}"
         )
         
-        response = self.get_response(prompt)
-        
-        # Clean up response (sometimes LLMs still add markdown)
-        cleaned_response = response.strip()
-        if cleaned_response.startswith("```json"):
-            cleaned_response = cleaned_response[7:]
-        if cleaned_response.startswith("```"):
-            cleaned_response = cleaned_response[3:]
-        if cleaned_response.endswith("```"):
-            cleaned_response = cleaned_response[:-3]
-        cleaned_response = cleaned_response.strip()
-
-        try:
-            # Try parsing cleaned response
-            return json.loads(cleaned_response)
-        except json.JSONDecodeError:
-            # Try regex extraction if direct parse fails
-            try:
-                match = re.search(r'\{.*\}', response, re.DOTALL)
-                if match:
-                    json_str = match.group(0)
-                    return json.loads(json_str)
-            except Exception:
-                pass
-            
-            # Log for human review
-            print(f"[Scorer] Batch JSON parse failed. Raw response saved to 'batch_score_error.log'")
-            with open("batch_score_error.log", "a", encoding="utf-8") as f:
-                f.write(f"--- {datetime.now()} ---\n{response}\n\n")
-            return {}
+        response = self.get_response(prompt, response_schema=BATCH_SCORE_SCHEMA)
+        obj = parse_json(response)
+
+        results = {}
+        if isinstance(obj, dict) and isinstance(obj.get("scores"), list):
+            for entry in obj["scores"]:
+                res = ScoreResult.from_obj(entry)
+                if res is not None and isinstance(entry, dict) and entry.get("name") in sticker_names:
+                    results[entry["name"]] = res
+        elif isinstance(obj, dict):
+            # Free-text providers may still answer in the older {name: {...}} shape
+            for name, entry in obj.items():
+                res = ScoreResult.from_obj(entry)
+                if res is not None and name in sticker_names:
+                    results[name] = res
+
+        if len(results) < len(sticker_names):
+            logger.warning(f"[Scorer] Batch answer covered {len(results)}/{len(sticker_names)} items. Raw: {response[:500]}")
+        return results
 
 
 class StickerTrader(AgentBase):
     """
     Agent responsible for making Sell/Hold decisions.
+    Keeps its decision history, summarised once it exceeds the token budget.
     """
-    def __init__(self, client=None, llm_model=None):
-        super().__init__(client, llm_model)
+    def __init__(self, client=None, llm_model=None, memory_policy="token_budget", max_prompt_tokens=30000, **memory_kwargs):
+        super().__init__(client, llm_model, memory_policy=memory_policy, max_prompt_tokens=max_prompt_tokens, **memory_kwargs)
         self.system_prompt = (
             "你是一个专业的CS2饰品交易员。\n"
             "你需要根据印花的持仓信息、当前市场价格、新闻分析以及情绪评分，决定是 'SELL' (卖出) 还是 'HOLD' (持有)。\n"
@@ -97,7 +88,85 @@ class StickerTrader(AgentBase):
         )
         self.add_system_message(self.system_prompt)
 
-    def decide(self, item: Stuff, current_price: float, news: str, score: int) -> dict:
+    def decide(self, item: Stuff, current_price: float, news: str, score: int) -> TradeDecision:
+        response = self.get_response(self._decision_prompt(item, current_price, news, score), response_schema=DECISION_SCHEMA)
+        return self._parse_decision(response)
+
+    def decide_batch(self, requests: list[tuple], news: str, current_date: datetime = None, max_prompt_chars: int = 24000) -> list[TradeDecision]:
+        """
+        One request for many holdings instead of one `decide` per item.
+
+        Args:
+            requests: (item, current_price, score, price_analysis) tuples; price_analysis may be "".
+            news: Shared context (news + financial report), sent once per request.
+            current_date: Used for holding days; falls back to len(daily_score) like `decide`.
+            max_prompt_chars: Items are split over several requests when the prompt would exceed this.
+        Returns:
+            Decisions in the same order as `requests`. Items the model skipped default to HOLD.
+        """
+        if not requests:
+            return []
+
+        lines = [self._batch_line(i + 1, current_date, *req) for i, req in enumerate(requests)]
+
+        # Greedy split: the news goes into every chunk, item lines fill the remaining budget.
+        budget = max(max_prompt_chars - len(news) - 600, 1)
+        chunks, current, size = [], [], 0
+        for idx, line in enumerate(lines):
+            if current and size + len(line) > budget:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(idx)
+            size += len(line) + 1
+
+        if current:
+            chunks.append(current)
+
+        decisions: list[TradeDecision] = [None] * len(requests)
+        for chunk in chunks:
+            item_lines = "\n".join(lines[i] for i in chunk)
+            prompt = (
+                f"市场新闻:\n{news}\n\n"
+                f"当前可交易持仓 (编号 | 名称 | 买入价 | 现价 | 盈亏 | 持仓天数 | 情绪评分 | 价格分析):\n{item_lines}\n\n"
+                "任务: 对以上每一件持仓分别做出交易决策。\n"
+                "要求:\n"
+                "1. 必须返回合法的JSON格式, 不要使用Markdown代码块。\n"
+                "2. JSON结构: {\"decisions\": [{\"id\": 持仓编号(整数), \"decision\": \"SELL\" 或 \"HOLD\", \"reason\": str}, ...]}。\n"
+                "3. 确保包含列表中的所有编号。\n"
+                "例如: {\"decisions\": [{\"id\": 1, \"decision\": \"HOLD\", \"reason\": \"理由...\"}, {\"id\": 2, \"decision\": \"SELL\", \"reason\": \"理由...\"}]}"
+            )
+            response = self.get_response(prompt, response_schema=BATCH_DECISION_SCHEMA)
+            parsed = self._parse_batch(response)
+            for i in chunk:
+                res = TradeDecision.from_obj(parsed.get(i + 1))
+                decisions[i] = res if res is not None else TradeDecision.hold("批量决策缺失", raw=response)
+        return decisions
+
+    def _batch_line(self, idx: int, current_date, item: Stuff, current_price: float, score: int, price_analysis: str = "") -> str:
+        profit_rate = (current_price - item.bought_price) / item.bought_price * 100
+        held = item.days_held(current_date) if current_date else len(item.daily_score)
+        analysis = " ".join(str(price_analysis).split())
+        return f"{idx} | {item.name} | {item.bought_price:.2f} | {current_price:.2f} | {profit_rate:+.2f}% | {held}天 | {score}/100 | {analysis}"
+
+    def _parse_batch(self, response: str) -> dict:
+        """{row id (int): decision dict}"""
+        obj = parse_json(response)
+        out = {}
+        if isinstance(obj, dict) and isinstance(obj.get("decisions"), list):
+            for entry in obj["decisions"]:
+                if isinstance(entry, dict):
+                    try:
+                        out[int(entry.get("id"))] = entry
+                    except (TypeError, ValueError):
+                        continue
+        elif isinstance(obj, dict):
+            # Free-text providers may still key by row number
+            for key, entry in obj.items():
+                if str(key).isdigit():
+                    out[int(key)] = entry
+        return out
+
+    def _decision_prompt(self, item: Stuff, current_price: float, news: str, score: int) -> str:
         profit_rate = (current_price - item.bought_price) / item.bought_price * 100
         
         info_str = (
@@ -109,15 +178,10 @@ class StickerTrader(AgentBase):
             f"今日情绪评分: {score}/100\n"
         )
         
-        prompt = f"{info_str}\n\n市场新闻:\n{news}\n\n请做出交易决策:"
-        response = self.get_response(prompt)
-        
-        try:
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            else:
-                return {"decision": "HOLD", "reason": "无法解析决策", "raw": response}
-        except Exception:
-            return {"decision": "HOLD", "reason": "解析异常", "raw": response}
+        return f"{info_str}\n\n市场新闻:\n{news}\n\n请做出交易决策:"
 
+    def _parse_decision(self, response: str) -> TradeDecision:
+        result = TradeDecision.from_obj(parse_json(response), raw=response)
+        if result is None:
+            return TradeDecision.hold("无法解析决策", raw=response)
+        return result
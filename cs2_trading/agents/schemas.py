@@ -0,0 +1,142 @@
+"""JSON schemas and typed results for the structured-output agents (scorer, trader, finder)."""
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "reason": {"type": "string"},
+    },
+    "required": ["score", "reason"],
+}
+
+BATCH_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "score": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "reason": {"type": "string"},
+                },
+                "required": ["name", "score", "reason"],
+            },
+        },
+    },
+    "required": ["scores"],
+}
+
+DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decision": {"type": "string", "enum": ["SELL", "HOLD"]},
+        "reason": {"type": "string"},
+    },
+    "required": ["decision", "reason"],
+}
+
+BATCH_DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decisions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "decision": {"type": "string", "enum": ["SELL", "HOLD"]},
+                    "reason": {"type": "string"},
+                },
+                "required": ["id", "decision", "reason"],
+            },
+        },
+    },
+    "required": ["decisions"],
+}
+
+FINDER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "names": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+    },
+    "required": ["names"],
+}
+
+
+@dataclass
+class ScoreResult:
+    score: int
+    reason: str
+    raw: Optional[str] = None
+
+    @classmethod
+    def from_obj(cls, obj: Any, raw: Optional[str] = None) -> Optional["ScoreResult"]:
+        if not isinstance(obj, dict) or "score" not in obj:
+            return None
+        try:
+            score = int(round(float(obj["score"])))
+        except (TypeError, ValueError):
+            return None
+        return cls(score=max(0, min(100, score)), reason=str(obj.get("reason", "N/A")), raw=raw)
+
+
+@dataclass
+class TradeDecision:
+    decision: str
+    reason: str
+    raw: Optional[str] = None
+
+    @classmethod
+    def from_obj(cls, obj: Any, raw: Optional[str] = None) -> Optional["TradeDecision"]:
+        if not isinstance(obj, dict):
+            return None
+        decision = str(obj.get("decision", "")).upper()
+        if decision not in ("SELL", "HOLD"):
+            return None
+        return cls(decision=decision, reason=str(obj.get("reason", "N/A")), raw=raw)
+
+    @classmethod
+    def hold(cls, reason: str, raw: Optional[str] = None) -> "TradeDecision":
+        return cls(decision="HOLD", reason=reason, raw=raw)
+
+
+def parse_json(response: str) -> Any:
+    """
+    Parse a model answer as JSON. Constrained generation returns bare JSON; the
+    markdown-fence / regex fallbacks only matter for providers without schema support
+    (legacy clients, replayed free-text logs). Returns None when nothing parses.
+    """
+    if not response:
+        return None
+    cleaned = response.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    try:
+        return json.loads(cleaned.strip())
+    except json.JSONDecodeError:
+        pass
+    match = re.search(r'\{.*\}', response, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def parse_names(obj: Any) -> Optional[List[str]]:
+    """Names from a FINDER_SCHEMA answer, or None if `obj` is not one."""
+    if isinstance(obj, dict) and isinstance(obj.get("names"), list):
+        return [str(n).strip() for n in obj["names"] if str(n).strip()]
+    return None
@@ -0,0 +1,172 @@
+"""Day-loop driver for DailyStrategy backtests with per-stage checkpoints."""
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from cs2_trading.data.inventory import Inventory
+from cs2_trading.data.journal import atomic_write
+from cs2_trading.data.ledger import open_ledger
+from cs2_trading.strategy import DailyStrategy
+from cs2_trading.utils.dag import StageError, StageResult
+
+logger = logging.getLogger(__name__)
+
+
+def date_range(start_date: str, end_date: str) -> List[datetime]:
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [start + timedelta(days=k) for k in range((end - start).days + 1)]
+
+
+class BacktestDriver:
+    """
+    Runs DailyStrategy over [start_date, end_date] inside `run_dir`:
+
+        run_dir/inventory.snapshot.json + inventory.journal.jsonl   holdings (journaled)
+        run_dir/stages/<date>.json                                  every finished stage's output
+        run_dir/metrics.jsonl                                       daily NAV/PnL rows (StreamingMetrics)
+        run_dir/ledger.sqlite                                       buy/sell fills (TradeLedger), tagged with run_id
+
+    Each stage output (news, financial report, scores, prices, sell decisions, buys)
+    is written atomically as soon as the stage finishes. The inventory is only committed
+    once the whole day is done, so after a crash it is back at the start of the
+    interrupted day; the resumed run then restores the checkpointed stages (replaying
+    sells and buys) instead of calling the LLM again, and re-runs only what is missing.
+    Days up to `inventory.meta["last_date"]` are skipped entirely.
+
+    `schedule` maps a date to strategy attribute overrides applied from that day on,
+    e.g. {"2025-11-24": {"max_buy_daily": 8}}.
+    """
+    def __init__(self, run_dir: str, news_agent, info_api, start_date: str, end_date: str,
+                 schedule: Optional[Dict[str, Dict[str, Any]]] = None, seed_inventory: Optional[str] = None,
+                 snapshot_every: int = 10, **strategy_kwargs):
+        self.run_dir = run_dir
+        self.stages_dir = os.path.join(run_dir, "stages")
+        self.start_date = start_date
+        self.end_date = end_date
+        self.schedule = dict(schedule or {})
+        self.seed_inventory = seed_inventory
+        self.snapshot_every = snapshot_every
+        self.inventory = self._open_inventory()
+        run_id = strategy_kwargs.pop("run_id", None) or self.inventory.meta.get("run_id") or uuid.uuid4().hex[:12]
+        if self.inventory.meta.get("run_id") != run_id:
+            # Committed before the first fill, so a crash on day one resumes under the same run id
+            self.inventory.mark("run_id", run_id)
+            self.inventory.journal.commit()
+        strategy_kwargs.setdefault("ledger", open_ledger(os.path.join(run_dir, "ledger.sqlite")))
+        self.strategy = DailyStrategy(self.inventory, news_agent, info_api, run_id=run_id,
+                                      save_path=os.path.join(run_dir, "inventory.json"), **strategy_kwargs)
+        self.strategy.metrics.set_sink(os.path.join(run_dir, "metrics.jsonl"))
+
+    def _open_inventory(self) -> Inventory:
+        return Inventory.open_journaled(os.path.join(self.run_dir, "inventory"),
+                                        snapshot_every=self.snapshot_every, seed_path=self.seed_inventory)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.inventory.meta.get("last_date")
+
+    # --- checkpoints -------------------------------------------------------------
+
+    def _stage_path(self, date_str: str) -> str:
+        return os.path.join(self.stages_dir, f"{date_str}.json")
+
+    def load_stages(self, date_str: str) -> Dict[str, Any]:
+        """Checkpointed stage outputs for one day ({} if none)."""
+        path = self._stage_path(date_str)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("stages", {})
+
+    def _checkpoint(self, date_str: str, stages: Dict[str, Any]) -> None:
+        payload = {"date": date_str, "stages": stages}
+        atomic_write(self._stage_path(date_str), json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    # --- running -----------------------------------------------------------------
+
+    def _apply_schedule(self, date_str: str) -> None:
+        for when, overrides in sorted(self.schedule.items()):
+            if when <= date_str:
+                for attr, value in overrides.items():
+                    if getattr(self.strategy, attr) != value:
+                        print(f"!!! {date_str}: setting {attr} = {value} (scheduled from {when}) !!!")
+                    setattr(self.strategy, attr, value)
+
+    def run_day(self, day: datetime) -> Dict[str, StageResult]:
+        date_str = day.strftime("%Y-%m-%d")
+        self._apply_schedule(date_str)
+        completed = self.load_stages(date_str)
+        if completed:
+            msg = f"[Driver] Resuming {date_str} with checkpointed stages: {', '.join(completed)}"
+            print(msg)
+            logging.info(msg)
+        stages = dict(completed)
+
+        def on_stage_complete(result: StageResult):
+            stages[result.name] = result.output
+            self._checkpoint(date_str, stages)
+
+        try:
+            return self.strategy.run_daily_cycle(day, completed=completed, on_stage_complete=on_stage_complete)
+        except StageError:
+            # The day's inventory changes were never committed: go back to the start of the day.
+            # Close the old journal first so only one handle ever appends to the file.
+            self.inventory.journal.rollback()
+            self.inventory.journal.close()
+            self.inventory = self.strategy.inventory = self._open_inventory()
+            raise
+
+    def run(self, on_day_complete: Optional[Callable[[str, Dict[str, StageResult]], None]] = None) -> Optional[str]:
+        """
+        Run (or resume) the date range. Returns the last completed date.
+        A failing stage stops the run with StageError; running again resumes it.
+        """
+        days = [d for d in date_range(self.start_date, self.end_date)
+                if self.last_date is None or d.strftime("%Y-%m-%d") > self.last_date]
+        if not days:
+            print(f"[Driver] {self.start_date}..{self.end_date} already complete (last day {self.last_date})")
+            return self.last_date
+        print(f"[Driver] Running {days[0]:%Y-%m-%d}..{days[-1]:%Y-%m-%d} ({len(days)} days) in {self.run_dir}")
+
+        for day in days:
+            date_str = day.strftime("%Y-%m-%d")
+            print(f"\n\n>>> Processing: {date_str} <<<")
+            try:
+                results = self.run_day(day)
+            except StageError as e:
+                print(f"!!! CRITICAL ERROR on {date_str}: {e}")
+                logging.error(f"CRITICAL ERROR on {date_str}: {e}", exc_info=e.cause)
+                print("Stopping simulation. Fix the error and re-run to resume.")
+                raise
+            self.report(date_str)
+            if on_day_complete is not None:
+                on_day_complete(date_str, results)
+        return self.last_date
+
+    def close(self) -> None:
+        if self.inventory.journal is not None:
+            self.inventory.journal.close()
+
+    # --- reporting ---------------------------------------------------------------
+
+    def report(self, date_str: str) -> Dict[str, Any]:
+        """Daily performance report from the strategy's streaming metrics."""
+        m = self.strategy.metrics
+        lines = [
+            f"--- Daily Report: {date_str} ---",
+            f"Holdings:              {len(self.inventory)}",
+            f"NAV:                   {m.nav:.2f} ({m.total_return:+.2%})",
+            f"Total Inventory Value: {m.market_value:.2f}",
+            f"Total Cost:            {m.cost_basis:.2f}",
+            f"Realised Profit:       {m.realized_pnl:.2f}",
+            f"Unrealised Profit:     {m.unrealized_pnl:.2f}",
+            f"Max Drawdown:          {m.max_drawdown:.2%}",
+        ]
+        for line in lines:
+            print(line)
+            logging.info(line)
+        return m.summary()
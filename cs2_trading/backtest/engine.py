@@ -0,0 +1,188 @@
+"""Vectorised multi-strategy backtest engine over an item x day price matrix."""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# BUFF seller fee
+DEFAULT_FEE = 0.025
+
+
+@dataclass
+class EngineResult:
+    """Per-strategy arrays, shape (S, D) unless noted."""
+    holdings: np.ndarray        # (S, I, D) units actually held after lock-up enforcement
+    equity: np.ndarray
+    returns: np.ndarray
+    drawdown: np.ndarray
+    turnover: np.ndarray        # traded value / previous equity
+    fees: np.ndarray
+    capital: np.ndarray         # (S,) starting capital used as the return base
+    blocked: np.ndarray         # (S,) unit-days a requested sale was deferred by the lock-up
+    periods_per_year: int
+
+    @property
+    def total_return(self) -> np.ndarray:
+        return self.equity[:, -1] / self.capital - 1.0
+
+    @property
+    def max_drawdown(self) -> np.ndarray:
+        return self.drawdown.min(axis=1)
+
+    def sharpe(self, risk_free_rate: float = 0.0) -> np.ndarray:
+        """Annualised with sqrt(periods_per_year) (365 for markets that never close); `risk_free_rate` is annual."""
+        excess = self.returns - risk_free_rate / self.periods_per_year
+        std = excess.std(axis=1, ddof=1) if excess.shape[1] > 1 else np.zeros(excess.shape[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = excess.mean(axis=1) / std * np.sqrt(self.periods_per_year)
+        return np.where(std > 0, out, 0.0)
+
+    def summary(self, names: Optional[Sequence[str]] = None, risk_free_rate: float = 0.0):
+        """One row per strategy (pandas DataFrame)."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            "total_return": self.total_return,
+            "sharpe": self.sharpe(risk_free_rate),
+            "max_drawdown": self.max_drawdown,
+            "mean_turnover": self.turnover.mean(axis=1),
+            "fees": self.fees.sum(axis=1),
+            "final_equity": self.equity[:, -1],
+            "blocked_sells": self.blocked,
+        }, index=list(names) if names is not None else None)
+
+
+def _ffill(prices: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the day axis (leading NaNs stay NaN)."""
+    mask = np.isnan(prices)
+    idx = np.where(~mask, np.arange(prices.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    return np.take_along_axis(prices, idx, axis=-1)
+
+
+def enforce_lockup(positions: np.ndarray, lockup_days: int = 7) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clamp target holdings so units bought within the last `lockup_days` days are never sold.
+
+    positions: (S, I, D) target units held at each day's close.
+    Returns (holdings, blocked) where blocked[s] counts unit-days of deferred sales.
+    The loop runs over days only; strategies and items are processed as whole arrays.
+    """
+    positions = np.maximum(positions, 0.0)
+    if lockup_days <= 0:
+        return positions, np.zeros(positions.shape[0])
+
+    S, I, D = positions.shape
+    holdings = np.empty_like(positions)
+    buys = np.zeros_like(positions)
+    locked = np.zeros((S, I))
+    prev = np.zeros((S, I))
+    blocked = np.zeros(S)
+    for d in range(D):
+        if d >= lockup_days:
+            # Units bought `lockup_days` ago are free from today
+            locked -= buys[:, :, d - lockup_days]
+        target = positions[:, :, d]
+        held = np.maximum(target, np.minimum(prev, locked))
+        blocked += (held - target).sum(axis=1)
+        bought = np.maximum(held - prev, 0.0)
+        buys[:, :, d] = bought
+        locked += bought
+        holdings[:, :, d] = held
+        prev = held
+    return holdings, blocked
+
+
+def run_vectorized(prices: np.ndarray, positions: np.ndarray, fee: float = DEFAULT_FEE, buy_fee: float = 0.0,
+                   lockup_days: int = 7, initial_capital: Optional[float] = None,
+                   periods_per_year: int = 365) -> EngineResult:
+    """
+    Backtest S position schedules over the same market in one pass.
+
+    Args:
+        prices: (I, D) item prices per day; NaN gaps are forward-filled, and nothing
+            can be held before an item's first price.
+        positions: (S, I, D) target units held at each day's close (or (I, D) for one strategy).
+        fee: Marketplace fee on sale proceeds (BUFF: 2.5%).
+        buy_fee: Fee on purchases.
+        lockup_days: T+N trade hold; 7 for Steam items, 0 to disable.
+        initial_capital: Starting cash per strategy. By default each strategy gets exactly
+            its peak net outlay, so cash never goes negative and returns are on deployed capital.
+        periods_per_year: Annualisation factor (sticker markets trade every day).
+    """
+    prices = _ffill(np.asarray(prices, dtype=np.float64))
+    positions = np.asarray(positions, dtype=np.float64)
+    if positions.ndim == 2:
+        positions = positions[None]
+    if positions.shape[1:] != prices.shape:
+        raise ValueError(f"positions {positions.shape} do not match prices {prices.shape}")
+
+    tradable = ~np.isnan(prices)
+    positions = np.where(tradable[None], positions, 0.0)
+    holdings, blocked = enforce_lockup(positions, lockup_days)
+    px = np.nan_to_num(prices)[None]
+
+    delta = np.diff(holdings, axis=2, prepend=0.0)
+    buy_value = (np.maximum(delta, 0.0) * px).sum(axis=1)
+    sell_value = (np.maximum(-delta, 0.0) * px).sum(axis=1)
+    fees = sell_value * fee + buy_value * buy_fee
+    cash_flow = sell_value - buy_value - fees
+    cash = np.cumsum(cash_flow, axis=1)
+    market_value = (holdings * px).sum(axis=1)
+
+    if initial_capital is None:
+        capital = np.maximum(-cash.min(axis=1), 0.0)
+        capital = np.where(capital > 0, capital, 1.0)
+    else:
+        capital = np.full(holdings.shape[0], float(initial_capital))
+
+    equity = capital[:, None] + cash + market_value
+    prev_equity = np.concatenate([capital[:, None], equity[:, :-1]], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(prev_equity != 0, equity / prev_equity - 1.0, 0.0)
+        turnover = np.where(prev_equity != 0, (buy_value + sell_value) / prev_equity, 0.0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1.0
+
+    return EngineResult(
+        holdings=holdings, equity=equity, returns=returns, drawdown=drawdown, turnover=turnover,
+        fees=fees, capital=capital, blocked=blocked, periods_per_year=periods_per_year,
+    )
+
+
+def hysteresis_positions(scores: np.ndarray, enter: Sequence[float], exit: Sequence[float],
+                         units: float = 1.0) -> np.ndarray:
+    """
+    Rule variants from one score matrix: strategy s holds `units` of an item from the
+    first day its score reaches enter[s] until the score drops below exit[s].
+
+    scores: (I, D). Returns positions (S, I, D) ready for `run_vectorized`.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    enter = np.asarray(enter, dtype=np.float64)[:, None]
+    exit = np.asarray(exit, dtype=np.float64)[:, None]
+    S, (I, D) = len(enter), scores.shape
+    out = np.zeros((S, I, D))
+    held = np.zeros((S, I), dtype=bool)
+    for d in range(D):
+        day = scores[None, :, d]
+        held = np.where(held, ~(day < exit), day >= enter)
+        out[:, :, d] = held * units
+    return out
+
+
+def matrix_from_inventory(items: List[Any], dates: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Price and score matrices (I, D) from inventory lots whose daily histories end on the
+    last of `dates` (as DailyStrategy records them); missing leading days are NaN.
+    """
+    D = len(dates)
+    prices = np.full((len(items), D), np.nan)
+    scores = np.full((len(items), D), np.nan)
+    for row, item in enumerate(items):
+        p = np.asarray(item.daily_price, dtype=np.float64)[-D:]
+        s = np.asarray(item.daily_score, dtype=np.float64)[-D:]
+        if len(p):
+            prices[row, D - len(p):] = p
+        if len(s):
+            scores[row, D - len(s):] = s
+    return {"prices": prices, "scores": scores}
@@ -0,0 +1,200 @@
+"""Incremental (streaming) performance metrics for day-by-day and live runs."""
+import json
+import math
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cs2_trading.backtest.engine import DEFAULT_FEE
+
+
+@dataclass
+class StreamingMetrics:
+    """
+    Running NAV, PnL, drawdown and return statistics, updated once per day in O(1)
+    from the day's fills and the holdings' marked value, so every number can be read
+    at any point without rescanning history.
+
+        nav = cash + market value,   cash = initial capital - buys + sale proceeds (after fee)
+        realised PnL = sum(proceeds - cost) over sold lots, unrealised = market value - cost basis
+
+    Daily returns (nav_t / nav_{t-1} - 1) feed Welford's online mean/variance for Sharpe.
+    The state is a flat dict (`to_dict`), cheap to persist alongside the inventory; with a
+    `sink_path`, each day's row is also appended there as JSONL for equity curves.
+    """
+    initial_capital: float = 10000.0
+    fee: float = DEFAULT_FEE
+    periods_per_year: int = 365
+    days: int = 0
+    last_date: Optional[str] = None
+    cash: float = 0.0
+    market_value: float = 0.0
+    cost_basis: float = 0.0
+    realized_pnl: float = 0.0
+    fees: float = 0.0
+    buys: int = 0
+    sells: int = 0
+    wins: int = 0
+    nav: float = 0.0
+    peak_nav: float = 0.0
+    max_drawdown: float = 0.0
+    # Welford accumulators over daily returns
+    n_returns: int = 0
+    mean_return: float = 0.0
+    m2: float = 0.0
+
+    def __post_init__(self):
+        if self.days == 0:
+            self.cash = self.nav = self.peak_nav = float(self.initial_capital)
+        self.sink_path: Optional[str] = None
+
+    def set_sink(self, path: Optional[str]) -> None:
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.sink_path = path
+
+    def open_positions(self, cost_basis: float, market_value: Optional[float] = None) -> None:
+        """Count holdings that existed before the first day as bought out of the initial capital."""
+        self.cash -= cost_basis
+        self.cost_basis += cost_basis
+        self.market_value += cost_basis if market_value is None else market_value
+        self.nav = self.peak_nav = self.cash + self.market_value
+
+    def update(self, date: str, market_value: float, cost_basis: float,
+               buys: Iterable[float] = (), sells: Iterable[Tuple[float, float]] = ()) -> Dict[str, Any]:
+        """
+        Close one day.
+
+        Args:
+            market_value / cost_basis: Totals over the holdings after today's trades.
+            buys: Purchase prices filled today.
+            sells: (sale price, cost) per lot sold today; the sale fee is deducted here.
+        Returns the day's row. Re-applying an already closed date is a no-op.
+        """
+        if self.last_date is not None and date <= self.last_date:
+            return self.row()
+        for price in buys:
+            self.cash -= price
+            self.buys += 1
+        for price, cost in sells:
+            fee = price * self.fee
+            proceeds = price - fee
+            self.cash += proceeds
+            self.fees += fee
+            self.realized_pnl += proceeds - cost
+            self.sells += 1
+            self.wins += int(proceeds > cost)
+
+        prev_nav = self.nav
+        self.market_value = float(market_value)
+        self.cost_basis = float(cost_basis)
+        self.nav = self.cash + self.market_value
+        self.days += 1
+        self.last_date = date
+
+        ret = self.nav / prev_nav - 1.0 if prev_nav else 0.0
+        self.n_returns += 1
+        delta = ret - self.mean_return
+        self.mean_return += delta / self.n_returns
+        self.m2 += delta * (ret - self.mean_return)
+
+        self.peak_nav = max(self.peak_nav, self.nav)
+        self.max_drawdown = min(self.max_drawdown, self.drawdown)
+
+        row = self.row(daily_return=ret)
+        if self.sink_path:
+            with open(self.sink_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+        return row
+
+    # --- queries ---------------------------------------------------------------
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.market_value - self.cost_basis
+
+    @property
+    def total_pnl(self) -> float:
+        return self.nav - self.initial_capital
+
+    @property
+    def total_return(self) -> float:
+        return self.nav / self.initial_capital - 1.0 if self.initial_capital else 0.0
+
+    @property
+    def drawdown(self) -> float:
+        return self.nav / self.peak_nav - 1.0 if self.peak_nav else 0.0
+
+    @property
+    def volatility(self) -> float:
+        """Sample standard deviation of daily returns."""
+        return math.sqrt(self.m2 / (self.n_returns - 1)) if self.n_returns > 1 else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.sells if self.sells else 0.0
+
+    def sharpe(self, risk_free_rate: float = 0.0) -> float:
+        std = self.volatility
+        if std == 0:
+            return 0.0
+        return (self.mean_return - risk_free_rate / self.periods_per_year) / std * math.sqrt(self.periods_per_year)
+
+    def row(self, **extra: Any) -> Dict[str, Any]:
+        return {
+            "date": self.last_date, "nav": self.nav, "cash": self.cash,
+            "market_value": self.market_value, "cost_basis": self.cost_basis,
+            "realized_pnl": self.realized_pnl, "unrealized_pnl": self.unrealized_pnl,
+            "drawdown": self.drawdown, **extra,
+        }
+
+    def summary(self, risk_free_rate: float = 0.0) -> Dict[str, Any]:
+        return {
+            "days": self.days,
+            "nav": self.nav,
+            "market_value": self.market_value,
+            "cost_basis": self.cost_basis,
+            "realized_pnl": self.realized_pnl,
+            "unrealized_pnl": self.unrealized_pnl,
+            "total_pnl": self.total_pnl,
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "sharpe": self.sharpe(risk_free_rate),
+            "volatility": self.volatility,
+            "buys": self.buys,
+            "sells": self.sells,
+            "win_rate": self.win_rate,
+            "fees": self.fees,
+        }
+
+    def format(self) -> str:
+        return (
+            f"NAV {self.nav:.2f} ({self.total_return:+.2%}) | realised {self.realized_pnl:+.2f} | "
+            f"unrealised {self.unrealized_pnl:+.2f} | drawdown {self.drawdown:.2%} (max {self.max_drawdown:.2%}) | "
+            f"Sharpe {self.sharpe():.2f} | win rate {self.win_rate:.0%} of {self.sells}"
+        )
+
+    # --- persistence -----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingMetrics":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """Daily rows from a metrics sink; a date written twice (replayed day) keeps its last row."""
+    if not os.path.exists(path):
+        return []
+    rows: Dict[str, Dict[str, Any]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                rows[row["date"]] = row
+    return [rows[d] for d in sorted(rows)]
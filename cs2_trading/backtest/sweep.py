@@ -0,0 +1,247 @@
+"""Parallel parameter sweep of DailyStrategy configurations over a process pool."""
+import contextlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from cs2_trading.backtest.engine import DEFAULT_FEE
+from cs2_trading.backtest.metrics import read_rows
+from cs2_trading.data.journal import atomic_write
+
+logger = logging.getLogger(__name__)
+
+RESULT_FILE = "result.json"
+
+
+@dataclass
+class SweepConfig:
+    """
+    One backtest run. `schedule` maps a date to attribute overrides applied from that
+    day on, e.g. {"2025-11-24": {"max_buy_daily": 8}} for the Major's opening day.
+    """
+    name: str
+    llm_model: str = "gemini-3-flash-preview"
+    target_quantity: int = 10
+    max_buy_daily: int = 3
+    start_date: str = "2025-11-11"
+    end_date: str = "2025-12-20"
+    schedule: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    news_dir: str = "cs2_trading/res/news_artificial"
+    seed_inventory: Optional[str] = None
+    fee: float = DEFAULT_FEE
+
+
+def grid(base: Optional[Dict[str, Any]] = None, **axes: Sequence[Any]) -> List[SweepConfig]:
+    """
+    Cartesian product of parameter axes, named after their values:
+
+        grid(target_quantity=[10, 20], max_buy_daily=[2, 3], llm_model=["gemini-3-flash-preview"])
+    """
+    base = dict(base or {})
+    keys = list(axes)
+    configs = []
+    for values in itertools.product(*(axes[k] for k in keys)):
+        params = dict(zip(keys, values))
+        name = "_".join(f"{k}={v}" for k, v in params.items()) or "base"
+        configs.append(SweepConfig(name=name, **{**base, **params}))
+    return configs
+
+
+def default_info_api(config: SweepConfig):
+    from cs2_trading.data.api import InfoAPI
+    return InfoAPI(os.getenv("INFO_API_TOKEN"))
+
+
+def default_news_agent(config: SweepConfig):
+    from cs2_trading.agents.ArtificialNewsAgent import ArtificialNewsAgent
+    return ArtificialNewsAgent(news_dir=config.news_dir)
+
+
+def _config_key(config: SweepConfig) -> Dict[str, Any]:
+    # JSON round-trip so it compares equal to what was written to disk
+    return json.loads(json.dumps(asdict(config), default=str))
+
+
+def _init_worker(env: Dict[str, str]) -> None:
+    os.environ.update(env)
+
+
+def _shared_env(price_store_path: Optional[str], catalogue_path: Optional[str], llm_cache_path: Optional[str],
+                llm_cache_read_only: bool, max_workers: int) -> Dict[str, str]:
+    """Environment for workers: shared stores, and each upstream's RPM split across processes."""
+    from cs2_trading.utils.ratelimit import DEFAULT_LIMITS
+
+    env = {}
+    if price_store_path:
+        env["PRICE_STORE_PATH"] = os.path.abspath(price_store_path) if price_store_path != "off" else "off"
+    if catalogue_path:
+        env["GOODS_CATALOGUE_PATH"] = os.path.abspath(catalogue_path) if catalogue_path != "off" else "off"
+    if llm_cache_path:
+        env["LLM_CACHE_PATH"] = os.path.abspath(llm_cache_path)
+    if llm_cache_read_only:
+        env["LLM_CACHE_READ_ONLY"] = "1"
+    # Limiters are per process: without this, N workers would hit each API N times as fast
+    for name, defaults in DEFAULT_LIMITS.items():
+        key = f"RATE_LIMIT_{name.upper()}_RPM"
+        rpm = float(os.getenv(key) or defaults["rpm"])
+        env[key] = str(rpm / max(1, max_workers))
+    return env
+
+
+def run_config(config: SweepConfig, out_dir: str, make_info_api: Callable = default_info_api,
+               make_news_agent: Callable = default_news_agent, snapshot_every: int = 10) -> Dict[str, Any]:
+    """
+    Run one configuration to completion inside the current process.
+
+    State lives in `<out_dir>/<name>/` (see BacktestDriver: journaled inventory and
+    per-stage checkpoints, so a run resumes mid-day), plus the per-day rows, logs, and
+    `result.json` once the run is finished.
+    """
+    from cs2_trading.backtest.driver import BacktestDriver
+    from cs2_trading.llm.metrics import get_metrics
+
+    run_dir = os.path.join(out_dir, config.name)
+    os.makedirs(run_dir, exist_ok=True)
+    metrics = get_metrics()
+    metrics.reset()
+    metrics.set_sink(os.path.join(run_dir, "llm_calls.jsonl"))
+
+    handler = logging.FileHandler(os.path.join(run_dir, "backtest.log"), encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    started = time.time()
+    try:
+        with open(os.path.join(run_dir, "stdout.log"), "a", encoding="utf-8") as out, contextlib.redirect_stdout(out):
+            driver = BacktestDriver(
+                run_dir, make_news_agent(config), make_info_api(config),
+                start_date=config.start_date, end_date=config.end_date,
+                schedule=config.schedule, seed_inventory=config.seed_inventory, snapshot_every=snapshot_every,
+                llm_model=config.llm_model,
+                target_quantity=config.target_quantity,
+                max_buy_daily=config.max_buy_daily,
+            )
+            driver.strategy.metrics.fee = config.fee
+            saved = driver.inventory.meta.get("sweep_config")
+            current = _config_key(config)
+            if saved is not None and saved != current:
+                raise ValueError(f"{run_dir} holds a run of a different configuration; use a new name or delete it")
+            driver.inventory.mark("sweep_config", current)
+            try:
+                driver.run()
+            finally:
+                driver.close()
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+
+    summary = {**driver.strategy.metrics.summary(), "holdings": len(driver.inventory), **llm_usage(metrics.sink_path)}
+    result = {"config": current, "metrics": summary, "days": read_rows(os.path.join(run_dir, "metrics.jsonl")),
+              "elapsed_s": time.time() - started}
+    atomic_write(os.path.join(run_dir, RESULT_FILE),
+                 json.dumps(result, indent=2, ensure_ascii=False, default=str).encode("utf-8"))
+    return result
+
+
+def llm_usage(llm_calls_path: Optional[str]) -> Dict[str, Any]:
+    """Call count, cache hits and cost from a run's LLM call log (covers every resume)."""
+    if not llm_calls_path or not os.path.exists(llm_calls_path):
+        return {}
+    with open(llm_calls_path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {
+        "llm_calls": len(records),
+        "llm_cached": sum(bool(r.get("cached")) for r in records),
+        "llm_cost_usd": sum(r.get("cost_usd", 0.0) for r in records),
+    }
+
+
+def load_result(out_dir: str, name: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(out_dir, name, RESULT_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable result {path}: {e}")
+        return None
+
+
+def results_table(results: Sequence[Dict[str, Any]]):
+    """One row per configuration: swept parameters followed by metrics (pandas DataFrame)."""
+    import pandas as pd
+
+    rows = []
+    for res in results:
+        cfg = dict(res["config"])
+        cfg.pop("schedule", None)
+        rows.append({**cfg, **res["metrics"], "elapsed_s": res.get("elapsed_s")})
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("name").sort_values("total_pnl", ascending=False)
+
+
+def run_sweep(configs: Sequence[SweepConfig], out_dir: str = "sweeps/default", max_workers: int = 4,
+              price_store_path: Optional[str] = None, catalogue_path: Optional[str] = None,
+              llm_cache_path: Optional[str] = None, llm_cache_read_only: bool = False,
+              make_info_api: Callable = default_info_api, make_news_agent: Callable = default_news_agent):
+    """
+    Fan `configs` out over a process pool and return the aggregated results table.
+
+    - Finished configurations (a `result.json` in their directory) are not re-run, and
+      unfinished ones resume after their last completed day, so an interrupted sweep
+      can simply be started again with the same `out_dir`.
+    - Workers share the price store, goods catalogue and LLM response cache files
+      (SQLite WAL handles concurrent readers); pass `llm_cache_read_only=True` to replay
+      a frozen cache without writing to it. API rate limits are divided between workers.
+    - `make_info_api` / `make_news_agent` build per-config dependencies; they must be
+      module-level functions so they can be sent to worker processes.
+    """
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("Sweep configuration names must be unique")
+    os.makedirs(out_dir, exist_ok=True)
+
+    results, pending = [], []
+    for config in configs:
+        done = load_result(out_dir, config.name)
+        if done is not None and done.get("config") == _config_key(config):
+            results.append(done)
+        else:
+            pending.append(config)
+    print(f"[Sweep] {len(results)} configurations already done, {len(pending)} to run on {max_workers} workers")
+
+    failed = {}
+    if pending:
+        env = _shared_env(price_store_path, catalogue_path, llm_cache_path, llm_cache_read_only, max_workers)
+        # spawn: workers must not inherit open SQLite connections or limiter threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=_init_worker, initargs=(env,)) as pool:
+            futures = {pool.submit(run_config, c, out_dir, make_info_api, make_news_agent): c for c in pending}
+            for future in as_completed(futures):
+                config = futures[future]
+                try:
+                    res = future.result()
+                except Exception as e:
+                    failed[config.name] = e
+                    logger.error(f"Sweep configuration {config.name} failed: {e}", exc_info=e)
+                    print(f"[Sweep] {config.name} failed: {e} (re-run to resume)")
+                    continue
+                results.append(res)
+                m = res["metrics"]
+                print(f"[Sweep] {config.name}: pnl={m.get('total_pnl', 0):.2f} return={m.get('total_return', 0):+.2%}")
+
+    table = results_table(results)
+    if not table.empty:
+        table.to_csv(os.path.join(out_dir, "summary.csv"))
+    if failed:
+        print(f"[Sweep] {len(failed)} configurations failed: {', '.join(failed)}")
+    return table
@@ -1,10 +1,19 @@
 """Price API client skeletons"""
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 import datetime
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import numpy as np
 import requests
-from time import sleep
+from cs2_trading.data.catalogue import GoodsCatalogue, catalogue_from_env
+from cs2_trading.data.http import EndpointStats, get_session
+from cs2_trading.data.price_store import PriceSeries, PriceStore, price_store_from_env, to_epoch_days
+from cs2_trading.utils.logger import get_logger
+from cs2_trading.utils.ratelimit import get_limiter
+
+logger = get_logger("InfoAPI")
 
 
 '''2xx: 响应成功
@@ -17,37 +26,119 @@ from time import sleep
 
 
 
+class InfoAPIError(RuntimeError):
+    """Non-retryable CSQAQ error (bad request, auth failure, unknown endpoint, exhausted retries)."""
+    def __init__(self, status_code: int, endpoint: str, detail: Any = None):
+        super().__init__(f"API error {status_code} on {endpoint}: {detail}")
+        self.status_code = status_code
+        self.endpoint = endpoint
+        self.detail = detail
+
+
+# Documented CSQAQ status codes (see above) worth retrying; everything else fails fast
+RETRY_STATUS = (429, 503)
+
+DEFAULT_BASE_URL = "https://api.csqaq.com/api/v1/"
+
+# Chart endpoint history windows (days)
+CHART_PERIODS = (7, 30, 90, 180, 365)
+
+
 class InfoAPI:
 
-    def __init__(self, api_token: str | None = None):
+    # Per-endpoint latency counters shared by all instances
+    stats = EndpointStats()
+
+    def __init__(self, api_token: str | None = None, max_retries: int = 4, backoff: float = 2.0,
+                 price_store: PriceStore | None = None, max_price_age_hours: float = 12.0,
+                 catalogue: GoodsCatalogue | None = None, base_url: str | None = None):
         load_dotenv()
-        self.base_url = "https://api.csqaq.com/api/v1/info/"
+        # INFO_API_BASE_URL points the client elsewhere, e.g. at data/fake_server.py
+        self.base_url = base_url or os.getenv("INFO_API_BASE_URL") or DEFAULT_BASE_URL
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
         self.api_token = api_token or os.getenv("INFO_API_TOKEN")
         if not self.api_token:
             raise EnvironmentError("API token not found.")
-        # Cache for item_id -> market_hash_name mapping to avoid repeated API calls
-        self._name_cache = {}
+        # Cache for item_id -> display name seen in suggest results
+        self._name_cache: Dict[int, str] = {}
+        # Persistent name -> ID index (GOODS_CATALOGUE_PATH)
+        self.catalogue = catalogue if catalogue is not None else catalogue_from_env()
+        # name -> candidate good_ids from the suggest endpoint (see resolve_names)
+        self._id_cache: Dict[str, List[int]] = {}
+        # Shared CSQAQ quota for every InfoAPI instance in the process
+        self.limiter = get_limiter("csqaq")
+        # Keep-alive connection pool shared by every InfoAPI instance
+        self.session = get_session("csqaq")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Daily price history: persistent store (PRICE_STORE_PATH) + in-memory copy per item
+        self.price_store = price_store if price_store is not None else price_store_from_env()
+        self.max_price_age_s = max_price_age_hours * 3600
+        self._history_cache: Dict[int, PriceSeries] = {}
+        self._fetched_at: Dict[int, float] = {}
 
-    def get_good_info(self, id: int, timeout: float = 10.0, proxies: Dict[str, str] | None = None) -> Dict[str, Any]:
-        sleep(1)
-        url = f"{self.base_url}good"
-        params = {"id": id}
+    def _request(self, method: str, endpoint: str, params: Dict[str, Any] | None = None, json: Dict[str, Any] | None = None,
+                 timeout: float = 10.0, proxies: Dict[str, str] | None = None) -> Dict[str, Any]:
+        """
+        Send one CSQAQ request and return the decoded JSON body.
+
+        429/503 and connection errors back off (through the shared limiter, so every
+        caller slows down) and retry; 400/401/404 and other errors raise InfoAPIError at once.
+        """
+        url = f"{self.base_url}{endpoint}"
         headers = {"ApiToken": self.api_token}
+        last_error: Any = None
+
+        for attempt in range(self.max_retries):
+            wait = self.backoff * (2 ** attempt)
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers=headers, params=params, json=json,
+                                                timeout=timeout, proxies=proxies)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.stats.record(endpoint, time.perf_counter() - start, error=True, retry=True)
+                last_error = e
+                logger.warning(f"{endpoint}: {e.__class__.__name__}, retrying in {wait:.0f}s")
+                time.sleep(wait)
+                continue
+            latency = time.perf_counter() - start
+            status = response.status_code
 
-        response = requests.get(url, headers=headers, params=params, timeout=timeout, proxies=proxies)
+            if status in RETRY_STATUS:
+                self.stats.record(endpoint, latency, error=True, retry=True)
+                last_error = f"HTTP {status}"
+                # Honour Retry-After when the gateway sends one
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    wait = max(wait, float(retry_after))
+                logger.warning(f"{endpoint}: HTTP {status}, retrying in {wait:.0f}s")
+                self.limiter.on_throttle(wait)
+                continue
 
-        try:
-            data = response.json()
-        except ValueError:
-            response.raise_for_status()
+            try:
+                data = response.json()
+            except ValueError:
+                data = response.text[:200]
+            if status != 200:
+                self.stats.record(endpoint, latency, error=True)
+                # 400/401 (token), 404 (endpoint) and 500 will not improve by retrying
+                raise InfoAPIError(status, endpoint, data)
+            # Only a real answer lets the adaptive rate recover
+            self.limiter.on_success()
+            self.stats.record(endpoint, latency)
+            return data
 
-        if response.status_code != 200:
-            raise RuntimeError(f"API error {response.status_code}: {data}")
+        raise InfoAPIError(0, endpoint, f"gave up after {self.max_retries} attempts ({last_error})")
 
+    def get_good_info(self, id: int, timeout: float = 10.0, proxies: Dict[str, str] | None = None) -> Dict[str, Any]:
+        data = self._request("GET", "info/good", params={"id": id}, timeout=timeout, proxies=proxies)
+        if self.catalogue is not None:
+            self.catalogue.add_from_info(data)
         return data
 
     def get_reduced_good_info(self, id: int, timeout: float = 10.0, proxies: Dict[str, str] | None = None) -> Dict[str, Any]:
-        sleep(1)
         full_info = self.get_good_info(id, timeout, proxies)
         reduced_info = {
             "item_id": full_info.get("id"),
@@ -58,114 +149,196 @@ class InfoAPI:
         return reduced_info
 
     def get_good_id(self, name: str, timeout: float = 10.0, proxies: Dict[str, str] | None = None) -> list[int]:
-        # Use the suggest endpoint which accepts a `text` query (near real-time suggestions)
-        sleep(1)
-
-        url = "https://api.csqaq.com/api/v1/search/suggest"
-        params = {"text": name}
-        headers = {"ApiToken": self.api_token}
-        response = requests.get(url, headers=headers, params=params, timeout=timeout, proxies=proxies)
+        """
+        Up to three candidate IDs for `name`. The local catalogue answers known names
+        (exact or fuzzy) without a network call; otherwise the suggest endpoint is asked
+        and its results are added to the catalogue.
+        """
+        local = self._local_ids(name)
+        if local is not None:
+            return local
 
-        try:
-            data = response.json()
-        except ValueError:
-            response.raise_for_status()
+        # Use the suggest endpoint which accepts a `text` query (near real-time suggestions)
+        data = self._request("GET", "search/suggest", params={"text": name}, timeout=timeout, proxies=proxies)
+        return self._record_suggest(name, data)
 
-        if response.status_code != 200:
-            raise RuntimeError(f"API error {response.status_code}: {data}")
-        
-        print(data)
+    def _local_ids(self, name: str) -> list[int] | None:
+        if self.catalogue is not None:
+            good_id = self.catalogue.lookup(name)
+            if good_id is not None:
+                return [good_id]
+        return None
 
+    def _record_suggest(self, name: str, data: Dict[str, Any]) -> list[int]:
+        """IDs from a suggest response; every hit is remembered in the catalogue."""
         r = list()
 
         for i in data.get("data", []):
-            r.append(i.get("id"))
+            good_id = i.get("id")
+            if good_id is None:
+                continue
+            r.append(good_id)
+            label = i.get("value") or i.get("name")
+            if label:
+                self._name_cache[good_id] = label
+                if self.catalogue is not None:
+                    self.catalogue.add(good_id, name_zh=label)
+
+        if r and self.catalogue is not None:
+            # The query itself now resolves locally next time
+            self.catalogue.add_alias(name, r[0])
 
         return r[:3:]
 
     def get_historical_price(self, item_id: int, date: str) -> float:
         """
         Fetch historical price from CSQAQ Chart API (BUFF price).
+        History is read from the local price store first; the API is only asked for
+        days after the stored range, and only once the stored series is stale.
+        If the exact date is missing, the closest previous date is used (clamped to
+        the first/last known price outside the history).
         Args:
             item_id: The ID of the item (CSQAQ good_id).
             date: The date string (YYYY-MM-DD).
         Returns:
             float: The price (CNY). Returns 0.0 if not found.
         """
-        # Initialize cache if needed
-        if not hasattr(self, "_history_cache"):
-            self._history_cache = {}
-
-        # Check cache
-        if item_id not in self._history_cache:
-            sleep(1) # Rate limit
-            url = "https://api.csqaq.com/api/v1/info/chart"
-            # Use platform=1 (BUFF) for reliable pricing
-            payload = {
-                "good_id": str(item_id),
-                "key": "sell_price",
-                "platform": 1, 
-                "period": "365", # Get 1 year of history
-                "style": "all_style"
-            }
-            headers = {
-                "ApiToken": self.api_token,
-                "Content-Type": "application/json"
-            }
-            
+        series = self._ensure_history(int(item_id), date)
+        return series.asof(int(to_epoch_days([date])[0]))
+
+    def get_prices(self, item_ids: Sequence[int], dates: Sequence[str]) -> np.ndarray:
+        """
+        As-of prices for every item on every date, shape (len(item_ids), len(dates)).
+        Same lookup rules as `get_historical_price`; rows of items without any history are NaN.
+        """
+        days = to_epoch_days(list(dates))
+        out = np.full((len(item_ids), len(days)), np.nan)
+        if not len(days):
+            return out
+        latest = max(dates)
+        for row, item_id in enumerate(item_ids):
+            out[row] = self._ensure_history(int(item_id), latest).asof_many(days)
+        return out
+
+    def prefetch(self, item_ids: Sequence[int], date: str | None = None, max_workers: int = 8) -> Dict[int, bool]:
+        """
+        Make sure the histories of all `item_ids` cover `date` (default: today), fetching
+        the missing ones concurrently. Requests still go through the shared limiter, so
+        concurrency only overlaps network latency. Returns {item_id: has history}.
+        """
+        date = date or datetime.date.today().isoformat()
+        unique = list(dict.fromkeys(int(item_id) for item_id in item_ids))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique))), thread_name_prefix="prefetch") as pool:
+            series = list(pool.map(lambda item_id: self._ensure_history(item_id, date), unique))
+        return {item_id: len(s) > 0 for item_id, s in zip(unique, series)}
+
+    def resolve_names(self, names: Sequence[str], max_workers: int = 8) -> Dict[str, List[int]]:
+        """
+        Concurrent `get_good_id` for many names. Failed lookups map to [] (and are retried
+        on the next call); successful ones are cached for the lifetime of this client.
+        """
+        unique = list(dict.fromkeys(names))
+        missing = [n for n in unique if n not in self._id_cache]
+
+        def lookup(name):
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("code") != 200:
-                    print(f"[API] CSQAQ error for {item_id}: {data.get('msg')}")
-                    return 0.0
-                
-                chart_data = data.get("data", {})
-                timestamps = chart_data.get("timestamp", [])
-                prices = chart_data.get("main_data", [])
-                
-                # Store as dict: date_str -> price
-                price_map = {}
-                for ts, price in zip(timestamps, prices):
-                    # ts is milliseconds
-                    dt = datetime.datetime.fromtimestamp(ts / 1000.0)
-                    d_str = dt.strftime("%Y-%m-%d")
-                    price_map[d_str] = float(price)
-                
-                self._history_cache[item_id] = price_map
-                
+                return self.get_good_id(name)
             except Exception as e:
-                print(f"[API] Failed to fetch history for {item_id}: {e}")
-                return 0.0
-
-        # Lookup date
-        price_map = self._history_cache.get(item_id, {})
-        if date in price_map:
-            return price_map[date]
-            
-        # Fallback: Find closest date
-        sorted_dates = sorted(price_map.keys())
-        if not sorted_dates:
-            return 0.0
-            
-        # If requested date is before all history, return first
-        if date < sorted_dates[0]:
-            return price_map[sorted_dates[0]]
-            
-        # If requested date is after all history, return last
-        if date > sorted_dates[-1]:
-            return price_map[sorted_dates[-1]]
-            
-        # Otherwise, find closest previous date
-        last_date = sorted_dates[0]
-        for d in sorted_dates:
-            if d > date:
-                break
-            last_date = d
-            
-        return price_map[last_date]
+                logger.warning(f"ID lookup failed for {name}: {e}")
+                return None
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))), thread_name_prefix="resolve") as pool:
+                for name, ids in zip(missing, pool.map(lookup, missing)):
+                    if ids is not None:
+                        self._id_cache[name] = ids
+        return {n: list(self._id_cache.get(n, [])) for n in unique}
+
+    def _ensure_history(self, item_id: int, date: str) -> PriceSeries:
+        """In-memory history for `item_id` that covers `date` if the API has it."""
+        series, period = self._history_plan(item_id, date)
+        if period is None:
+            return series
+        return self._store_history(item_id, series, self._fetch_chart(item_id, period))
+
+    def _history_plan(self, item_id: int, date: str) -> Tuple[PriceSeries, str | None]:
+        """(known history, chart period to fetch or None if the known history will do)."""
+        if item_id < 0:
+            # Placeholder ID (see catalogue.mock_good_id): nothing to fetch
+            return PriceSeries.empty(), None
+        series = self._history_cache.get(item_id)
+        if series is None:
+            series = self.price_store.load_series(item_id) if self.price_store is not None else PriceSeries.empty()
+            self._history_cache[item_id] = series
+
+        last_day = series.last_day
+        if last_day is not None and date <= last_day:
+            return series, None
+        if last_day is not None and not self._is_stale(item_id):
+            # Covered up to a recent refresh; the API has nothing newer yet
+            return series, None
+        return series, self._refresh_period(last_day, date)
+
+    def _store_history(self, item_id: int, series: PriceSeries, fetched: PriceSeries | None) -> PriceSeries:
+        if fetched is None:
+            return series
+        if self.price_store is not None:
+            self.price_store.put_series(item_id, fetched.to_map())
+        series = series.merge(fetched)
+        self._history_cache[item_id] = series
+        self._fetched_at[item_id] = time.time()
+        return series
+
+    def _is_stale(self, item_id: int) -> bool:
+        fetched_at = self._fetched_at.get(item_id)
+        if fetched_at is None and self.price_store is not None:
+            meta = self.price_store.meta(item_id)
+            fetched_at = meta[2] if meta else None
+        return fetched_at is None or time.time() - fetched_at > self.max_price_age_s
+
+    @staticmethod
+    def _refresh_period(last_day: str | None, date: str) -> str:
+        """Smallest chart period that reaches back to the last stored day."""
+        if last_day is None:
+            return "365"
+        today = datetime.date.today()
+        gap = (today - datetime.date.fromisoformat(last_day)).days + 1
+        for period in CHART_PERIODS:
+            if gap <= period:
+                return str(period)
+        return str(CHART_PERIODS[-1])
+
+    @staticmethod
+    def _chart_payload(item_id: int, period: str) -> Dict[str, Any]:
+        # Use platform=1 (BUFF) for reliable pricing
+        return {
+            "good_id": str(item_id),
+            "key": "sell_price",
+            "platform": 1, 
+            "period": period,
+            "style": "all_style"
+        }
+
+    @staticmethod
+    def _parse_chart(item_id: int, data: Dict[str, Any]) -> PriceSeries | None:
+        if data.get("code") != 200:
+            print(f"[API] CSQAQ error for {item_id}: {data.get('msg')}")
+            return None
+        
+        chart_data = data.get("data", {})
+        # Timestamps are milliseconds; converted to local calendar days in one pass
+        return PriceSeries.from_chart(chart_data.get("timestamp", []), chart_data.get("main_data", []))
+
+    def _fetch_chart(self, item_id: int, period: str) -> PriceSeries | None:
+        """Daily series from the chart endpoint, or None on failure."""
+        try:
+            data = self._request("POST", "info/chart", json=self._chart_payload(item_id, period))
+            return self._parse_chart(item_id, data)
+        except Exception as e:
+            print(f"[API] Failed to fetch history for {item_id}: {e}")
+            return None
 
 if __name__ == "__main__":
     client = InfoAPI()
@@ -0,0 +1,224 @@
+"""Asyncio variant of InfoAPI for high fan-out market scans."""
+import asyncio
+import datetime
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence
+
+import numpy as np
+
+from cs2_trading.data.api import RETRY_STATUS, InfoAPI, InfoAPIError, logger
+from cs2_trading.data.price_store import PriceSeries, to_epoch_days
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("AsyncInfoAPI requires `httpx`: pip install httpx")
+    return httpx
+
+
+class AsyncInfoAPI(InfoAPI):
+    """
+    InfoAPI with coroutine twins of its public methods, prefixed with "a":
+
+        async with AsyncInfoAPI(concurrency=16) as api:
+            ids = await api.aresolve_names(names)
+            prices = await api.aget_prices(item_ids, dates)
+
+    The synchronous methods are inherited unchanged, so an AsyncInfoAPI can still be
+    handed to code that expects an InfoAPI.
+
+    - At most `concurrency` requests are in flight; all of them still draw from the
+      shared "csqaq" rate limiter (waiting with asyncio.sleep instead of blocking).
+    - Identical in-flight requests (same good_id history, same name lookup, same info
+      call) are coalesced: later callers await the first caller's response.
+    - Price store, catalogue and endpoint stats are shared with synchronous InfoAPIs;
+      their SQLite reads and writes run in worker threads, off the event loop.
+    - `proxy` (e.g. "http://127.0.0.1:7890") is used for every async request.
+    """
+    def __init__(self, api_token: str | None = None, concurrency: int = 16, proxy: str | None = None, **kwargs):
+        super().__init__(api_token, **kwargs)
+        self.concurrency = concurrency
+        self.proxy = proxy
+        self._loop = None
+        self._client = None
+        self._sem = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def _bind_loop(self) -> None:
+        # httpx clients, semaphores and futures belong to one event loop; rebuild them
+        # when the same object is used from a new loop (e.g. successive asyncio.run calls).
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            httpx = _import_httpx()
+            old, self._loop = self._client, loop
+            self._client = httpx.AsyncClient(
+                proxy=self.proxy,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            )
+            self._sem = asyncio.Semaphore(max(1, self.concurrency))
+            self._inflight = {}
+            if old is not None:
+                try:
+                    await old.aclose()
+                except Exception as e:
+                    # Its connections belong to the previous (possibly closed) loop
+                    logger.debug(f"Closing the previous loop's client failed: {e}")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._loop = self._client = self._sem = None
+
+    async def __aenter__(self) -> "AsyncInfoAPI":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def _coalesce(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `factory()` once per `key` while it is in flight; concurrent callers share the result."""
+        await self._bind_loop()
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(factory())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one cancelled waiter must not cancel the request for the others
+        return await asyncio.shield(fut)
+
+    async def _arequest(self, method: str, endpoint: str, params: Dict[str, Any] | None = None,
+                        json: Dict[str, Any] | None = None, timeout: float = 10.0) -> Dict[str, Any]:
+        """Async `InfoAPI._request` with the same retry policy (proxy: see `__init__`)."""
+        httpx = _import_httpx()
+        await self._bind_loop()
+        url = f"{self.base_url}{endpoint}"
+        headers = {"ApiToken": self.api_token}
+        last_error: Any = None
+
+        for attempt in range(self.max_retries):
+            wait = self.backoff * (2 ** attempt)
+            async with self._sem:
+                delay = self.limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                start = time.perf_counter()
+                try:
+                    response = await self._client.request(method, url, headers=headers, params=params, json=json, timeout=timeout)
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    response = None
+                    last_error = e
+                latency = time.perf_counter() - start
+
+            if response is None:
+                self.stats.record(endpoint, latency, error=True, retry=True)
+                logger.warning(f"{endpoint}: {last_error.__class__.__name__}, retrying in {wait:.0f}s")
+                await asyncio.sleep(wait)
+                continue
+
+            status = response.status_code
+            if status in RETRY_STATUS:
+                self.stats.record(endpoint, latency, error=True, retry=True)
+                last_error = f"HTTP {status}"
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    wait = max(wait, float(retry_after))
+                logger.warning(f"{endpoint}: HTTP {status}, retrying in {wait:.0f}s")
+                self.limiter.on_throttle(wait)
+                continue
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = response.text[:200]
+            if status != 200:
+                self.stats.record(endpoint, latency, error=True)
+                raise InfoAPIError(status, endpoint, data)
+            self.limiter.on_success()
+            self.stats.record(endpoint, latency)
+            return data
+
+        raise InfoAPIError(0, endpoint, f"gave up after {self.max_retries} attempts ({last_error})")
+
+    async def aget_good_info(self, id: int, timeout: float = 10.0) -> Dict[str, Any]:
+        async def fetch():
+            data = await self._arequest("GET", "info/good", params={"id": id}, timeout=timeout)
+            if self.catalogue is not None:
+                await asyncio.to_thread(self.catalogue.add_from_info, data)
+            return data
+        return await self._coalesce(("info", id), fetch)
+
+    async def aget_reduced_good_info(self, id: int, timeout: float = 10.0) -> Dict[str, Any]:
+        full_info = await self.aget_good_info(id, timeout)
+        return {
+            "item_id": full_info.get("id"),
+            "name": full_info.get("name"),
+            "price": full_info.get("price"),
+            "rarity": full_info.get("rarity"),
+        }
+
+    async def aget_good_id(self, name: str, timeout: float = 10.0) -> list[int]:
+        local = self._local_ids(name)
+        if local is not None:
+            return local
+
+        async def fetch():
+            data = await self._arequest("GET", "search/suggest", params={"text": name}, timeout=timeout)
+            return await asyncio.to_thread(self._record_suggest, name, data)
+        return list(await self._coalesce(("suggest", name), fetch))
+
+    async def aget_historical_price(self, item_id: int, date: str) -> float:
+        series = await self._aensure_history(int(item_id), date)
+        return series.asof(int(to_epoch_days([date])[0]))
+
+    async def aget_prices(self, item_ids: Sequence[int], dates: Sequence[str]) -> np.ndarray:
+        days = to_epoch_days(list(dates))
+        out = np.full((len(item_ids), len(days)), np.nan)
+        if not len(days):
+            return out
+        latest = max(dates)
+        histories = await asyncio.gather(*(self._aensure_history(int(item_id), latest) for item_id in item_ids))
+        for row, series in enumerate(histories):
+            out[row] = series.asof_many(days)
+        return out
+
+    async def aprefetch(self, item_ids: Sequence[int], date: str | None = None) -> Dict[int, bool]:
+        """Histories for all `item_ids` covering `date`; concurrency is bounded by `self.concurrency`."""
+        date = date or datetime.date.today().isoformat()
+        unique = list(dict.fromkeys(int(item_id) for item_id in item_ids))
+        histories = await asyncio.gather(*(self._aensure_history(item_id, date) for item_id in unique))
+        return {item_id: len(s) > 0 for item_id, s in zip(unique, histories)}
+
+    async def aresolve_names(self, names: Sequence[str]) -> Dict[str, List[int]]:
+        unique = list(dict.fromkeys(names))
+        missing = [n for n in unique if n not in self._id_cache]
+
+        async def lookup(name):
+            try:
+                return await self.aget_good_id(name)
+            except Exception as e:
+                logger.warning(f"ID lookup failed for {name}: {e}")
+                return None
+
+        for name, ids in zip(missing, await asyncio.gather(*(lookup(n) for n in missing))):
+            if ids is not None:
+                self._id_cache[name] = ids
+        return {n: list(self._id_cache.get(n, [])) for n in unique}
+
+    async def _aensure_history(self, item_id: int, date: str) -> PriceSeries:
+        # Price store reads and writes are blocking SQLite calls
+        series, period = await asyncio.to_thread(self._history_plan, item_id, date)
+        if period is None:
+            return series
+
+        async def fetch():
+            try:
+                data = await self._arequest("POST", "info/chart", json=self._chart_payload(item_id, period))
+                fetched = self._parse_chart(item_id, data)
+            except Exception as e:
+                print(f"[API] Failed to fetch history for {item_id}: {e}")
+                fetched = None
+            # Re-read the cache: the series may have grown while we were waiting
+            return await asyncio.to_thread(self._store_history, item_id, self._history_cache.get(item_id, series), fetched)
+        return await self._coalesce(("chart", item_id), fetch)
@@ -0,0 +1,218 @@
+"""Persistent catalogue of CSQAQ goods with a local name -> ID index."""
+import difflib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "cs2_trading/res/goods_catalogue.sqlite"
+
+_SEPARATORS = re.compile(r"[|｜/\\\-_·•()（）\[\]【】]+")
+_SPACES = re.compile(r"\s+")
+# Tokens that name a different good, not a spelling variant: finish, StatTrak/souvenir, wear grade.
+# "印花 | x (全息)" and "印花 | x (金色)" are one character apart but priced very differently.
+_VARIANTS = re.compile(
+    r"全息|金色|闪亮|普通|闪耀|彩虹|holo|gold|glitter|foil|lenticular|embroidered|stattrak|纪念品|souvenir"
+    r"|崭新出厂|略有磨损|久经沙场|破损不堪|战痕累累|factory new|minimal wear|field tested|well worn|battle scarred"
+)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form used as index key: NFKC (full-width -> ASCII), case-folded,
+    separators turned into single spaces. "印花 ｜ S1mple" == "印花 | s1mple".
+    """
+    text = unicodedata.normalize("NFKC", name or "").casefold()
+    text = _SEPARATORS.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def variant_tokens(key: str) -> frozenset:
+    """Variant markers in a normalised name; fuzzy matches must agree on them exactly."""
+    return frozenset(_VARIANTS.findall(key))
+
+
+def mock_good_id(name: str) -> int:
+    """
+    Stable placeholder ID for a name the API could not resolve. Unlike `hash()`, CRC32
+    is the same in every process; the value is negative so it never collides with a real ID.
+    """
+    return -(zlib.crc32(normalize_name(name).encode("utf-8")) % 1_000_000_000) - 1
+
+
+def _tournament_from_name(name: Optional[str]) -> Optional[str]:
+    # Sticker names end with the event: "印花 | s1mple | 2025年奥斯汀锦标赛"
+    if not name:
+        return None
+    parts = [p.strip() for p in re.split(r"[|｜]", name)]
+    return parts[-1] if len(parts) >= 3 and parts[-1] else None
+
+
+class GoodsCatalogue:
+    """
+    SQLite-backed catalogue of goods (id, Chinese/English names, tournament, rarity)
+    plus learned aliases (query text that resolved to an ID).
+
+    All names and aliases are held in memory under `normalize_name` keys, so exact
+    lookups are a dict hit and fuzzy lookups (difflib) never touch the network. A fuzzy
+    match never crosses variants (finish, StatTrak, wear): "全息" never resolves to "金色".
+    """
+    def __init__(self, path: str, fuzzy_cutoff: float = 0.9):
+        self.path = path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS goods ("
+            " id INTEGER PRIMARY KEY,"
+            " name_zh TEXT,"
+            " name_en TEXT,"
+            " tournament TEXT,"
+            " rarity TEXT,"
+            " updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, id INTEGER NOT NULL)")
+        self._conn.commit()
+
+        self._index: Dict[str, int] = {}
+        for good_id, name_zh, name_en in self._conn.execute("SELECT id, name_zh, name_en FROM goods"):
+            self._index_names(good_id, name_zh, name_en)
+        for alias, good_id in self._conn.execute("SELECT alias, id FROM aliases"):
+            self._index[alias] = good_id
+
+    def _index_names(self, good_id: int, *names: Optional[str]) -> None:
+        for name in names:
+            if name:
+                self._index[normalize_name(name)] = good_id
+
+    def add(self, good_id: int, name_zh: Optional[str] = None, name_en: Optional[str] = None,
+            tournament: Optional[str] = None, rarity: Optional[str] = None) -> None:
+        """Insert or update a good; known fields are kept when new ones are None."""
+        good_id = int(good_id)
+        tournament = tournament or _tournament_from_name(name_zh) or _tournament_from_name(name_en)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO goods (id, name_zh, name_en, tournament, rarity, updated) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET"
+                " name_zh = COALESCE(excluded.name_zh, name_zh),"
+                " name_en = COALESCE(excluded.name_en, name_en),"
+                " tournament = COALESCE(excluded.tournament, tournament),"
+                " rarity = COALESCE(excluded.rarity, rarity),"
+                " updated = excluded.updated",
+                (good_id, name_zh, name_en, tournament, rarity, time.time()),
+            )
+            self._conn.commit()
+            self._index_names(good_id, name_zh, name_en)
+
+    def add_from_info(self, info: Dict[str, Any]) -> Optional[int]:
+        """Record a `get_good_info` response (either the raw body or its goods object)."""
+        goods = info.get("data", info) if isinstance(info, dict) else {}
+        goods = goods.get("goods_info", goods) if isinstance(goods, dict) else {}
+        good_id = goods.get("id")
+        if good_id is None:
+            return None
+        self.add(
+            good_id,
+            name_zh=goods.get("name"),
+            name_en=goods.get("market_hash_name"),
+            rarity=goods.get("rarity_localized_name") or goods.get("rarity"),
+        )
+        return int(good_id)
+
+    def add_alias(self, name: str, good_id: int) -> None:
+        """Remember that the query `name` means `good_id`."""
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO aliases (alias, id) VALUES (?, ?)", (key, int(good_id)))
+            self._conn.commit()
+            self._index[key] = int(good_id)
+
+    def lookup(self, name: str, fuzzy: bool = True) -> Optional[int]:
+        """
+        Local ID for `name`: exact normalised match first, then the closest fuzzy match
+        with the same variant tokens. None sends the caller to the suggest endpoint.
+        """
+        key = normalize_name(name)
+        with self._lock:
+            good_id = self._index.get(key)
+            if good_id is None and fuzzy and key:
+                variants = variant_tokens(key)
+                close = difflib.get_close_matches(key, self._index.keys(), n=5, cutoff=self.fuzzy_cutoff)
+                same = [c for c in close if variant_tokens(c) == variants]
+                good_id = self._index[same[0]] if same else None
+            if good_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return good_id
+
+    def get(self, good_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, name_zh, name_en, tournament, rarity FROM goods WHERE id = ?", (int(good_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("id", "name_zh", "name_en", "tournament", "rarity"), row))
+
+    def by_tournament(self, tournament: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name_zh, name_en, tournament, rarity FROM goods WHERE tournament = ? ORDER BY id", (tournament,)
+            ).fetchall()
+        return [dict(zip(("id", "name_zh", "name_en", "tournament", "rarity"), r)) for r in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            goods = self._conn.execute("SELECT COUNT(*) FROM goods").fetchone()[0]
+            aliases = self._conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+        total = self.hits + self.misses
+        return {"goods": goods, "aliases": aliases, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return f"GoodsCatalogue(path={self.path!r}, names={len(self._index)})"
+
+
+_CATALOGUES: Dict[str, GoodsCatalogue] = {}
+_CATALOGUES_LOCK = threading.Lock()
+
+
+def open_catalogue(path: str) -> GoodsCatalogue:
+    key = os.path.abspath(path)
+    with _CATALOGUES_LOCK:
+        catalogue = _CATALOGUES.get(key)
+        if catalogue is None:
+            catalogue = GoodsCatalogue(path)
+            _CATALOGUES[key] = catalogue
+        return catalogue
+
+
+def catalogue_from_env() -> Optional[GoodsCatalogue]:
+    """
+    GOODS_CATALOGUE_PATH selects the sqlite file (default: cs2_trading/res/goods_catalogue.sqlite);
+    set it to "off" to always ask the suggest endpoint.
+    """
+    path = os.getenv("GOODS_CATALOGUE_PATH", DEFAULT_PATH)
+    if not path or path.lower() in ("off", "none", "0"):
+        return None
+    return open_catalogue(path)
@@ -0,0 +1,314 @@
+"""
+Local stand-in for the CSQAQ API (info/good, search/suggest, info/chart).
+
+Serves recorded fixtures or deterministic synthetic data, with configurable latency,
+429/503 injection and a server-side request quota, so InfoAPI, the rate limiter and
+the strategy can be exercised offline:
+
+    with FakeCSQAQServer(FakeServerConfig(latency_s=0.05, rpm=120)) as server:
+        api = InfoAPI(api_token="test", base_url=server.base_url)
+
+or from a shell:
+
+    python -m cs2_trading.data.fake_server --port 8765 --latency 0.05 --throttle-rate 0.1
+    INFO_API_BASE_URL=http://127.0.0.1:8765/api/v1/ python main.py
+"""
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from cs2_trading.utils.logger import get_logger
+
+logger = get_logger("FakeCSQAQ")
+
+API_PREFIX = "/api/v1/"
+
+
+@dataclass
+class FakeServerConfig:
+    latency_s: float = 0.0          # added to every response
+    jitter_s: float = 0.0           # uniform extra latency in [0, jitter_s]
+    throttle_rate: float = 0.0      # probability of answering 429
+    error_rate: float = 0.0         # probability of answering `error_code`
+    error_code: int = 503
+    rpm: Optional[float] = None     # server-side quota; requests above it get 429
+    token: Optional[str] = None     # if set, other ApiToken values get 401
+    fixtures_path: Optional[str] = None
+    seed: int = 0
+
+
+@dataclass
+class Fixtures:
+    """Recorded responses: goods {id: goods_info}, charts {id: {timestamp, main_data}}, suggest {text: [{id, value}]}."""
+    goods: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    charts: Dict[int, Dict[str, List[float]]] = field(default_factory=dict)
+    suggest: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "Fixtures":
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(
+            goods={int(k): _goods_info(v) for k, v in raw.get("goods", {}).items()},
+            charts={int(k): v for k, v in raw.get("charts", {}).items()},
+            suggest=raw.get("suggest", {}),
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"goods": self.goods, "charts": self.charts, "suggest": self.suggest}, f, ensure_ascii=False)
+
+
+def _goods_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The goods object of an info/good response (raw body, its "data", or already unwrapped)."""
+    info = info.get("data", info)
+    return info.get("goods_info", info)
+
+
+def record_fixtures(info_api: Any, item_ids: Sequence[int], names: Sequence[str], path: str) -> Fixtures:
+    """Build a fixture corpus from a live InfoAPI (one-off, needs a real token)."""
+    fixtures = Fixtures()
+    for name in names:
+        data = info_api._request("GET", "search/suggest", params={"text": name})
+        fixtures.suggest[name] = data.get("data", [])
+    for item_id in item_ids:
+        fixtures.goods[int(item_id)] = _goods_info(info_api.get_good_info(item_id))
+        chart = info_api._request("POST", "info/chart", json=info_api._chart_payload(item_id, "365"))
+        fixtures.charts[int(item_id)] = chart.get("data", {})
+    fixtures.save(path)
+    return fixtures
+
+
+def synthetic_name(good_id: int) -> str:
+    return f"印花 | Player{good_id % 997} | 合成赛事{good_id % 7}"
+
+
+def synthetic_chart(good_id: int, days: int, today: Optional[datetime.date] = None) -> Dict[str, List[float]]:
+    """Deterministic daily random walk ending today (local midnight timestamps, ms)."""
+    today = today or datetime.date.today()
+    rng = random.Random(good_id)
+    price = rng.uniform(5, 500)
+    timestamps, prices = [], []
+    start = today - datetime.timedelta(days=days - 1)
+    # Walk from a fixed origin so every period shows the same prices for the same day
+    origin = today - datetime.timedelta(days=400)
+    for offset in range((today - origin).days + 1):
+        price = max(0.1, price * (1 + rng.gauss(0.0005, 0.03)))
+        day = origin + datetime.timedelta(days=offset)
+        if day >= start:
+            ts = datetime.datetime.combine(day, datetime.time()).timestamp() * 1000
+            timestamps.append(ts)
+            prices.append(round(price, 2))
+    return {"timestamp": timestamps, "main_data": prices}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, fmt, *args):
+        # Keep benchmark output clean; requests are counted in FakeCSQAQServer.counts
+        pass
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        owner: FakeCSQAQServer = self.server.owner
+        url = urlparse(self.path)
+        endpoint = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    return self._send(400, {"code": 400, "msg": "invalid json"})
+
+        status, payload, headers = owner.handle(method, endpoint, query, body, self.headers.get("ApiToken"))
+        self._send(status, payload, headers)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "FakeCSQAQServer"
+
+
+class FakeCSQAQServer:
+    """Threaded fake CSQAQ server; `base_url` is what InfoAPI(base_url=...) expects."""
+    def __init__(self, config: Optional[FakeServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeServerConfig()
+        self.fixtures = Fixtures.load(self.config.fixtures_path) if self.config.fixtures_path else Fixtures()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._allowance = self.config.rpm or 0.0
+        self._last = time.monotonic()
+        self.counts: Dict[str, int] = {}
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakeCSQAQServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-csqaq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeCSQAQServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _over_quota(self) -> bool:
+        # Server-side token bucket (per minute, burst = one second's worth)
+        rpm = self.config.rpm
+        if not rpm:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(max(1.0, rpm / 60.0), self._allowance + (now - self._last) * rpm / 60.0)
+            self._last = now
+            if self._allowance < 1.0:
+                return True
+            self._allowance -= 1.0
+            return False
+
+    def handle(self, method: str, endpoint: str, query: Dict[str, str], body: Dict[str, Any], token: Optional[str]):
+        """(status, json body, extra headers) for one request."""
+        cfg = self.config
+        self._count(endpoint)
+        with self._lock:
+            delay = cfg.latency_s + (self._rng.uniform(0, cfg.jitter_s) if cfg.jitter_s else 0.0)
+            roll_throttle = self._rng.random()
+            roll_error = self._rng.random()
+        if delay:
+            time.sleep(delay)
+
+        if cfg.token is not None and token != cfg.token:
+            self._count("401")
+            return 401, {"code": 401, "msg": "Token验证未通过"}, {}
+        if self._over_quota() or roll_throttle < cfg.throttle_rate:
+            self._count("429")
+            return 429, {"code": 429, "msg": "请求过于频繁"}, {"Retry-After": "1"}
+        if roll_error < cfg.error_rate:
+            self._count(str(cfg.error_code))
+            return cfg.error_code, {"code": cfg.error_code, "msg": "injected error"}, {}
+
+        if method == "GET" and endpoint == "info/good":
+            return self._good(query)
+        if method == "GET" and endpoint == "search/suggest":
+            return self._suggest(query)
+        if method == "POST" and endpoint == "info/chart":
+            return self._chart(body)
+        self._count("404")
+        return 404, {"code": 404, "msg": "接口不存在"}, {}
+
+    def _good(self, query: Dict[str, str]):
+        try:
+            good_id = int(query["id"])
+        except (KeyError, ValueError):
+            return 400, {"code": 400, "msg": "missing id"}, {}
+        info = self.fixtures.goods.get(good_id)
+        if info is None:
+            chart = synthetic_chart(good_id, 1)
+            info = {"id": good_id, "name": synthetic_name(good_id), "market_hash_name": f"Sticker | Player{good_id % 997}",
+                    "price": chart["main_data"][-1], "rarity_localized_name": "高级"}
+        return 200, {"code": 200, "msg": "Success", "data": {"goods_info": info}}, {}
+
+    def _suggest(self, query: Dict[str, str]):
+        text = query.get("text", "")
+        hits = self.fixtures.suggest.get(text)
+        if hits is None:
+            hits = [{"id": good_id, "value": info.get("name")} for good_id, info in self.fixtures.goods.items()
+                    if text and text in (info.get("name") or "")][:10]
+        if not hits and text:
+            # Unknown names resolve to a stable synthetic ID
+            hits = [{"id": zlib.crc32(text.encode("utf-8")) % 100000 + 1, "value": text}]
+        return 200, {"code": 200, "msg": "Success", "data": hits}, {}
+
+    def _chart(self, body: Dict[str, Any]):
+        try:
+            good_id = int(body["good_id"])
+            period = int(body.get("period", 365))
+        except (KeyError, ValueError):
+            return 400, {"code": 400, "msg": "missing good_id"}, {}
+        chart = self.fixtures.charts.get(good_id)
+        if chart is None:
+            chart = synthetic_chart(good_id, period)
+        else:
+            cutoff = (time.time() - period * 86400) * 1000
+            pairs = [(t, p) for t, p in zip(chart["timestamp"], chart["main_data"]) if t >= cutoff]
+            chart = {"timestamp": [t for t, _ in pairs], "main_data": [p for _, p in pairs]}
+        return 200, {"code": 200, "msg": "Success", "data": chart}, {}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local fake CSQAQ API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability of a 429")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", type=int, default=503)
+    parser.add_argument("--rpm", type=float, default=None, help="server-side quota")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--fixtures", default=None, help="JSON fixture corpus (see Fixtures)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = FakeServerConfig(
+        latency_s=args.latency, jitter_s=args.jitter, throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate, error_code=args.error_code, rpm=args.rpm, token=args.token,
+        fixtures_path=args.fixtures, seed=args.seed,
+    )
+    server = FakeCSQAQServer(config, host=args.host, port=args.port)
+    logger.info(f"Serving fake CSQAQ at {server.base_url} (set INFO_API_BASE_URL to use it)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        logger.info(f"Request counts: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
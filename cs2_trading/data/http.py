@@ -0,0 +1,78 @@
+"""Shared HTTP sessions and per-endpoint latency counters for data clients."""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive pool per upstream host shared by every client in the process:
+# repeated calls reuse TCP/TLS connections instead of handshaking each time.
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(name: str, pool_maxsize: int = 16) -> requests.Session:
+    """Process-wide `requests.Session` for upstream `name` (e.g. "csqaq")."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(name)
+        if session is None:
+            session = requests.Session()
+            # Retries are handled by the caller, which knows the upstream's status codes.
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[name] = session
+        return session
+
+
+def close_sessions() -> None:
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+
+@dataclass
+class EndpointStat:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+
+class EndpointStats:
+    """Thread-safe latency / error counters keyed by endpoint path."""
+    def __init__(self):
+        self._stats: Dict[str, EndpointStat] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency_s: float, error: bool = False, retry: bool = False) -> None:
+        with self._lock:
+            stat = self._stats.setdefault(endpoint, EndpointStat())
+            stat.calls += 1
+            stat.errors += int(error)
+            stat.retries += int(retry)
+            stat.total_s += latency_s
+            stat.max_s = max(stat.max_s, latency_s)
+
+    def snapshot(self) -> Dict[str, Tuple[int, int, int, float, float]]:
+        """{endpoint: (calls, errors, retries, mean_s, max_s)}"""
+        with self._lock:
+            return {k: (s.calls, s.errors, s.retries, s.mean_s, s.max_s) for k, s in self._stats.items()}
+
+    def format(self) -> str:
+        rows = [
+            f"    {endpoint:<16} calls={calls:<5} errors={errors:<3} retries={retries:<3} mean={mean_s * 1000:.0f}ms max={max_s * 1000:.0f}ms"
+            for endpoint, (calls, errors, retries, mean_s, max_s) in sorted(self.snapshot().items())
+        ]
+        return "\n".join(rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
@@ -1,9 +1,37 @@
+import heapq
 import json
-from dataclasses import dataclass, field, asdict
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 
-@dataclass
+from cs2_trading.data.journal import InventoryJournal, atomic_write
+
+# Items bought on day D can be sold from D+7 (Steam trade hold)
+LOCKUP = timedelta(days=7)
+
+# History storage: scores are 0-100 integers (int8), prices stay float64 so CNY
+# values round-trip exactly.
+SCORE_TYPECODE = "b"
+PRICE_TYPECODE = "d"
+
+# Binary inventory file: magic, u32 header length, JSON header, then all prices
+# (float64) and all scores (int8), little-endian, lot after lot.
+BINARY_MAGIC = b"CS2INV1\n"
+
+
+def _as_array(typecode: str, values: Iterable) -> array:
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if typecode == SCORE_TYPECODE:
+        values = (int(round(v)) for v in values)
+    return array(typecode, values)
+
+
+@dataclass(slots=True)
 class Stuff:
     id: int
     name: str
@@ -14,17 +42,42 @@ class Stuff:
     # Legacy fields for compatibility
     ready_to_sell: bool = False
     in_hand: int = 0
-    daily_score: List[int] = field(default_factory=list)
-    daily_price: List[float] = field(default_factory=list)
+    # Compact per-day histories; list-compatible for append/index/len/iteration
+    daily_score: array = field(default_factory=lambda: array(SCORE_TYPECODE))
+    daily_price: array = field(default_factory=lambda: array(PRICE_TYPECODE))
+    # Unique per holding (the same good can be bought several times); assigned by Inventory
+    lot_id: Optional[str] = None
+
+    def __post_init__(self):
+        # The shipped inventory JSONs store ids as strings ("420"); CSQAQ ids are ints
+        self.id = int(self.id)
+        # JSON (and older callers) hand us plain lists
+        self.daily_score = _as_array(SCORE_TYPECODE, self.daily_score)
+        self.daily_price = _as_array(PRICE_TYPECODE, self.daily_price)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict; histories become plain lists (same layout as before)."""
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        d["daily_score"] = self.daily_score.tolist()
+        d["daily_price"] = self.daily_price.tolist()
+        d["extra_info"] = dict(self.extra_info)
+        return d
 
     def is_tradeable(self, current_date: datetime) -> bool:
         """Check if item is tradeable based on T+7 rule."""
         try:
             p_date = datetime.fromisoformat(self.purchase_date)
-            return current_date >= p_date + timedelta(days=7)
+            return current_date >= p_date + LOCKUP
         except ValueError:
             return False
 
+    def unlock_date(self) -> Optional[datetime]:
+        """First moment the item may be sold, or None if the purchase date is unreadable."""
+        try:
+            return datetime.fromisoformat(self.purchase_date) + LOCKUP
+        except ValueError:
+            return None
+
     def days_held(self, current_date: datetime) -> int:
         """Calculate how many days the item has been held."""
         try:
@@ -35,15 +88,103 @@ class Stuff:
             return 0
 
     def __repr__(self):
-        return f'Stuff(id={self.id}, name="{self.name}", price={self.bought_price}, date={self.purchase_date})'
+        return f'Stuff(lot={self.lot_id}, id={self.id}, name="{self.name}", price={self.bought_price}, date={self.purchase_date})'
 
 
-@dataclass
 class Inventory:
-    items: List[Stuff] = field(default_factory=list)
+    """
+    Holdings indexed for daily use:
+
+    - lots are keyed by a unique `lot_id` (insertion ordered), so removal is O(1);
+    - secondary indexes map good id and name to their lots;
+    - lots still in the T+7 lock-up sit in a min-heap by unlock time, so each
+      `get_tradeable_items` call only pops the lots that unlocked since the last call.
+
+    `items` is still available as a list (a fresh copy in holding order).
+
+    With a journal attached (`Inventory.open_journaled`), every mutation — add,
+    remove_item, record_score, record_price, mark — is logged as an event and
+    `save` only commits the day's events, snapshotting every `snapshot_every` saves.
+    """
+    def __init__(self, items: Optional[List[Stuff]] = None):
+        self.journal: Optional[InventoryJournal] = None
+        # Small persisted key/value state, e.g. the last completed trading day
+        self.meta: Dict[str, Any] = {}
+        self._lots: Dict[str, Stuff] = {}
+        self._by_id: Dict[int, Dict[str, Stuff]] = {}
+        self._by_name: Dict[str, Dict[str, Stuff]] = {}
+        self._order: Dict[str, int] = {}
+        self._seq = 0
+        self._next_lot = 1
+        # (unlock time, insertion seq, lot_id); removed lots are skipped lazily when popped
+        self._locked: List[Tuple[datetime, int, str]] = []
+        self._unlocked: Dict[str, Stuff] = {}
+        self._clock: Optional[datetime] = None
+        for item in items or []:
+            self.add(item)
+
+    @property
+    def items(self) -> List[Stuff]:
+        return list(self._lots.values())
+
+    @items.setter
+    def items(self, items: List[Stuff]):
+        journal, meta, next_lot = self.journal, self.meta, self._next_lot
+        self.__init__(items)
+        self.journal, self.meta = journal, meta
+        self._next_lot = max(self._next_lot, next_lot)
+        if journal is not None:
+            self.snapshot()
+
+    def __len__(self) -> int:
+        return len(self._lots)
+
+    def __iter__(self) -> Iterator[Stuff]:
+        return iter(list(self._lots.values()))
+
+    def __contains__(self, item: Stuff) -> bool:
+        return item.lot_id in self._lots and self._lots[item.lot_id] is item
+
+    def _new_lot_id(self) -> str:
+        while f"L{self._next_lot:06d}" in self._lots:
+            self._next_lot += 1
+        lot_id = f"L{self._next_lot:06d}"
+        self._next_lot += 1
+        return lot_id
 
-    def add_item(self, id: int, name: str, price: float, date: datetime = None, info: dict = None):
-        """Add a new item to the inventory."""
+    def _reserve_lot(self, lot_id: str) -> None:
+        # Never hand out an id that was already used (even by a lot since sold)
+        if lot_id[:1] == "L" and lot_id[1:].isdigit():
+            self._next_lot = max(self._next_lot, int(lot_id[1:]) + 1)
+
+    def add(self, item: Stuff) -> Stuff:
+        """Add an existing Stuff (e.g. loaded from disk); assigns a lot id if it has none."""
+        if not item.lot_id or item.lot_id in self._lots:
+            item.lot_id = self._new_lot_id()
+        lot_id = item.lot_id
+        self._reserve_lot(lot_id)
+        self._lots[lot_id] = item
+        self._by_id.setdefault(item.id, {})[lot_id] = item
+        self._by_name.setdefault(item.name, {})[lot_id] = item
+        self._seq += 1
+        self._order[lot_id] = self._seq
+        if self.journal is not None:
+            self.journal.append("buy", item=item.to_dict())
+
+        unlock = item.unlock_date()
+        if unlock is None:
+            # Unparseable purchase date: never tradeable, as before
+            return item
+        if self._clock is not None and unlock <= self._clock:
+            # Newest lot, so appending keeps holding order
+            self._unlocked[lot_id] = item
+        else:
+            heapq.heappush(self._locked, (unlock, self._seq, lot_id))
+        return item
+
+    def add_item(self, id: int, name: str, price: float, date: datetime = None, info: dict = None,
+                 lot_id: Optional[str] = None) -> Stuff:
+        """Add a new item to the inventory (`lot_id` re-creates a known lot, e.g. on replay)."""
         if date is None:
             date = datetime.now()
             
@@ -52,42 +193,214 @@ class Inventory:
             name=name, 
             bought_price=price, 
             purchase_date=date.isoformat(),
-            extra_info=info or {}
+            extra_info=info or {},
+            lot_id=lot_id
         )
-        self.items.append(item)
+        return self.add(item)
 
     def get_tradeable_items(self, current_date: datetime) -> List[Stuff]:
-        """Get list of items that can be sold."""
-        return [i for i in self.items if i.is_tradeable(current_date)]
+        """Get list of items that can be sold (in holding order)."""
+        if self._clock is not None and current_date < self._clock:
+            # Time went backwards (e.g. a new backtest over the same object): re-lock everything
+            self._rebuild_schedule()
+        self._clock = current_date
+
+        in_order = True
+        while self._locked and self._locked[0][0] <= current_date:
+            _, seq, lot_id = heapq.heappop(self._locked)
+            item = self._lots.get(lot_id)
+            if item is not None:
+                in_order = in_order and self._last_unlocked_seq() < seq
+                self._unlocked[lot_id] = item
+        if not in_order:
+            # Only when lots unlock out of purchase order (e.g. back-dated adds)
+            self._unlocked = dict(sorted(self._unlocked.items(), key=lambda kv: self._order[kv[0]]))
+        return list(self._unlocked.values())
+
+    def _last_unlocked_seq(self) -> int:
+        return self._order[next(reversed(self._unlocked))] if self._unlocked else 0
+
+    def _rebuild_schedule(self) -> None:
+        self._clock = None
+        self._unlocked = {}
+        self._locked = []
+        for lot_id, item in self._lots.items():
+            unlock = item.unlock_date()
+            if unlock is not None:
+                self._locked.append((unlock, self._order[lot_id], lot_id))
+        heapq.heapify(self._locked)
 
     def get_item_by_id(self, item_id: int) -> Optional[Stuff]:
         """Find first item with given ID."""
-        for item in self.items:
-            if item.id == item_id:
-                return item
-        return None
+        lots = self._by_id.get(item_id)
+        return next(iter(lots.values())) if lots else None
+
+    def get_items_by_id(self, item_id: int) -> List[Stuff]:
+        return list(self._by_id.get(item_id, {}).values())
+
+    def get_items_by_name(self, name: str) -> List[Stuff]:
+        return list(self._by_name.get(name, {}).values())
+
+    def get_lot(self, lot_id: str) -> Optional[Stuff]:
+        return self._lots.get(lot_id)
 
     def remove_item(self, item: Stuff):
         """Remove an item from inventory (e.g. sold)."""
-        if item in self.items:
-            self.items.remove(item)
+        lot_id = item.lot_id
+        if lot_id not in self._lots:
+            return
+        item = self._lots.pop(lot_id)
+        if self.journal is not None:
+            self.journal.append("sell", lot=lot_id)
+        self._order.pop(lot_id, None)
+        self._unlocked.pop(lot_id, None)
+        for index, key in ((self._by_id, item.id), (self._by_name, item.name)):
+            lots = index.get(key)
+            if lots is not None:
+                lots.pop(lot_id, None)
+                if not lots:
+                    del index[key]
+
+    def record_score(self, item: Stuff, score: int):
+        """Append today's score to a held lot (journaled)."""
+        item.daily_score.append(score)
+        if self.journal is not None:
+            self.journal.append("score", lot=item.lot_id, value=score)
+
+    def record_price(self, item: Stuff, price: float):
+        """Append today's price to a held lot (journaled)."""
+        item.daily_price.append(price)
+        if self.journal is not None:
+            self.journal.append("price", lot=item.lot_id, value=price)
+
+    def mark(self, key: str, value: Any):
+        """Persist a small piece of run state alongside the holdings (e.g. last_date)."""
+        self.meta[key] = value
+        if self.journal is not None:
+            self.journal.append("meta", key=key, value=value)
 
     def save(self, filepath: str):
-        """Save inventory to a JSON file."""
-        data = [asdict(item) for item in self.items]
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        """
+        Save inventory to a JSON file (or the compact binary format for *.bin paths).
+        Writes are atomic (temp file + rename). With a journal attached, only the
+        pending events are committed; the full file is rewritten when a snapshot is due.
+        """
+        if self.journal is not None:
+            self.journal.commit()
+            if not self.journal.should_snapshot():
+                return
+            self.snapshot()
+        if filepath.endswith(".bin"):
+            return self.save_binary(filepath)
+        data = [item.to_dict() for item in self._lots.values()]
+        atomic_write(filepath, json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8"))
+
+    def snapshot(self):
+        """Fold the journal into a fresh snapshot (requires a journal)."""
+        self.journal.snapshot([item.to_dict() for item in self._lots.values()], {**self.meta, "next_lot": self._next_lot})
+
+    @classmethod
+    def open_journaled(cls, base_path: str, snapshot_every: int = 30, seed_path: Optional[str] = None) -> 'Inventory':
+        """
+        Recover an inventory from `<base_path>.snapshot.json` + `<base_path>.journal.jsonl`
+        and keep journaling into them. If neither exists, start from `seed_path`
+        (a regular inventory JSON/binary file) when given.
+        """
+        journal = InventoryJournal(base_path, snapshot_every=snapshot_every)
+        items, meta, events = journal.read()
+        fresh = not items and not events and not os.path.exists(journal.snapshot_path)
+        if fresh and seed_path:
+            inventory = cls.load(seed_path)
+        else:
+            inventory = cls(items=[Stuff(**d) for d in items])
+            inventory.meta = dict(meta)
+            inventory._next_lot = max(inventory._next_lot, int(inventory.meta.pop("next_lot", 1)))
+            inventory._replay(events)
+        inventory.journal = journal
+        if fresh or events or journal.torn:
+            # Start from a compact snapshot (and a clean journal) so the next recovery is a single read
+            inventory.snapshot()
+        return inventory
+
+    def _replay(self, events: List[Dict[str, Any]]):
+        for event in events:
+            op = event["op"]
+            if op == "buy":
+                self.add(Stuff(**event["item"]))
+            elif op == "sell":
+                item = self._lots.get(event["lot"])
+                if item is not None:
+                    self.remove_item(item)
+            elif op in ("score", "price"):
+                item = self._lots.get(event["lot"])
+                if item is not None:
+                    (item.daily_score if op == "score" else item.daily_price).append(event["value"])
+            elif op == "meta":
+                self.meta[event["key"]] = event["value"]
 
     @classmethod
     def load(cls, filepath: str) -> 'Inventory':
-        """Load inventory from a JSON file."""
+        """Load inventory from a JSON file (or the compact binary format for *.bin paths)."""
+        if filepath.endswith(".bin"):
+            try:
+                return cls.load_binary(filepath)
+            except FileNotFoundError:
+                return cls()
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            items = [Stuff(**d) for d in data]
-            return cls(items=items)
-        except (FileNotFoundError, json.JSONDecodeError):
+        except FileNotFoundError:
             return cls()
+        except json.JSONDecodeError as e:
+            # Never silently start from an empty inventory over a damaged file
+            raise ValueError(f"Corrupt inventory file {filepath}: {e}") from e
+        items = [Stuff(**d) for d in data]
+        return cls(items=items)
+
+    def save_binary(self, filepath: str):
+        """
+        Compact format: per-lot scalar fields in a small JSON header, histories as
+        raw little-endian float64 / int8 blocks (9 bytes per held day).
+        """
+        header, prices, scores = [], array(PRICE_TYPECODE), array(SCORE_TYPECODE)
+        for item in self._lots.values():
+            d = item.to_dict()
+            d.pop("daily_price")
+            d.pop("daily_score")
+            d["n_price"] = len(item.daily_price)
+            d["n_score"] = len(item.daily_score)
+            header.append(d)
+            prices.extend(item.daily_price)
+            scores.extend(item.daily_score)
+        if sys.byteorder == "big":
+            prices.byteswap()
+            scores.byteswap()
+        blob = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        atomic_write(filepath, BINARY_MAGIC + struct.pack("<I", len(blob)) + blob + prices.tobytes() + scores.tobytes())
+
+    @classmethod
+    def load_binary(cls, filepath: str) -> 'Inventory':
+        with open(filepath, "rb") as f:
+            if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError(f"Not a binary inventory file: {filepath}")
+            (size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(size).decode("utf-8"))
+            n_price = sum(d["n_price"] for d in header)
+            prices = array(PRICE_TYPECODE)
+            prices.frombytes(f.read(n_price * prices.itemsize))
+            scores = array(SCORE_TYPECODE)
+            scores.frombytes(f.read())
+        if sys.byteorder == "big":
+            prices.byteswap()
+            scores.byteswap()
+
+        items, p, s = [], 0, 0
+        for d in header:
+            n_p, n_s = d.pop("n_price"), d.pop("n_score")
+            items.append(Stuff(**d, daily_price=prices[p:p + n_p], daily_score=scores[s:s + n_s]))
+            p += n_p
+            s += n_s
+        return cls(items=items)
 
     def __repr__(self):
-        return f'Inventory({len(self.items)} items)'
\ No newline at end of file
+        return f'Inventory({len(self._lots)} items)'
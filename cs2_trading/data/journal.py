@@ -0,0 +1,163 @@
+"""Write-ahead journal + atomic snapshots for Inventory persistence."""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write `data` to `path` so readers only ever see the old or the new file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if directory and hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class InventoryJournal:
+    """
+    Inventory events appended to `<base>.journal.jsonl`, folded periodically into
+    `<base>.snapshot.json`.
+
+    Events: buy (full lot), sell (lot id), score / price (lot id, value) and meta
+    (key, value, e.g. the last completed day). Every event has a sequence number;
+    the snapshot records the last one it contains, so replay after a crash between
+    "snapshot written" and "journal truncated" never applies an event twice.
+
+    `commit()` writes the pending events followed by a commit marker
+    ({"commit": last seq, "events": count}) and fsyncs them (one fsync per day,
+    O(changes) bytes). Recovery only applies events of marked batches, so a day torn
+    anywhere in the middle of its write is dropped as a whole, never half-applied.
+    """
+    def __init__(self, base_path: str, snapshot_every: int = 30):
+        self.base_path = base_path
+        self.snapshot_path = f"{base_path}.snapshot.json"
+        self.journal_path = f"{base_path}.journal.jsonl"
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self.commits_since_snapshot = 0
+        self._pending: List[str] = []
+        # Set by read() when the journal ends in a torn record that must be compacted away
+        self.torn = False
+        self._lock = threading.Lock()
+        self._file = None
+
+    # --- writing ---------------------------------------------------------------
+
+    def append(self, op: str, **fields: Any) -> None:
+        with self._lock:
+            self.seq += 1
+            event = {"seq": self.seq, "op": op, **fields}
+            self._pending.append(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+
+    def commit(self) -> int:
+        """Durably write pending events. Returns how many were written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            if self._file is None:
+                directory = os.path.dirname(self.journal_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.journal_path, "a", encoding="utf-8")
+            count = len(self._pending)
+            marker = json.dumps({"commit": self.seq, "events": count}, separators=(",", ":"))
+            self._file.write("\n".join(self._pending) + "\n" + marker + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = []
+            self.commits_since_snapshot += 1
+            return count
+
+    def rollback(self) -> int:
+        """Drop events not yet committed (e.g. a half-run day). Returns how many were dropped."""
+        with self._lock:
+            count = len(self._pending)
+            self.seq -= count
+            self._pending = []
+            return count
+
+    def snapshot(self, items: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot with the full state, then start an empty journal."""
+        self.commit()
+        with self._lock:
+            payload = {"seq": self.seq, "meta": meta, "items": items}
+            atomic_write(self.snapshot_path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            # Events up to `seq` now live in the snapshot
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            atomic_write(self.journal_path, b"")
+            self.commits_since_snapshot = 0
+
+    def should_snapshot(self) -> bool:
+        return self.commits_since_snapshot >= self.snapshot_every
+
+    def close(self) -> None:
+        self.commit()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- recovery ----------------------------------------------------------------
+
+    def read(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        (snapshot items, snapshot meta, committed events newer than the snapshot).
+        Also advances `self.seq` so new events continue the sequence.
+        """
+        items, meta, base_seq = [], {}, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            items, meta, base_seq = snap.get("items", []), snap.get("meta", {}), snap.get("seq", 0)
+
+        events = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+            # A trailing fragment without newline is part of a torn write
+            if lines[-1]:
+                lines[-1] = ""
+                self.torn = True
+            batch = []
+            for n, line in enumerate(lines[:-1], 1):
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Corrupt journal record at {self.journal_path}:{n}: {e}") from e
+                if "commit" not in record:
+                    batch.append(record)
+                    continue
+                if record.get("events") != len(batch) or (batch and batch[-1]["seq"] != record["commit"]):
+                    raise ValueError(f"Journal commit marker at {self.journal_path}:{n} does not match its batch")
+                events.extend(e for e in batch if e["seq"] > base_seq)
+                batch = []
+            # Events after the last marker belong to a commit that never finished
+            if batch:
+                self.torn = True
+            if self.torn:
+                logger.warning(f"Dropping {len(batch)} uncommitted journal events (torn write) in {self.journal_path}")
+
+        self.seq = max([base_seq] + [e["seq"] for e in events])
+        return items, meta, events
+
+    def __repr__(self):
+        return f"InventoryJournal(base_path={self.base_path!r}, seq={self.seq})"
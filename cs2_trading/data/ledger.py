@@ -0,0 +1,266 @@
+"""Trade ledger: every buy and sell fill, with vectorised PnL and attribution queries."""
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+SIDES = ("BUY", "SELL")
+COLUMNS = ("seq", "run", "lot", "good_id", "name", "side", "day", "price", "fee", "reason")
+TRIP_COLUMNS = ("run", "lot", "good_id", "name", "buy_day", "buy_price", "buy_fee", "sell_day", "sell_price", "sell_fee",
+                "sell_reason", "fees", "realized_pnl", "mark", "unrealized_pnl", "holding_days", "return")
+
+
+class TradeLedger:
+    """
+    SQLite table of fills (run, lot, good id, name, side, day, price, fee, reason).
+
+    Queries read whole columns into pandas/numpy and work on arrays: buys and sells
+    are paired per lot into round trips, from which realised PnL, holding periods,
+    per-item attribution and held-position matrices follow without per-row Python.
+
+    Lot ids are only unique within one run (they restart at L000001), so every fill
+    carries the id of the run that made it, and a fill is unique per (run, lot, side, day).
+    Recording the same fill again (a replayed day) is a no-op; a different fill under an
+    existing key raises sqlite3.IntegrityError instead of being dropped.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fills ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " run TEXT NOT NULL DEFAULT '',"
+            " lot TEXT NOT NULL,"
+            " good_id INTEGER NOT NULL,"
+            " name TEXT,"
+            " side TEXT NOT NULL CHECK (side IN ('BUY', 'SELL')),"
+            " day TEXT NOT NULL,"
+            " price REAL NOT NULL,"
+            " fee REAL NOT NULL DEFAULT 0,"
+            " reason TEXT,"
+            " UNIQUE (run, lot, side, day))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fills_good ON fills (good_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fills_day ON fills (day)")
+        self._conn.commit()
+
+    # --- writing ---------------------------------------------------------------
+
+    def record(self, side: str, lot: str, good_id: int, name: str, day: str, price: float,
+               fee: float = 0.0, reason: Optional[str] = None, run: str = "") -> bool:
+        """Add one fill. Returns False if it was already recorded."""
+        return self.record_many([(side, lot, good_id, name, day, price, fee, reason)], run=run) == 1
+
+    def record_many(self, fills: Iterable[Sequence[Any]], run: str = "") -> int:
+        """
+        Add (side, lot, good_id, name, day, price, fee, reason) tuples of run `run` in one
+        transaction. Returns how many were new; nothing is written if one of them conflicts.
+        """
+        rows = []
+        for side, lot, good_id, name, day, price, fee, reason in fills:
+            side = side.upper()
+            if side not in SIDES:
+                raise ValueError(f"Unknown side {side!r}")
+            rows.append((run, lot, int(good_id), name, side, day[:10], float(price), float(fee), reason))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            added = 0
+            for row in rows:
+                known = self._conn.execute(
+                    "SELECT good_id, price, fee FROM fills WHERE run = ? AND lot = ? AND side = ? AND day = ?",
+                    (row[0], row[1], row[4], row[5]),
+                ).fetchone()
+                if known == (row[2], row[6], row[7]):
+                    continue
+                # A different fill under a recorded key raises IntegrityError (and rolls back)
+                self._conn.execute(
+                    "INSERT INTO fills (run, lot, good_id, name, side, day, price, fee, reason)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                added += 1
+            return added
+
+    # --- queries -----------------------------------------------------------------
+
+    def runs(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT run FROM fills ORDER BY run")]
+
+    def fills(self, side: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+              run: Optional[str] = None):
+        """Fills in recording order (pandas DataFrame), optionally filtered by side, day range and run."""
+        import pandas as pd
+
+        sql, args = f"SELECT {', '.join(COLUMNS)} FROM fills WHERE 1=1", []
+        if run is not None:
+            sql += " AND run = ?"
+            args.append(run)
+        if side:
+            sql += " AND side = ?"
+            args.append(side.upper())
+        if start:
+            sql += " AND day >= ?"
+            args.append(start)
+        if end:
+            sql += " AND day <= ?"
+            args.append(end)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY seq", args).fetchall()
+        return pd.DataFrame(rows, columns=list(COLUMNS))
+
+    def round_trips(self, marks: Optional[Dict[int, float]] = None, as_of: Optional[str] = None,
+                    run: Optional[str] = None):
+        """
+        One row per lot holding (buy paired with its sell, if any), for one run or all of them:
+        realised PnL (sale price - fees - cost), holding days and return; open lots are
+        valued at `marks[good_id]` (unrealised PnL) and held until `as_of` (default: last fill day).
+        """
+        import pandas as pd
+
+        df = self.fills(run=run)
+        if df.empty:
+            return pd.DataFrame(columns=list(TRIP_COLUMNS))
+        # Number a lot's holdings in order, so a re-used lot id pairs each sell with its own buy
+        df["trip"] = (df["side"] == "BUY").astype(int).groupby([df["run"], df["lot"]]).cumsum()
+        buys = df[df["side"] == "BUY"].set_index(["run", "lot", "trip"])
+        sells = df[df["side"] == "SELL"].set_index(["run", "lot", "trip"])
+        out = buys[["good_id", "name", "day", "price", "fee"]].rename(
+            columns={"day": "buy_day", "price": "buy_price", "fee": "buy_fee"})
+        out = out.join(sells[["day", "price", "fee", "reason"]].rename(
+            columns={"day": "sell_day", "price": "sell_price", "fee": "sell_fee", "reason": "sell_reason"}))
+        out = out.reset_index().drop(columns="trip")
+
+        closed = out["sell_day"].notna().to_numpy()
+        buy_price = out["buy_price"].to_numpy(dtype=np.float64)
+        sell_price = out["sell_price"].to_numpy(dtype=np.float64)
+        fees = out["buy_fee"].to_numpy(dtype=np.float64) + np.nan_to_num(out["sell_fee"].to_numpy(dtype=np.float64))
+        out["fees"] = fees
+        out["realized_pnl"] = np.where(closed, sell_price - fees - buy_price, 0.0)
+
+        mark = out["good_id"].map(marks or {}).to_numpy(dtype=np.float64)
+        out["mark"] = np.where(closed, np.nan, mark)
+        out["unrealized_pnl"] = np.where(closed, 0.0, np.nan_to_num(mark - buy_price))
+
+        as_of = as_of or df["day"].max()
+        end = np.where(closed, out["sell_day"].fillna(as_of), as_of).astype("datetime64[D]")
+        out["holding_days"] = (end - out["buy_day"].to_numpy().astype("datetime64[D]")).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["return"] = np.where(closed, out["realized_pnl"] / buy_price, out["unrealized_pnl"] / buy_price)
+        return out
+
+    def realized_pnl(self, by: Optional[str] = None, run: Optional[str] = None):
+        """Total realised PnL, or a Series grouped by a round-trip column ("good_id", "name", "sell_day", "run", ...)."""
+        trips = self.round_trips(run=run)
+        if by is None:
+            return float(trips["realized_pnl"].sum()) if len(trips) else 0.0
+        return trips.groupby(by)["realized_pnl"].sum()
+
+    def holding_periods(self, closed_only: bool = True, run: Optional[str] = None):
+        """Distribution of holding days (pandas describe())."""
+        trips = self.round_trips(run=run)
+        if closed_only:
+            trips = trips[trips["sell_day"].notna()]
+        return trips["holding_days"].describe()
+
+    def attribution(self, marks: Optional[Dict[int, float]] = None, by: str = "name", run: Optional[str] = None):
+        """
+        Per-item PnL contribution: lots, capital deployed, realised and unrealised PnL
+        (open lots at `marks[good_id]`), total and share of the overall PnL.
+        """
+        trips = self.round_trips(marks, run=run)
+        if trips.empty:
+            return trips
+        trips["closed"] = trips["sell_day"].notna()
+        out = trips.groupby(by).agg(
+            lots=("lot", "size"),
+            closed=("closed", "sum"),
+            cost=("buy_price", "sum"),
+            fees=("fees", "sum"),
+            realized_pnl=("realized_pnl", "sum"),
+            unrealized_pnl=("unrealized_pnl", "sum"),
+            mean_holding_days=("holding_days", "mean"),
+        )
+        out["total_pnl"] = out["realized_pnl"] + out["unrealized_pnl"]
+        out["return"] = out["total_pnl"] / out["cost"]
+        total = out["total_pnl"].abs().sum()
+        out["share"] = out["total_pnl"] / total if total else 0.0
+        return out.sort_values("total_pnl")
+
+    def positions(self, dates: Sequence[str], run: Optional[str] = None):
+        """
+        Lots of each good held at the close of every date (DataFrame, dates x good_id).
+        A lot counts from its buy day up to the day before its sale.
+        """
+        import pandas as pd
+
+        trips = self.round_trips(run=run)
+        days = np.asarray(dates, dtype="datetime64[D]")
+        goods = np.sort(trips["good_id"].unique()) if len(trips) else np.array([], dtype=np.int64)
+        grid = np.zeros((len(days) + 1, len(goods)))
+        if len(trips):
+            col = np.searchsorted(goods, trips["good_id"].to_numpy())
+            start = np.searchsorted(days, trips["buy_day"].to_numpy().astype("datetime64[D]"), side="left")
+            sell = trips["sell_day"].fillna("9999-12-31").to_numpy().astype("datetime64[D]")
+            stop = np.searchsorted(days, sell, side="left")
+            # +1 when a lot opens, -1 when it is sold; a cumulative sum gives the holdings
+            np.add.at(grid, (start, col), 1.0)
+            np.add.at(grid, (stop, col), -1.0)
+        held = np.cumsum(grid, axis=0)[:-1]
+        return pd.DataFrame(held, index=pd.Index(list(dates), name="date"), columns=goods)
+
+    def equal_weight_index(self, prices, run: Optional[str] = None):
+        """
+        Counterfactual: equal money in every item the strategy held, rebalanced daily.
+
+        prices: DataFrame (dates x good_id), e.g. built from `InfoAPI.get_prices`.
+        Returns a Series starting at 100; each day's return is the mean return of the
+        goods held at the previous close.
+        """
+        held = self.positions(list(prices.index), run=run).reindex(columns=prices.columns, fill_value=0.0)
+        returns = prices.pct_change(fill_method=None)
+        mask = held.shift(1).fillna(0.0).to_numpy() > 0
+        daily = returns.where(mask).mean(axis=1).fillna(0.0)
+        return (1 + daily).cumprod() * 100
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT side, COUNT(*) FROM fills GROUP BY side").fetchall())
+        return {"buys": rows.get("BUY", 0), "sells": rows.get("SELL", 0)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return f"TradeLedger(path={self.path!r})"
+
+
+_LEDGERS: Dict[str, TradeLedger] = {}
+_LEDGERS_LOCK = threading.Lock()
+
+
+def open_ledger(path: str) -> TradeLedger:
+    key = os.path.abspath(path)
+    with _LEDGERS_LOCK:
+        ledger = _LEDGERS.get(key)
+        if ledger is None:
+            ledger = TradeLedger(path)
+            _LEDGERS[key] = ledger
+        return ledger
+
+
+def ledger_from_env() -> Optional[TradeLedger]:
+    """TRADE_LEDGER_PATH selects the sqlite file (unset = no ledger)."""
+    path = os.getenv("TRADE_LEDGER_PATH")
+    if not path or path.lower() in ("off", "none", "0"):
+        return None
+    return open_ledger(path)
@@ -0,0 +1,255 @@
+"""Persistent per-item daily price history, read before hitting the chart API."""
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "cs2_trading/res/price_history.sqlite"
+
+
+def to_epoch_days(dates: Sequence[str]) -> np.ndarray:
+    """ISO date strings -> int64 days since 1970-01-01."""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def from_epoch_days(days: np.ndarray) -> list:
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype(str).tolist()
+
+
+class PriceSeries:
+    """
+    One item's daily prices as parallel sorted arrays (epoch days, price).
+    As-of lookups are a binary search: the price on the last day <= the requested
+    day, clamped to the first/last known price outside the covered range.
+    """
+    __slots__ = ("days", "prices")
+
+    def __init__(self, days: np.ndarray, prices: np.ndarray):
+        self.days = np.asarray(days, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(np.empty(0, np.int64), np.empty(0, np.float64))
+
+    @classmethod
+    def from_map(cls, price_map: Dict[str, float]) -> "PriceSeries":
+        if not price_map:
+            return cls.empty()
+        days = to_epoch_days(list(price_map))
+        prices = np.fromiter(price_map.values(), dtype=np.float64, count=len(price_map))
+        order = np.argsort(days, kind="stable")
+        return cls(days[order], prices[order])
+
+    @classmethod
+    def from_chart(cls, timestamps_ms: Sequence[float], prices: Sequence[float]) -> "PriceSeries":
+        """
+        Chart points (millisecond timestamps) -> one price per local calendar day,
+        the last point of a day winning, as the old per-point fromtimestamp loop did.
+        """
+        n = min(len(timestamps_ms), len(prices))
+        if n == 0:
+            return cls.empty()
+        secs = np.asarray(timestamps_ms[:n], dtype=np.float64) / 1000.0
+        values = np.asarray(prices[:n], dtype=np.float64)
+        # Local calendar days from each point's own UTC offset: equal offsets at both ends
+        # do not mean no DST change in between (a series spanning a whole summer)
+        offsets = np.array([time.localtime(t).tm_gmtoff for t in secs], dtype=np.float64)
+        days = np.floor((secs + offsets) / 86400.0).astype(np.int64)
+        # Keep the last point of each day
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        keep = np.append(days[1:] != days[:-1], True)
+        return cls(days[keep], values[keep])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def last_day(self) -> Optional[str]:
+        return from_epoch_days(self.days[-1:])[0] if len(self.days) else None
+
+    def asof(self, day: int) -> float:
+        """Price for one epoch day (0.0 if the series is empty)."""
+        if not len(self.days):
+            return 0.0
+        i = np.searchsorted(self.days, day, side="right") - 1
+        return float(self.prices[max(i, 0)])
+
+    def asof_many(self, days: np.ndarray) -> np.ndarray:
+        """Vectorised `asof`; NaN for every day if the series is empty."""
+        days = np.asarray(days, dtype=np.int64)
+        if not len(self.days):
+            return np.full(days.shape, np.nan)
+        idx = np.searchsorted(self.days, days, side="right") - 1
+        return self.prices[np.clip(idx, 0, None)]
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Union of both series; `other` wins on overlapping days."""
+        if not len(self.days):
+            return other
+        if not len(other.days):
+            return self
+        days = np.concatenate([self.days, other.days])
+        prices = np.concatenate([self.prices, other.prices])
+        # Stable sort keeps `other` after `self` within a day, then keep the last of each day
+        order = np.argsort(days, kind="stable")
+        days, prices = days[order], prices[order]
+        keep = np.append(days[1:] != days[:-1], True)
+        return PriceSeries(days[keep], prices[keep])
+
+    def to_map(self) -> Dict[str, float]:
+        return dict(zip(from_epoch_days(self.days), self.prices.tolist()))
+
+    def __repr__(self):
+        return f"PriceSeries({len(self)} days, last={self.last_day})"
+
+
+class PriceStore:
+    """
+    SQLite store of (good_id, day) -> price plus per-series metadata.
+
+    - `series` remembers the covered day range and when the series was last fetched,
+      so callers can tell stale-but-usable data from missing data.
+    - Days are ISO strings (YYYY-MM-DD), so lexical order is date order.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " good_id INTEGER NOT NULL,"
+            " day TEXT NOT NULL,"
+            " price REAL NOT NULL,"
+            " PRIMARY KEY (good_id, day)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS series ("
+            " good_id INTEGER PRIMARY KEY,"
+            " first_day TEXT,"
+            " last_day TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self, good_id: int) -> Dict[str, float]:
+        """All stored days for one item, in date order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, price FROM prices WHERE good_id = ? ORDER BY day", (int(good_id),)
+            ).fetchall()
+        return dict(rows)
+
+    def load_series(self, good_id: int) -> PriceSeries:
+        """Stored history of one item as a PriceSeries."""
+        price_map = self.load(good_id)
+        return PriceSeries.from_map(price_map)
+
+    def meta(self, good_id: int) -> Optional[Tuple[str, str, float]]:
+        """(first_day, last_day, fetched_at) or None if the item was never stored."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT first_day, last_day, fetched_at FROM series WHERE good_id = ?", (int(good_id),)
+            ).fetchone()
+
+    def staleness(self, good_id: int) -> Optional[float]:
+        """Seconds since the series was last refreshed from the API."""
+        meta = self.meta(good_id)
+        return None if meta is None else time.time() - meta[2]
+
+    def put_series(self, good_id: int, price_map: Dict[str, float], fetched_at: Optional[float] = None) -> None:
+        """Upsert days for one item and extend its covered range."""
+        good_id = int(good_id)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prices (good_id, day, price) VALUES (?, ?, ?)",
+                [(good_id, day, float(price)) for day, price in price_map.items()],
+            )
+            first, last = self._conn.execute(
+                "SELECT MIN(day), MAX(day) FROM prices WHERE good_id = ?", (good_id,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO series (good_id, first_day, last_day, fetched_at) VALUES (?, ?, ?, ?)",
+                (good_id, first, last, fetched_at),
+            )
+            self._conn.commit()
+
+    def items(self) -> Iterable[int]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT good_id FROM series ORDER BY good_id")]
+
+    def import_file(self, path: str) -> int:
+        """
+        Bulk warm-up. Accepts
+        - CSV with columns good_id, date (or day), price
+        - JSON {good_id: {date: price}}
+        Imported series are marked as fetched now. Returns the number of rows imported.
+        """
+        series: Dict[int, Dict[str, float]] = {}
+        if path.endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    day = row.get("date") or row.get("day")
+                    series.setdefault(int(row["good_id"]), {})[day] = float(row["price"])
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for good_id, price_map in json.load(f).items():
+                    series[int(good_id)] = {day: float(p) for day, p in price_map.items()}
+
+        for good_id, price_map in series.items():
+            self.put_series(good_id, price_map)
+        rows = sum(len(m) for m in series.values())
+        logger.info(f"Imported {rows} prices for {len(series)} items from {path}")
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            items = self._conn.execute("SELECT COUNT(*) FROM series").fetchone()[0]
+            rows = self._conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        return {"items": items, "rows": rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return f"PriceStore(path={self.path!r})"
+
+
+_STORES: Dict[str, PriceStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_price_store(path: str) -> PriceStore:
+    key = os.path.abspath(path)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = PriceStore(path)
+            _STORES[key] = store
+        return store
+
+
+def price_store_from_env() -> Optional[PriceStore]:
+    """
+    PRICE_STORE_PATH selects the sqlite file (default: cs2_trading/res/price_history.sqlite);
+    set it to "off" to keep price history in memory only.
+    """
+    path = os.getenv("PRICE_STORE_PATH", DEFAULT_PATH)
+    if not path or path.lower() in ("off", "none", "0"):
+        return None
+    return open_price_store(path)
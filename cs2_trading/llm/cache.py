@@ -0,0 +1,161 @@
+"""Content-addressed on-disk cache for LLM responses."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(payload: Dict[str, Any]) -> str:
+    """
+    Stable SHA-256 of a JSON-serialisable request description.
+    Keys are sorted so dict ordering never changes the hash.
+    """
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache shared by every LLMWrapper pointing at the same file.
+
+    - Entries are keyed by `make_key(...)` of the full request (provider, model, messages, temperature, tools).
+    - When the stored payload exceeds `max_bytes`, least recently used entries are evicted.
+    - `read_only=True` serves hits but never writes (e.g. when replaying a frozen cache on CI).
+    """
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024, read_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"LLM cache not found: {path}")
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+            self._conn.commit()
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._bytes = int(row[0])
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.read_only:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        if self.read_only:
+            return
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Drop least recently used entries until we are back under budget.
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall()
+        victims = []
+        for key, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        logger.info(f"LLM cache evicted {len(victims)} entries ({self._bytes} bytes remaining)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "bytes": self._bytes,
+        }
+
+    def clear(self) -> None:
+        if self.read_only:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return f"ResponseCache(path={self.path!r}, hits={self.hits}, misses={self.misses}, read_only={self.read_only})"
+
+
+# One cache object per file so all agents share a connection and the same counters.
+_CACHES: Dict[str, ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def open_cache(path: str, max_bytes: Optional[int] = None, read_only: bool = False) -> ResponseCache:
+    key = os.path.abspath(path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            kwargs = {"read_only": read_only}
+            if max_bytes is not None:
+                kwargs["max_bytes"] = max_bytes
+            cache = ResponseCache(path, **kwargs)
+            _CACHES[key] = cache
+        return cache
+
+
+def cache_from_env() -> Optional[ResponseCache]:
+    """
+    Opt-in via environment:
+    - LLM_CACHE_PATH: sqlite file to use (unset = caching disabled)
+    - LLM_CACHE_MAX_MB: eviction threshold in megabytes
+    - LLM_CACHE_READ_ONLY: "1"/"true" to never write
+    """
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    max_mb = os.getenv("LLM_CACHE_MAX_MB")
+    read_only = os.getenv("LLM_CACHE_READ_ONLY", "").lower() in ("1", "true", "yes")
+    return open_cache(path, max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None, read_only=read_only)
@@ -0,0 +1,149 @@
+"""Per-call LLM instrumentation: latency, tokens, retries and cost, tagged by agent and step."""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+
+# Set by DailyStrategy around each step of run_daily_cycle; propagated into
+# worker threads by asyncio.to_thread / run_sync.
+_current_step: ContextVar[Optional[str]] = ContextVar("llm_step", default=None)
+_current_day: ContextVar[Optional[str]] = ContextVar("llm_day", default=None)
+
+# Approximate list prices in USD per 1M tokens: (input, output). Thinking tokens bill as output.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-3-pro-preview": (2.00, 12.00),
+    "gemini-3-flash-preview": (0.50, 3.00),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "qwen-plus": (0.40, 1.20),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+def set_model_price(model: str, input_per_m: float, output_per_m: float) -> None:
+    MODEL_PRICES[model] = (input_per_m, output_per_m)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, thinking_tokens: int = 0) -> float:
+    """USD for one call; `completion_tokens` excludes thinking (see wrapper.openai_usage / gemini_usage)."""
+    price = MODEL_PRICES.get(model)
+    if price is None:
+        return 0.0
+    return (prompt_tokens * price[0] + (completion_tokens + thinking_tokens) * price[1]) / 1_000_000
+
+
+def set_llm_step(step: Optional[str], day: Optional[str] = None) -> None:
+    """Non-scoped variant of `llm_step` for straight-line code such as run_daily_cycle."""
+    _current_step.set(step)
+    if day is not None:
+        _current_day.set(day)
+
+
+@contextmanager
+def llm_step(step: str, day: Optional[str] = None):
+    """Tag every LLM call made inside the block with `step` (and `day`)."""
+    step_token = _current_step.set(step)
+    day_token = _current_day.set(day) if day is not None else None
+    try:
+        yield
+    finally:
+        _current_step.reset(step_token)
+        if day_token is not None:
+            _current_day.reset(day_token)
+
+
+@dataclass
+class CallRecord:
+    agent: str
+    provider: str
+    model: str
+    latency_s: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    thinking_tokens: int = 0
+    retries: int = 0
+    backoff_s: float = 0.0
+    wait_s: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+    cost_usd: float = 0.0
+    step: Optional[str] = field(default_factory=_current_step.get)
+    day: Optional[str] = field(default_factory=_current_day.get)
+    ts: float = field(default_factory=time.time)
+
+
+class LLMMetrics:
+    """
+    Thread-safe collector of CallRecords. If `sink_path` is set (or LLM_METRICS_PATH),
+    every record is also appended to that JSONL file as it happens.
+    """
+    def __init__(self, sink_path: Optional[str] = None):
+        self.records: List[CallRecord] = []
+        self.sink_path = sink_path
+        self._lock = threading.Lock()
+
+    def set_sink(self, path: Optional[str]) -> None:
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.sink_path = path
+
+    def record(self, rec: CallRecord) -> None:
+        with self._lock:
+            self.records.append(rec)
+            if self.sink_path:
+                with open(self.sink_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(rec), ensure_ascii=False) + "\n")
+
+    def export_jsonl(self, path: str) -> None:
+        with self._lock:
+            rows = [asdict(r) for r in self.records]
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def summary(self, day: Optional[str] = None, by: Tuple[str, ...] = ("day", "agent", "step")):
+        """
+        Aggregate table (pandas DataFrame) of calls, latency, tokens, retries and cost.
+        Sorted by total latency so the dominant agent/step is on top.
+        """
+        import pandas as pd
+
+        with self._lock:
+            rows = [asdict(r) for r in self.records if day is None or r.day == day]
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows)
+        df[list(by)] = df[list(by)].fillna("-")
+        out = df.groupby(list(by)).agg(
+            calls=("latency_s", "size"),
+            cached=("cached", "sum"),
+            errors=("error", "count"),
+            latency_s=("latency_s", "sum"),
+            mean_latency_s=("latency_s", "mean"),
+            prompt_tokens=("prompt_tokens", "sum"),
+            completion_tokens=("completion_tokens", "sum"),
+            thinking_tokens=("thinking_tokens", "sum"),
+            retries=("retries", "sum"),
+            backoff_s=("backoff_s", "sum"),
+            wait_s=("wait_s", "sum"),
+            cost_usd=("cost_usd", "sum"),
+        )
+        return out.sort_values("latency_s", ascending=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records = []
+
+
+_METRICS = LLMMetrics(sink_path=os.getenv("LLM_METRICS_PATH"))
+
+
+def get_metrics() -> LLMMetrics:
+    """Process-wide collector used by every LLMWrapper."""
+    return _METRICS
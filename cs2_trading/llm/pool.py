@@ -0,0 +1,70 @@
+"""Process-wide registry of provider SDK clients."""
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Both the OpenAI client (httpx connection pool) and the google-genai client are
+# safe to share between threads, so every wrapper talking to the same endpoint
+# with the same credentials reuses one client and its keep-alive/TLS sessions.
+_CLIENTS: Dict[Tuple[str, str, Optional[str]], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+OPENAI_COMPATIBLE = ["openai", "qwen", "deepseek", "aliyun"]
+
+
+def _fingerprint(secret: str) -> str:
+    # Never keep raw keys in the registry key
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+def get_client(provider: str) -> Any:
+    """
+    Shared SDK client for `provider`, keyed by SDK family, credentials and endpoint.
+    The model is chosen per request, so all models on one endpoint share a client.
+    """
+    provider = provider.lower()
+    if provider in OPENAI_COMPATIBLE:
+        api_key = os.getenv("OPENAI_API_KEY")
+        base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE_URL")
+        if not api_key:
+            raise ValueError(f"API Key not found for provider {provider}")
+        key = ("openai", _fingerprint(api_key), base_url)
+    elif provider == "gemini":
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found")
+        key = ("gemini", _fingerprint(api_key), None)
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _build_client(key[0], api_key, base_url if key[0] == "openai" else None)
+            _CLIENTS[key] = client
+        return client
+
+
+def _build_client(family: str, api_key: str, base_url: Optional[str]) -> Any:
+    if family == "openai":
+        from openai import OpenAI
+        return OpenAI(api_key=api_key, base_url=base_url)
+
+    # Use new google-genai SDK for Gemini 3+ support
+    try:
+        from google import genai
+    except ImportError:
+        raise ImportError("Please install `google-genai` package: pip install google-genai")
+    return genai.Client(api_key=api_key)
+
+
+def clear_clients() -> None:
+    """Drop all pooled clients (e.g. after rotating API keys)."""
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+
+
+def pool_size() -> int:
+    with _CLIENTS_LOCK:
+        return len(_CLIENTS)
@@ -0,0 +1,119 @@
+"""Record LLM exchanges to JSONL and serve them back offline."""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from cs2_trading.llm.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+
+def message_hash(messages: List[Dict[str, str]]) -> str:
+    """
+    Replay key: only the conversation, so a log recorded against one provider
+    can be replayed by any other (including the `replay` provider).
+    """
+    return make_key({"messages": messages})
+
+
+class ExchangeRecorder:
+    """
+    Appends one JSON line per successful chat exchange.
+    Safe to share between wrappers/threads; each line is flushed immediately.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, provider: str, model: str, messages: List[Dict[str, str]], temperature: float, response: str) -> None:
+        line = json.dumps({
+            "key": message_hash(messages),
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "response": response,
+            "ts": time.time(),
+        }, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class ReplayLog:
+    """
+    Serves recorded responses keyed by `message_hash`.
+
+    If the same conversation was recorded several times, answers are returned in
+    recorded order; once exhausted the last one keeps being returned, so replays
+    are deterministic no matter how often a run is repeated.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._responses: Dict[str, List[str]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        with open(path, "r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed replay line {lineno} in {path}")
+                    continue
+                key = rec.get("key") or message_hash(rec["messages"])
+                self._responses[key].append(rec["response"])
+
+    def get(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        key = message_hash(messages)
+        with self._lock:
+            answers = self._responses.get(key)
+            if not answers:
+                self.misses += 1
+                return None
+            idx = self._cursor[key]
+            self._cursor[key] = idx + 1
+            self.hits += 1
+            return answers[min(idx, len(answers) - 1)]
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._cursor.clear()
+
+    def __len__(self):
+        return sum(len(v) for v in self._responses.values())
+
+
+# Shared per file so every agent replaying the same log advances the same cursors
+# and every recorder appends through the same lock.
+_LOGS: Dict[str, ReplayLog] = {}
+_RECORDERS: Dict[str, ExchangeRecorder] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def open_replay(path: str) -> ReplayLog:
+    key = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        if key not in _LOGS:
+            _LOGS[key] = ReplayLog(path)
+        return _LOGS[key]
+
+
+def open_recorder(path: str) -> ExchangeRecorder:
+    key = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        if key not in _RECORDERS:
+            _RECORDERS[key] = ExchangeRecorder(path)
+        return _RECORDERS[key]
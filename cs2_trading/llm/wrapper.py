@@ -1,135 +1,303 @@
 import os
 import time
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any, Union
-from openai import OpenAI
+from typing import Optional, List, Dict, Any, Tuple, Union
+from cs2_trading.llm.cache import ResponseCache, cache_from_env, make_key
+from cs2_trading.llm.metrics import CallRecord, estimate_cost, get_metrics
+from cs2_trading.llm.pool import OPENAI_COMPATIBLE, get_client
+from cs2_trading.llm.replay import open_recorder, open_replay
+from cs2_trading.utils.ratelimit import get_limiter
 
 # Configure logging for LLM wrapper
 logger = logging.getLogger(__name__)
 
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Cheap token estimate used for TPM budgeting and prompt-size reporting.
+    Mixed Chinese/English prompts average roughly 3 characters per token.
+    """
+    return sum(len(m.get("content") or "") for m in messages) // 3 + 4 * len(messages)
+
+def openai_usage(usage: Any) -> Dict[str, int]:
+    """
+    Token counts from an OpenAI-style `usage`. Its completion_tokens already include
+    the reasoning tokens, so they are split out to match Gemini's separate count.
+    """
+    if usage is None:
+        return {}
+    details = getattr(usage, "completion_tokens_details", None)
+    thinking = (getattr(details, "reasoning_tokens", 0) or 0) if details else 0
+    completion = usage.completion_tokens or 0
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": max(0, completion - thinking),
+        "thinking_tokens": thinking,
+    }
+
+
+def gemini_usage(meta: Any) -> Dict[str, int]:
+    """Token counts from Gemini `usage_metadata`; thoughts are reported apart from the candidates."""
+    if meta is None:
+        return {}
+    return {
+        "prompt_tokens": meta.prompt_token_count or 0,
+        "completion_tokens": meta.candidates_token_count or 0,
+        "thinking_tokens": getattr(meta, "thoughts_token_count", 0) or 0,
+    }
+
+
 class LLMWrapper:
     """
     A unified wrapper for different LLM providers (OpenAI, Qwen, Gemini, etc.).
     Allows switching models and providers easily.
     """
-    def __init__(self, provider: str = "openai", model: str = "gpt-3.5-turbo", **kwargs):
+    def __init__(self, provider: str = "openai", model: str = "gpt-3.5-turbo", cache: Optional[ResponseCache] = None,
+                 record_path: Optional[str] = None, replay_path: Optional[str] = None, label: Optional[str] = None, **kwargs):
         self.provider = provider.lower()
         self.model = model
         self.client = None
         self.kwargs = kwargs
+        # Name of the owning agent, used to tag metrics records
+        self.label = label
+        # Opt-in response cache: explicit argument wins, otherwise LLM_CACHE_PATH
+        self.cache = cache if cache is not None else cache_from_env()
+
+        # Recording appends every exchange to JSONL; replay serves them back offline.
+        # LLM_REPLAY_PATH turns every wrapper into a replayer while keeping its nominal
+        # provider, so provider-specific agent branches behave exactly as when recorded.
+        record_path = record_path or os.getenv("LLM_RECORD_PATH")
+        replay_path = replay_path or os.getenv("LLM_REPLAY_PATH")
+        self.recorder = open_recorder(record_path) if record_path else None
+        self.replay = None
+        if self.provider == "replay" or replay_path:
+            if not replay_path:
+                raise ValueError("Replay provider requires replay_path or LLM_REPLAY_PATH")
+            self.replay = open_replay(replay_path)
+            # Never record what we are replaying.
+            self.recorder = None
+
+        # Shared per upstream, so all agents on the same provider draw from one quota.
+        self.limiter = None
+        if self.replay is None:
+            self.limiter = get_limiter("openai" if self.provider in OPENAI_COMPATIBLE else self.provider)
         
         self._setup_client()
 
     def _setup_client(self):
-        if self.provider in ["openai", "qwen", "deepseek", "aliyun"]:
-            # All these support the OpenAI SDK format
-            api_key = os.getenv("OPENAI_API_KEY")
-            base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE_URL")
-            
-            if not api_key:
-                raise ValueError(f"API Key not found for provider {self.provider}")
-                
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
-            
-        elif self.provider == "gemini":
-            # Use new google-genai SDK for Gemini 3+ support
-            try:
-                from google import genai
-            except ImportError:
-                raise ImportError("Please install `google-genai` package: pip install google-genai")
-                
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY not found")
-            
-            self.client = genai.Client(api_key=api_key)
-            
+        if self.replay is not None:
+            # Offline: no keys, no SDK client, no network.
+            return
+
+        if self.provider in OPENAI_COMPATIBLE or self.provider == "gemini":
+            # One pooled, thread-safe SDK client per endpoint/credentials; constructing
+            # many wrappers (agents, sweep strategies) no longer opens new connection pools.
+            self.client = get_client(self.provider)
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_retries: int = 5) -> str:
+    def cache_key(self, messages: List[Dict[str, str]], temperature: float, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Content address of a request: everything that can change the model's answer.
+        """
+        payload = {
+            "provider": self.provider,
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "tools": self.kwargs,
+        }
+        if response_schema is not None:
+            payload["response_schema"] = response_schema
+        return make_key(payload)
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_retries: int = 5,
+             response_schema: Optional[Dict[str, Any]] = None) -> str:
         """
-        Unified chat interface with retry logic for 429 errors.
+        Unified chat interface with retry logic for 429/503 errors.
+        Successful answers are served from / stored to `self.cache` when one is configured.
+        Pacing is delegated to the shared per-provider rate limiter; there are no fixed sleeps.
+        If `response_schema` (a JSON schema dict) is given, the provider is asked for
+        constrained JSON output matching it.
         """
+        start = time.perf_counter()
+        stats = {"retries": 0, "backoff_s": 0.0, "wait_s": 0.0}
+
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(messages, temperature, response_schema)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record_call(start, stats, cached=True)
+                return cached
+
         backoff = 2
+        tokens = estimate_tokens(messages)
         
         for attempt in range(max_retries):
             try:
-                if self.provider in ["openai", "qwen", "deepseek", "aliyun"]:
-                    completion = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=temperature,
-                        **self.kwargs
-                    )
-                    return completion.choices[0].message.content
-
-                elif self.provider == "gemini":
-                    from google.genai import types
-                    
-                    contents = []
-                    system_instruction = None
-                    
-                    for msg in messages:
-                        if msg['role'] == 'system':
-                            system_instruction = msg['content']
-                        elif msg['role'] == 'user':
-                            contents.append(types.Content(role="user", parts=[types.Part.from_text(text=msg['content'])]))
-                        elif msg['role'] == 'assistant':
-                            contents.append(types.Content(role="model", parts=[types.Part.from_text(text=msg['content'])]))
-                    
-                    config_kwargs = {
-                        "temperature": temperature,
-                    }
-                    
-                    if system_instruction:
-                        config_kwargs["system_instruction"] = system_instruction
-                        
-                    # Apply thinking config for Gemini 3 models
-                    if "gemini-3" in self.model:
-                        config_kwargs["thinking_config"] = types.ThinkingConfig(thinking_level="medium")
-                    
-                    # Enable search if requested
-                    if self.kwargs.get("enable_search"):
-                        config_kwargs["tools"] = [types.Tool(google_search=types.GoogleSearch())]
-
-                    response = self.client.models.generate_content(
-                        model=self.model,
-                        contents=contents,
-                        config=types.GenerateContentConfig(**config_kwargs)
-                    )
-                    
-                    return response.text
-
+                if self.limiter is not None:
+                    stats["wait_s"] += self.limiter.acquire(tokens)
+                content, usage = self._complete(messages, temperature, response_schema)
+                if self.limiter is not None:
+                    self.limiter.on_success()
+                if key is not None and isinstance(content, str):
+                    self.cache.put(key, content)
+                if self.recorder is not None and isinstance(content, str):
+                    self.recorder.record(self.provider, self.model, messages, temperature, content)
+                self._record_call(start, stats, usage=usage)
+                return content
             
             except Exception as e:
                 error_str = str(e).lower()
-                if "429" in error_str or "resource exhausted" in error_str or "quota" in error_str:
+                if any(marker in error_str for marker in ("429", "resource exhausted", "quota", "503", "unavailable", "overloaded")):
                     wait_time = backoff * (2 ** attempt)
-                    logger.warning(f"LLM Rate Limit (429). Retrying in {wait_time}s... (Attempt {attempt+1}/{max_retries})")
-                    print(f"LLM Rate Limit (429). Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
+                    stats["retries"] += 1
+                    stats["backoff_s"] += wait_time
+                    logger.warning(f"LLM Rate Limit (429/503). Retrying in {wait_time}s... (Attempt {attempt+1}/{max_retries})")
+                    print(f"LLM Rate Limit (429/503). Retrying in {wait_time}s...")
+                    # The limiter pauses every caller on this provider and lowers the rate;
+                    # the wait happens in the next acquire().
+                    if self.limiter is not None:
+                        self.limiter.on_throttle(wait_time)
+                    else:
+                        time.sleep(wait_time)
                     continue
                 else:
                     logger.error(f"LLM Error: {e}")
+                    self._record_call(start, stats, error=str(e))
                     return f"[LLM Error]: {str(e)}"
         
+        self._record_call(start, stats, error="max retries exceeded")
         return "[LLM Error]: Max retries exceeded."
 
+    def _record_call(self, start: float, stats: Dict[str, Any], usage: Optional[Dict[str, int]] = None,
+                     cached: bool = False, error: Optional[str] = None) -> None:
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        thinking_tokens = usage.get("thinking_tokens", 0)
+        get_metrics().record(CallRecord(
+            agent=self.label or self.provider,
+            provider=self.provider,
+            model=self.model,
+            latency_s=time.perf_counter() - start,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            thinking_tokens=thinking_tokens,
+            retries=stats["retries"],
+            backoff_s=stats["backoff_s"],
+            wait_s=stats["wait_s"],
+            cached=cached,
+            error=error,
+            # Cached and replayed answers cost nothing
+            cost_usd=0.0 if cached or self.replay is not None else estimate_cost(self.model, prompt_tokens, completion_tokens, thinking_tokens),
+        ))
+
+    def _complete(self, messages: List[Dict[str, str]], temperature: float,
+                  response_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Single provider round-trip. Raises on failure; retries are handled by `chat`.
+        Returns (text, token usage).
+        """
+        if self.replay is not None:
+            content = self.replay.get(messages)
+            if content is None:
+                raise LookupError(f"No recorded exchange for this conversation in {self.replay.path}")
+            return content, {}
+
+        if self.provider in OPENAI_COMPATIBLE:
+            extra = {}
+            if response_schema is not None:
+                if self.provider == "openai":
+                    extra["response_format"] = {
+                        "type": "json_schema",
+                        "json_schema": {"name": "response", "schema": response_schema},
+                    }
+                else:
+                    # Qwen/DeepSeek compatible endpoints only offer plain JSON mode;
+                    # the prompt itself describes the expected structure.
+                    extra["response_format"] = {"type": "json_object"}
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                **extra,
+                **self.kwargs
+            )
+            return completion.choices[0].message.content, openai_usage(getattr(completion, "usage", None))
+
+        elif self.provider == "gemini":
+            from google.genai import types
+            
+            contents = []
+            system_parts = []
+            
+            for msg in messages:
+                if msg['role'] == 'system':
+                    # Agents may carry several system messages (e.g. role prompt + a
+                    # kill_and_reborn summary); Gemini takes a single instruction.
+                    system_parts.append(msg['content'])
+                elif msg['role'] == 'user':
+                    contents.append(types.Content(role="user", parts=[types.Part.from_text(text=msg['content'])]))
+                elif msg['role'] == 'assistant':
+                    contents.append(types.Content(role="model", parts=[types.Part.from_text(text=msg['content'])]))
+            
+            config_kwargs = {
+                "temperature": temperature,
+            }
+            
+            if system_parts:
+                config_kwargs["system_instruction"] = "\n\n".join(system_parts)
+                
+            # Apply thinking config for Gemini 3 models
+            if "gemini-3" in self.model:
+                config_kwargs["thinking_config"] = types.ThinkingConfig(thinking_level="medium")
+            
+            # Enable search if requested
+            if self.kwargs.get("enable_search"):
+                config_kwargs["tools"] = [types.Tool(google_search=types.GoogleSearch())]
+
+            if response_schema is not None:
+                config_kwargs["response_mime_type"] = "application/json"
+                config_kwargs["response_json_schema"] = response_schema
+
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=types.GenerateContentConfig(**config_kwargs)
+            )
+            
+            return response.text, gemini_usage(getattr(response, "usage_metadata", None))
+
+    async def achat(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_retries: int = 5,
+                    response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Asyncio variant of `chat`. The SDK call runs on a worker thread, so many
+        requests can be in flight while the shared rate limiter still paces them.
+        """
+        return await asyncio.to_thread(self.chat, messages, temperature, max_retries, response_schema)
+
     def simple_ask(self, prompt: str) -> str:
         """
         Helper for single-turn prompt.
         """
         return self.chat([{"role": "user", "content": prompt}])
 
+    async def asimple_ask(self, prompt: str) -> str:
+        return await self.achat([{"role": "user", "content": prompt}])
+
 # Factory/Helper to get the default configured LLM
-def get_llm(model_name: str = None) -> LLMWrapper:
+def get_llm(model_name: str = None, cache: Optional[ResponseCache] = None, label: Optional[str] = None, **llm_kwargs) -> LLMWrapper:
     """
     Returns an LLM instance based on environment or arguments.
     Default logic:
     - If model_name contains 'qwen', use aliyun provider.
     - If model_name contains 'gemini', use gemini provider.
+    - If model_name is 'replay', serve recorded exchanges from LLM_REPLAY_PATH.
     - Else default to openai/env settings.
+    Extra `llm_kwargs` (e.g. enable_search=True) are passed to the wrapper.
     """
     # Default from env if not specified
     if not model_name:
@@ -138,12 +306,15 @@ def get_llm(model_name: str = None) -> LLMWrapper:
     provider = "openai" # Default SDK
     kwargs = {}
     
-    if "qwen" in model_name.lower():
+    if model_name.lower() == "replay":
+        provider = "replay"
+    elif "qwen" in model_name.lower():
         provider = "aliyun"
     elif "gemini" in model_name.lower():
         provider = "gemini"
         # Only enable search if explicitly requested or for specific agents/models if needed.
         # Disabling default search for all Gemini models to prevent initialization errors in agents that don't need it.
         # kwargs['enable_search'] = True 
+    kwargs.update(llm_kwargs)
     
-    return LLMWrapper(provider=provider, model=model_name, **kwargs)
+    return LLMWrapper(provider=provider, model=model_name, cache=cache, label=label, **kwargs)
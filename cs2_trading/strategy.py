@@ -1,15 +1,24 @@
 from cs2_trading.agents.market import StickerScorer, StickerTrader
+from cs2_trading.backtest.metrics import StreamingMetrics
+from cs2_trading.llm.metrics import get_metrics, llm_step, set_llm_step
 from cs2_trading.agents.StickerAgent import StickerFinder
+from cs2_trading.data.catalogue import mock_good_id
 from cs2_trading.data.inventory import Inventory
+from cs2_trading.data.ledger import TradeLedger, ledger_from_env
 # from cs2_trading.agents.DataReducingAgent import DataReducingAgent
 from cs2_trading.agents.FinancialAgent import FinancialAgent
+from cs2_trading.utils.concurrency import gather_bounded, run_sync
+from cs2_trading.utils.dag import StageGraph, StageResult
 from datetime import datetime, timedelta
-import time
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import numpy as np
 import random
+import uuid
 import logging
 
 class DailyStrategy:
-    def __init__(self, inventory: Inventory, news_agent, info_api, llm_model="gemini-3-pro-preview", target_quantity=20, max_buy_daily=2, save_path="cs2_trading/res/my_inventory.json"):
+    def __init__(self, inventory: Inventory, news_agent, info_api, llm_model="gemini-3-pro-preview", target_quantity=20, max_buy_daily=2, save_path="cs2_trading/res/my_inventory.json", llm_concurrency=4, stage_workers=4, metrics: Optional[StreamingMetrics] = None, ledger: Optional[TradeLedger] = None, run_id: Optional[str] = None):
         self.inventory = inventory
         self.news_agent = news_agent
         self.info_api = info_api
@@ -21,8 +30,51 @@ class DailyStrategy:
         self.target_quantity = target_quantity
         self.max_buy_daily = max_buy_daily 
         self.save_path = save_path 
+        # Max in-flight LLM calls for per-item fan-out (pacing itself is up to the rate limiter)
+        self.llm_concurrency = llm_concurrency
+        # Threads for independent stages of the daily graph
+        self.stage_workers = stage_workers
+        self.last_stage_results: Dict[str, StageResult] = {}
+        # Running performance; its state travels with the inventory so resumed runs continue it
+        if metrics is None:
+            state = inventory.meta.get("metrics")
+            if state:
+                metrics = StreamingMetrics.from_dict(state)
+            else:
+                metrics = StreamingMetrics()
+                metrics.open_positions(sum(item.bought_price for item in inventory.items))
+        self.metrics = metrics
+        # Buy/sell fills (TRADE_LEDGER_PATH or an explicit ledger); None records nothing
+        self.ledger = ledger if ledger is not None else ledger_from_env()
+        # Scopes this run's fills in a shared ledger; kept in the inventory meta so a resumed run keeps it
+        self.run_id = run_id or inventory.meta.get("run_id") or uuid.uuid4().hex[:12]
+        if inventory.meta.get("run_id") != self.run_id:
+            inventory.mark("run_id", self.run_id)
+        if self.ledger is not None:
+            # Holdings from before the ledger existed get their buy fill, so their sales pair up
+            self.ledger.record_many(
+                (("BUY", item.lot_id, item.id, item.name, str(item.purchase_date), item.bought_price, 0.0, "opening position")
+                 for item in inventory.items),
+                run=self.run_id,
+            )
+
+    def run_daily_cycle(self, current_date: datetime, completed: Optional[Dict[str, Any]] = None,
+                        on_stage_complete: Optional[Callable[[StageResult], None]] = None) -> Dict[str, StageResult]:
+        """
+        Run one trading day as a stage graph:
+
+            news -> {financial, scoring, prices, finder} -> valuation -> sell -> restock
 
-    def run_daily_cycle(self, current_date: datetime):
+        The four middle stages only need the news (finder is skipped when the inventory
+        is already at target), so they run concurrently. Every stage's output and timing
+        is returned and kept in `self.last_stage_results`.
+
+        Args:
+            completed: Outputs of stages already finished for this day (resume); they are not re-run.
+                The inventory must be in its start-of-day state: valuation, sell and restock
+                re-apply their recorded effects without calling the LLM again.
+            on_stage_complete: Callback after each stage, e.g. to checkpoint its output.
+        """
         date_str = current_date.strftime("%Y-%m-%d")
         
         # --- LOG HEADER ---
@@ -34,7 +86,64 @@ class DailyStrategy:
         )
         print(f"\n=== Starting Daily Cycle: {date_str} ===")
         logging.info(log_header)
-        
+        set_llm_step(None, day=date_str)
+
+        def stage(name, fn):
+            # Tag LLM calls with the stage name; the day tag is inherited from this context
+            def run(inputs):
+                with llm_step(name):
+                    return fn(current_date, inputs)
+            return run
+
+        graph = StageGraph(max_workers=self.stage_workers)
+        graph.add("news", stage("news", self._stage_news))
+        graph.add("financial", stage("financial", self._stage_financial), deps=["news"])
+        graph.add("scoring", stage("scoring", self._stage_scoring), deps=["news"])
+        # Market data does not depend on the news: start it immediately
+        graph.add("prices", stage("prices", self._stage_prices))
+        restock_deps = ["news", "sell"]
+        # Speculative candidate search only when we already know we are below target
+        if len(self.inventory.items) < self.target_quantity and self.max_buy_daily > 0:
+            graph.add("finder", stage("finder", self._stage_finder), deps=["news"])
+            graph.add("resolve", stage("resolve", self._stage_resolve), deps=["finder"])
+            restock_deps += ["finder", "resolve"]
+        def restore(fn):
+            return lambda inputs, output: fn(current_date, inputs, output)
+
+        # Stages that change the inventory replay their recorded effects when restored
+        graph.add("valuation", stage("valuation", self._stage_valuation), deps=["financial", "scoring", "prices"],
+                  restore=restore(self._restore_valuation))
+        graph.add("sell", stage("sell", self._stage_sell), deps=["news", "financial", "valuation"],
+                  restore=restore(self._restore_sell))
+        graph.add("restock", stage("restock", self._stage_restock), deps=restock_deps,
+                  restore=restore(self._restore_restock))
+
+        try:
+            results = graph.run(completed=completed, on_complete=on_stage_complete)
+        finally:
+            set_llm_step(None)
+        self.last_stage_results = results
+
+        self._update_metrics(date_str, results)
+        self._record_fills(date_str, results)
+
+        # Save state (with a journaled inventory this commits only today's events)
+        self.inventory.mark("metrics", self.metrics.to_dict())
+        self.inventory.mark("last_date", date_str)
+        self.inventory.save(self.save_path)
+        self._log_stage_timings(results)
+        self._log_performance()
+        self._log_prompt_sizes()
+        self._log_llm_summary(date_str)
+        self._log_api_stats()
+        print("\n=== Daily Cycle Complete ===")
+        return results
+
+    # --- Stages -----------------------------------------------------------------
+    # Each stage gets {dependency: output}; outputs are plain JSON-able values.
+
+    def _stage_news(self, current_date: datetime, inputs: Dict[str, Any]) -> str:
+        date_str = current_date.strftime("%Y-%m-%d")
         # 1. Get News (Simulated for backtest/forward test if needed, or real)
         print("Step 1: Fetching News...")
         try:
@@ -63,128 +172,140 @@ class DailyStrategy:
         logging.info(f"--------------------------------------------------------------------------------")
         logging.info(f"{combined_news}")
         logging.info(f"--------------------------------------------------------------------------------")
+        return combined_news
 
+    def _stage_financial(self, current_date: datetime, inputs: Dict[str, Any]) -> str:
         # 1.5 Financial Analysis
         print("\nStep 1.5: Conducting Financial Analysis...")
-        financial_report = self.financial_analyst.analyze_market_sentiment(combined_news, date_str)
+        financial_report = self.financial_analyst.analyze_market_sentiment(inputs["news"], current_date.strftime("%Y-%m-%d"))
         print(f"Financial Insight: {financial_report}")
-        
-        # --- LOG FINANCIAL ---
-        logging.info(f"\n>>> [STEP 2] FINANCIAL ANALYSIS")
-        logging.info(f"--------------------------------------------------------------------------------")
-        logging.info(f"{financial_report}")
-        logging.info(f"--------------------------------------------------------------------------------")
+        return financial_report
 
-        # 2. Score Inventory
-        print("\nStep 2: Scoring Inventory...")
-        logging.info(f"\n>>> [STEP 3] INVENTORY SCORING")
-        
-        # Batch scoring optimization
+    def _stage_scoring(self, current_date: datetime, inputs: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        # 2. Score Inventory (one batched call for all unique names)
         unique_names = list({item.name for item in self.inventory.items})
-        print(f"  Batch scoring {len(unique_names)} unique items...")
+        print(f"\nStep 2: Batch scoring {len(unique_names)} unique items...")
         
         batch_scores = {}
         if unique_names:
             try:
-                batch_scores = self.scorer.score_batch(unique_names, combined_news)
+                batch_scores = self.scorer.score_batch(unique_names, inputs["news"])
             except Exception as e:
                 print(f"  Batch scoring failed: {e}")
                 logging.error(f"  Batch scoring failed: {e}")
+        return {name: {"score": res.score, "reason": res.reason} for name, res in batch_scores.items()}
+
+    def _stage_prices(self, current_date: datetime, inputs: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        # Today's price for every held good: one concurrent bulk prefetch, then an
+        # in-memory vectorised lookup. Overlaps with the LLM stages.
+        date_str = current_date.strftime("%Y-%m-%d")
+        # Held order with duplicates dropped; no sort, so mixed id types cannot raise
+        good_ids = list(dict.fromkeys(int(item.id) for item in self.inventory.items))
+        try:
+            self.info_api.prefetch(good_ids, date_str)
+            column = self.info_api.get_prices(good_ids, [date_str])[:, 0]
+        except Exception as e:
+            logging.error(f"    -> Price fetch failed: {e}")
+            return {str(good_id): None for good_id in good_ids}
+        # NaN (no history at all) -> None so the valuation stage applies its fallback
+        return {str(good_id): (None if np.isnan(p) else float(p)) for good_id, p in zip(good_ids, column)}
+
+    def _stage_finder(self, current_date: datetime, inputs: Dict[str, Any]) -> List[str]:
+        return self.finder.work(inputs["news"])
+
+    def _stage_resolve(self, current_date: datetime, inputs: Dict[str, Any]) -> Dict[str, List[int]]:
+        return self._resolve_candidates(inputs["finder"], current_date.strftime("%Y-%m-%d"))
+
+    def _resolve_candidates(self, names: List[str], date_str: str) -> Dict[str, List[int]]:
+        """IDs for all candidate names and price histories for their best match, fetched in bulk."""
+        try:
+            resolved = self.info_api.resolve_names(names)
+            self.info_api.prefetch([ids[0] for ids in resolved.values() if ids], date_str)
+        except Exception as e:
+            print(f"       [API] Bulk resolve failed: {e}")
+            logging.error(f"  Bulk resolve failed: {e}")
+            return {}
+        return resolved
+
+    def _stage_valuation(self, current_date: datetime, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Append today's score and price to every held item (and log steps 2-3 in order)."""
+        # --- LOG FINANCIAL ---
+        logging.info(f"\n>>> [STEP 2] FINANCIAL ANALYSIS")
+        logging.info(f"--------------------------------------------------------------------------------")
+        logging.info(f"{inputs['financial']}")
+        logging.info(f"--------------------------------------------------------------------------------")
+
+        logging.info(f"\n>>> [STEP 3] INVENTORY SCORING")
+        batch_scores = inputs["scoring"]
+        prices = inputs["prices"]
 
         for item in self.inventory.items:
             print(f"  Scoring {item.name}...")
-            try:
-                # Use batch result if available
-                res = batch_scores.get(item.name)
-                if not res:
-                    print(f"    !!! Batch missing for {item.name} !!!")
-                    print(f"    -> Context: See 'News Summary' at the start of Day {date_str}.")
-                    print(f"    -> Debug: Check 'batch_score_error.log' in workspace root if you suspect a parsing error.")
-                    # Fallback: Try individual scoring or use default
-                    try:
-                        print(f"    -> Attempting individual scoring fallback for {item.name}...")
-                        res = self.scorer.score(item.name, combined_news)
-                        time.sleep(1) # Rate limit protection
-                    except Exception as e:
-                        print(f"    -> Individual scoring failed: {e}. Using default.")
-                        res = {"score": 50, "reason": "Scoring failed (Batch & Individual)"}
-                
-                score = res.get("score", 50)
-                reason = res.get("reason", "N/A")
-                
-                item.daily_score.append(score)
-                
-                # Fetch Real Price
-                # This will raise an exception if it fails, as requested.
-                real_price = self.info_api.get_historical_price(item.id, date_str)
-                
-                new_price = real_price
-                print(f"    -> Fetched real price: {new_price}")
-                
-                item.daily_price.append(new_price)
-                
-                msg_score = f"    -> Scoring {item.name}: Score: {score}, Price: {new_price:.2f}, Reason: {reason}"
-                print(msg_score)
-                logging.info(msg_score)
-            except Exception as e:
-                print(f"    -> Error scoring: {e}")
-                logging.error(f"    -> Error scoring {item.name}: {e}")
+            # Batch answers are schema-constrained; an item the model skipped gets a
+            # neutral score instead of a costly per-item re-ask.
+            res = batch_scores.get(item.name)
+            if res is None:
+                print(f"    !!! Batch missing for {item.name}, using neutral score !!!")
+                res = {"score": 50, "reason": "Missing from batch scoring"}
+            
+            score = res["score"]
+            reason = res["reason"]
+            self.inventory.record_score(item, score)
+
+            new_price = prices.get(str(item.id))
+            if new_price is None:
                 # Fallback logic to keep lists in sync
-                if len(item.daily_price) < len(item.daily_score):
-                    fallback_price = item.daily_price[-1] if item.daily_price else item.bought_price
-                    item.daily_price.append(fallback_price)
-                    print(f"    -> Used fallback price: {fallback_price}")
+                new_price = item.daily_price[-1] if item.daily_price else item.bought_price
+                print(f"    -> Used fallback price: {new_price}")
+                logging.error(f"    -> Error scoring {item.name}: no price for {current_date.strftime('%Y-%m-%d')}, using {new_price}")
+            self.inventory.record_price(item, new_price)
+            
+            msg_score = f"    -> Scoring {item.name}: Score: {score}, Price: {new_price:.2f}, Reason: {reason}"
+            print(msg_score)
+            logging.info(msg_score)
+        return {"items": len(self.inventory.items)}
 
+    def _stage_sell(self, current_date: datetime, inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
         # 3. Sell Logic
         print("\nStep 3: Checking Sell Opportunities...")
         logging.info(f"\n>>> [STEP 4] SELL DECISIONS")
         
-        # Use list() to create a copy for safe iteration while modifying the original list
-        tradeable = list(self.inventory.get_tradeable_items(current_date))
-        for item in tradeable:
+        # Collect into a separate list so sold items can be removed from the inventory below
+        tradeable = []
+        for item in self.inventory.get_tradeable_items(current_date):
             if not item.daily_price:
                 print(f"  Skipping {item.name} (No price history)")
                 continue
-            current_price = item.daily_price[-1]
-            score = item.daily_score[-1]
-            
             print(f"  Analyzing {item.name} (Held {item.days_held(current_date)} days)...")
-            
-            # Enhance decision with DataReducer
-            # Fetch detailed info (mocked or real)
-            # item_info = self.info_api.get_good_info(item.id) 
-            # For now, we construct a summary string
-            item_summary = f"Item: {item.name}, Rarity: {item.extra_info.get('rarity', 'Unknown')}"
-            
-            # Financial Analysis for specific item
-            price_analysis = self.financial_analyst.analyze_item_price(item.name, current_price, item.bought_price)
-            
-            # Combine news, financial report, and price analysis for the trader
-            decision_context = (
-                f"{combined_news}\n\n"
-                f"--- Financial Analyst Report ---\n{financial_report}\n"
-                f"--- Item Price Analysis ---\n{price_analysis}"
-            )
-            
-            decision_res = self.trader.decide(item, current_price, decision_context, score)
-            decision = decision_res.get("decision", "HOLD")
-            reason = decision_res.get("reason", "N/A")
-            
-            # --- API RATE LIMIT PROTECTION ---
-            time.sleep(2) # Sleep 2s after each LLM call to avoid 429
+            tradeable.append(item)
+
+        # Per-item price analyses fan out concurrently, then every holding is
+        # decided in one (or a few, if the prompt is too large) batched trader call.
+        decisions = run_sync(self._analyze_and_decide(tradeable, inputs["news"], inputs["financial"], current_date))
+
+        out = []
+        for item, (decision_res, price_analysis) in zip(tradeable, decisions):
+            decision = decision_res.decision
+            reason = decision_res.reason
             
             msg_decision = f"    -> Decision for {item.name}: {decision}, Reason: {reason}"
             print(msg_decision)
             logging.info(msg_decision)
-            logging.info(f"       [Context]\n{decision_context.replace(chr(10), chr(10)+'       ')}") # Indent context
+            logging.info(f"       [Price Analysis] {price_analysis}")
+            out.append({"lot": item.lot_id, "id": item.id, "name": item.name, "price": item.daily_price[-1],
+                        "bought_price": item.bought_price, "decision": decision, "reason": reason})
             
             if decision == "SELL":
                 msg_sell = f"    !!! SELLING {item.name} !!!"
                 print(msg_sell)
                 logging.info(msg_sell)
                 self.inventory.remove_item(item)
-                # In a real system, we'd record realized profit here
+                # Proceeds go to the ledger and metrics when the day closes
+        return out
 
+    def _stage_restock(self, current_date: datetime, inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        date_str = current_date.strftime("%Y-%m-%d")
+        combined_news = inputs["news"]
         # 4. Buy/Restock Logic
         print("\nStep 4: Restocking...")
         logging.info(f"\n>>> [STEP 5] RESTOCKING")
@@ -194,21 +315,28 @@ class DailyStrategy:
         
         # Apply daily buy limit
         actual_buy_count = min(needed, self.max_buy_daily)
+        bought = []
         
         if actual_buy_count > 0:
             print(f"  Need to buy {needed} items. Daily limit: {self.max_buy_daily}. Will buy: {actual_buy_count}")
-            candidates = self.finder.work(combined_news)
+            candidates = inputs.get("finder")
+            resolved = inputs.get("resolve")
+            if candidates is None:
+                # Sells opened slots that were not anticipated; search now
+                candidates = self.finder.work(combined_news)
             print(f"  Candidates from news: {candidates}")
             logging.info(f"  Candidates from news: {candidates}")
             
             owned_names = {i.name for i in self.inventory.items}
             new_candidates = [c for c in candidates if c not in owned_names]
+            if resolved is None:
+                resolved = self._resolve_candidates(new_candidates, date_str)
             
+            candidate_scores = self.scorer.score_batch(new_candidates, combined_news) if new_candidates else {}
             scored_candidates = []
             for cand in new_candidates:
-                res = self.scorer.score(cand, combined_news)
-                scored_candidates.append((cand, res.get("score", 0)))
-                time.sleep(1) # Sleep 1s after each scoring call
+                res = candidate_scores.get(cand)
+                scored_candidates.append((cand, res.score if res else 0))
             
             scored_candidates.sort(key=lambda x: x[1], reverse=True)
             
@@ -219,11 +347,12 @@ class DailyStrategy:
                 logging.info(msg_buy)
                 
                 # Get Real ID from API
-                real_id = hash(name) % 100000 # Default fallback
+                real_id = mock_good_id(name) # Stable fallback, negative so it never clashes with real IDs
                 price = 0.0
                 
                 try:
-                    ids = self.info_api.get_good_id(name)
+                    # Resolved and prefetched in bulk above: no per-candidate round-trips
+                    ids = resolved.get(name)
                     if ids:
                         real_id = ids[0]
                         print(f"       [API] Found real ID: {real_id}")
@@ -240,16 +369,136 @@ class DailyStrategy:
                     price = 100.0 * (1 + (score-50)/100)
                 
                 if price > 0:
-                    self.inventory.add_item(
+                    item = self.inventory.add_item(
                         id=real_id,
                         name=name,
                         price=price,
                         date=current_date,
                         info={"initial_score": score, "rarity": "Unknown"}
                     )
+                    bought.append({"lot": item.lot_id, "id": real_id, "name": name, "price": price, "score": score})
         else:
             print("  Inventory full or daily limit reached, no need to restock.")
+        return bought
 
-        # Save state
-        self.inventory.save(self.save_path)
-        print("\n=== Daily Cycle Complete ===")
+    # --- Restore ---------------------------------------------------------------
+    # Re-apply a checkpointed stage to the start-of-day inventory.
+
+    def _restore_valuation(self, current_date: datetime, inputs: Dict[str, Any], output: Dict[str, Any]):
+        # Deterministic given the restored scores and prices: no LLM or API calls
+        self._stage_valuation(current_date, inputs)
+
+    def _restore_sell(self, current_date: datetime, inputs: Dict[str, Any], output: List[Dict[str, Any]]):
+        for row in output:
+            if row["decision"] == "SELL":
+                item = self.inventory.get_lot(row["lot"])
+                if item is not None:
+                    self.inventory.remove_item(item)
+
+    def _restore_restock(self, current_date: datetime, inputs: Dict[str, Any], output: List[Dict[str, Any]]):
+        for row in output:
+            self.inventory.add_item(
+                id=row["id"],
+                name=row["name"],
+                price=row["price"],
+                date=current_date,
+                info={"initial_score": row["score"], "rarity": "Unknown"},
+                lot_id=row.get("lot")
+            )
+
+    # --- Reporting -------------------------------------------------------------
+
+    def _update_metrics(self, date_str: str, results: Dict[str, StageResult]):
+        """Close the day in `self.metrics` from the day's fills and the marked holdings (O(items))."""
+        sold = [(row["price"], row["bought_price"]) for row in results["sell"].output if row["decision"] == "SELL"]
+        bought = [row["price"] for row in results["restock"].output]
+        market_value = cost_basis = 0.0
+        for item in self.inventory.items:
+            market_value += item.daily_price[-1] if item.daily_price else item.bought_price
+            cost_basis += item.bought_price
+        self.metrics.update(date_str, market_value, cost_basis, buys=bought, sells=sold)
+
+    def _record_fills(self, date_str: str, results: Dict[str, StageResult]):
+        """Write the day's sells and buys to the trade ledger (idempotent for a replayed day)."""
+        if self.ledger is None:
+            return
+        fills = [
+            ("SELL", row["lot"], row["id"], row["name"], date_str, row["price"], row["price"] * self.metrics.fee, row["reason"])
+            for row in results["sell"].output if row["decision"] == "SELL"
+        ]
+        fills += [
+            ("BUY", row["lot"], row["id"], row["name"], date_str, row["price"], 0.0, f"score {row['score']}")
+            for row in results["restock"].output
+        ]
+        self.ledger.record_many(fills, run=self.run_id)
+
+    def _log_performance(self):
+        msg = f"  Performance: {self.metrics.format()}"
+        print(msg)
+        logging.info(msg)
+
+    def _log_stage_timings(self, results: Dict[str, StageResult]):
+        if not results:
+            return
+        origin = min(r.started for r in results.values())
+        rows = [
+            f"    {r.name:<10} {r.started - origin:7.2f}s -> {r.finished - origin:7.2f}s ({r.duration_s:.2f}s){' [restored]' if r.restored else ''}"
+            for r in sorted(results.values(), key=lambda r: r.started)
+        ]
+        msg = "  Stage timings:\n" + "\n".join(rows)
+        print(msg)
+        logging.info(msg)
+
+    def _log_llm_summary(self, date_str: str):
+        """Per-day table of LLM latency/tokens/cost by agent and step (see llm/metrics.py)."""
+        table = get_metrics().summary(day=date_str)
+        if table.empty:
+            return
+        cols = ["calls", "cached", "latency_s", "prompt_tokens", "completion_tokens", "thinking_tokens", "retries", "cost_usd"]
+        msg = f"  LLM usage for {date_str}:\n{table[cols].round(3).to_string()}"
+        print(msg)
+        logging.info(msg)
+
+    def _log_api_stats(self):
+        """Cumulative per-endpoint latency of the market data API (see data/http.py)."""
+        stats = getattr(self.info_api, "stats", None)
+        if stats is None or not stats.snapshot():
+            return
+        msg = "  Market API endpoints:\n" + stats.format()
+        print(msg)
+        logging.info(msg)
+
+    def _log_prompt_sizes(self):
+        """Report how much history each agent resends per request (tracks memory growth)."""
+        sizes = []
+        for agent in (self.scorer, self.trader, self.finder):
+            size = agent.prompt_size()
+            sizes.append(f"{type(agent).__name__}[{agent.memory_policy}]={size['tokens']} tok/{size['messages']} msgs")
+        msg = "  Agent memory: " + ", ".join(sizes)
+        print(msg)
+        logging.info(msg)
+
+    async def _analyze_and_decide(self, items, combined_news: str, financial_report: str, current_date: datetime):
+        """
+        Price analysis for every item with at most `llm_concurrency` calls in flight,
+        then one batched trade decision. Returns [(decision_res, price_analysis)] in item order.
+        """
+        if not items:
+            return []
+
+        price_analyses = await gather_bounded(
+            [self.financial_analyst.aanalyze_item_price(item.name, item.daily_price[-1], item.bought_price) for item in items],
+            self.llm_concurrency,
+        )
+
+        # Shared context for the trader; per-item analyses go into each item's row
+        decision_context = (
+            f"{combined_news}\n\n"
+            f"--- Financial Analyst Report ---\n{financial_report}"
+        )
+        requests = [
+            (item, item.daily_price[-1], item.daily_score[-1], analysis)
+            for item, analysis in zip(items, price_analyses)
+        ]
+        decisions = await asyncio.to_thread(self.trader.decide_batch, requests, decision_context, current_date)
+        return list(zip(decisions, price_analyses))
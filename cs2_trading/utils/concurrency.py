@@ -0,0 +1,49 @@
+"""Small asyncio helpers shared by agents and the strategy."""
+import asyncio
+import contextvars
+import threading
+from typing import Any, Awaitable, Iterable, List
+
+
+async def gather_bounded(aws: Iterable[Awaitable[Any]], limit: int = 4) -> List[Any]:
+    """
+    Await all `aws` with at most `limit` in flight.
+    Results are returned in input order regardless of completion order.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _run(aw):
+        async with sem:
+            return await aw
+
+    return await asyncio.gather(*(_run(aw) for aw in aws))
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Jupyter already runs an event loop in the main thread, where `asyncio.run`
+    refuses to start; in that case the coroutine gets its own loop on a worker thread
+    (with the caller's context variables, e.g. the current LLM step tag).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: dict = {}
+
+    def _worker():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    ctx = contextvars.copy_context()
+    t = threading.Thread(target=ctx.run, args=(_worker,), name="run_sync")
+    t.start()
+    t.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -0,0 +1,140 @@
+"""Minimal thread-pool DAG executor used to run the daily cycle as a stage graph."""
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class StageResult:
+    name: str
+    output: Any = None
+    started: float = 0.0
+    finished: float = 0.0
+    error: Optional[str] = None
+    restored: bool = False
+
+    @property
+    def duration_s(self) -> float:
+        return self.finished - self.started
+
+
+class StageError(RuntimeError):
+    """A stage raised; `results` holds everything that did complete."""
+    def __init__(self, stage: str, cause: BaseException, results: Dict[str, StageResult]):
+        super().__init__(f"Stage '{stage}' failed: {cause}")
+        self.stage = stage
+        self.cause = cause
+        self.results = results
+
+
+class StageGraph:
+    """
+    Stages are callables taking a dict of their dependencies' outputs.
+    Every stage whose dependencies are satisfied runs immediately, so independent
+    branches overlap and the wall time is the longest path through the graph.
+    """
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._deps: Dict[str, List[str]] = {}
+        self._restore: Dict[str, Callable[[Dict[str, Any], Any], None]] = {}
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = (),
+            restore: Optional[Callable[[Dict[str, Any], Any], None]] = None) -> "StageGraph":
+        """
+        `restore(inputs, output)` re-applies the side effects of a stage whose output is
+        passed in via `completed`; it runs in dependency order like the stage itself would.
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        deps = list(deps)
+        for d in deps:
+            if d not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{d}'")
+        self._stages[name] = fn
+        self._deps[name] = deps
+        if restore is not None:
+            self._restore[name] = restore
+        return self
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._stages)
+
+    def run(self, completed: Optional[Dict[str, Any]] = None,
+            on_complete: Optional[Callable[[StageResult], None]] = None) -> Dict[str, StageResult]:
+        """
+        Execute the graph.
+
+        Args:
+            completed: Outputs of stages finished in an earlier run; those stages are not re-run
+                (stages with a `restore` hook only replay their side effects).
+            on_complete: Called (from the scheduling thread, in completion order) after each
+                stage that actually ran.
+        Returns:
+            {stage name: StageResult}. Raises StageError on the first failing stage,
+            after letting already-running stages finish.
+        """
+        results: Dict[str, StageResult] = {}
+        replay: Dict[str, Any] = {}
+        for name, output in (completed or {}).items():
+            if name not in self._stages:
+                continue
+            if name in self._restore:
+                replay[name] = output
+            else:
+                now = time.perf_counter()
+                results[name] = StageResult(name, output, now, now, restored=True)
+
+        pending = [n for n in self._stages if n not in results]
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                if failure is None:
+                    for name in [n for n in pending if all(d in results for d in self._deps[n])]:
+                        pending.remove(name)
+                        inputs = {d: results[d].output for d in self._deps[name]}
+                        ctx = contextvars.copy_context()
+                        started = time.perf_counter()
+                        if name in replay:
+                            fn = self._replayer(name, replay[name])
+                        else:
+                            fn = self._stages[name]
+                        running[pool.submit(ctx.run, fn, inputs)] = (name, started)
+
+                if not running:
+                    if failure is None and pending:
+                        raise RuntimeError(f"Unschedulable stages (cycle?): {pending}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name, started = running.pop(fut)
+                    finished = time.perf_counter()
+                    try:
+                        output = fut.result()
+                    except Exception as e:
+                        results[name] = StageResult(name, None, started, finished, error=str(e))
+                        if failure is None:
+                            failure = (name, e)
+                        continue
+                    res = StageResult(name, output, started, finished, restored=name in replay)
+                    results[name] = res
+                    if on_complete is not None and not res.restored:
+                        on_complete(res)
+
+        if failure is not None:
+            raise StageError(failure[0], failure[1], results)
+        return results
+
+    def _replayer(self, name: str, output: Any) -> Callable[[Dict[str, Any]], Any]:
+        restore = self._restore[name]
+
+        def run(inputs):
+            restore(inputs, output)
+            return output
+        return run
@@ -0,0 +1,136 @@
+"""Process-wide adaptive token-bucket rate limiters, one per upstream."""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from cs2_trading.utils.logger import get_logger
+
+logger = get_logger("RateLimiter")
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket for requests per minute (and optionally tokens per minute).
+
+    Callers reserve capacity *before* talking to the upstream. Reservations may
+    drive the bucket into debt, which simply means later callers wait longer, so
+    the same object also serves asyncio code via `reserve()` + `asyncio.sleep`.
+
+    Adaptation is AIMD: a 429/503 halves the effective rate and pauses the bucket
+    for the given back-off; every success recovers a little towards the configured rate.
+    """
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None, burst: Optional[float] = None,
+                 min_fraction: float = 0.1, recovery_step: float = 0.05):
+        self.name = name
+        self.rpm = float(rpm)
+        self.tpm = float(tpm) if tpm else None
+        self.burst = float(burst) if burst else max(1.0, self.rpm / 10)
+        self.min_fraction = min_fraction
+        self.recovery_step = recovery_step
+
+        self._lock = threading.Lock()
+        self._factor = 1.0
+        self._requests = self.burst
+        self._tokens = self.tpm if self.tpm else 0.0
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+
+        self.throttled = 0
+        self.waited = 0.0
+
+    @property
+    def factor(self) -> float:
+        return self._factor
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        self._requests = min(self.burst, self._requests + elapsed * self.rpm * self._factor / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm * self._factor / 60.0)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Take one request (and `tokens` tokens) from the buckets.
+        Returns how many seconds the caller must wait before sending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._requests -= 1
+            wait = max(0.0, self._paused_until - now)
+            if self._requests < 0:
+                wait = max(wait, -self._requests * 60.0 / (self.rpm * self._factor))
+            if self.tpm and tokens:
+                self._tokens -= tokens
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens * 60.0 / (self.tpm * self._factor))
+            self.waited += wait
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Blocking variant of `reserve`. Returns the time slept."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_throttle(self, backoff: float = 0.0) -> None:
+        """Upstream said 429/503: slow down and hold everyone for `backoff` seconds."""
+        with self._lock:
+            self.throttled += 1
+            self._factor = max(self.min_fraction, self._factor * 0.5)
+            self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+        logger.warning(f"[{self.name}] throttled by upstream, rate factor now {self._factor:.2f}, pausing {backoff:.1f}s")
+
+    def on_success(self) -> None:
+        if self._factor < 1.0:
+            with self._lock:
+                self._factor = min(1.0, self._factor + self.recovery_step)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm or 0.0,
+            "factor": self._factor,
+            "throttled": self.throttled,
+            "waited_s": self.waited,
+        }
+
+    def __repr__(self):
+        return f"AdaptiveRateLimiter({self.name!r}, rpm={self.rpm}, tpm={self.tpm}, factor={self._factor:.2f})"
+
+
+# Defaults roughly match the old fixed sleeps (about one call per second) and can be
+# overridden per upstream with RATE_LIMIT_<NAME>_RPM / RATE_LIMIT_<NAME>_TPM.
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 60, "tpm": None},
+    "openai": {"rpm": 60, "tpm": None},
+    "csqaq": {"rpm": 60, "tpm": None},
+}
+
+_LIMITERS: Dict[str, AdaptiveRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def configure_limiter(name: str, rpm: float, tpm: Optional[float] = None, **kwargs) -> AdaptiveRateLimiter:
+    """Replace the shared limiter for `name` (e.g. to match a paid quota)."""
+    limiter = AdaptiveRateLimiter(name, rpm=rpm, tpm=tpm, **kwargs)
+    with _LIMITERS_LOCK:
+        _LIMITERS[name] = limiter
+    return limiter
+
+
+def get_limiter(name: str) -> AdaptiveRateLimiter:
+    """Shared limiter for an upstream ("gemini", "openai", "csqaq", ...)."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(name)
+        if limiter is None:
+            defaults = DEFAULT_LIMITS.get(name, {"rpm": 60, "tpm": None})
+            env = name.upper()
+            rpm = float(os.getenv(f"RATE_LIMIT_{env}_RPM") or defaults["rpm"])
+            tpm = os.getenv(f"RATE_LIMIT_{env}_TPM") or defaults["tpm"]
+            limiter = AdaptiveRateLimiter(name, rpm=rpm, tpm=float(tpm) if tpm else None)
+            _LIMITERS[name] = limiter
+        return limiter
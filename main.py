@@ -60,20 +60,77 @@ def demo_backtest():
     logger.info(f"Sharpe: {res['sharpe']:.4f}")
 
 
+def run_strategy_backtest(args):
+    """DailyStrategy over a date range with per-stage checkpoints; re-run the same command to resume."""
+    import logging
+    from cs2_trading.agents.ArtificialNewsAgent import ArtificialNewsAgent
+    from cs2_trading.backtest.driver import BacktestDriver
+
+    load_dotenv(override=True)
+    os.makedirs(args.run_dir, exist_ok=True)
+    logging.basicConfig(
+        filename=os.path.join(args.run_dir, "backtest.log"),
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)-8s | %(message)s',
+        datefmt='%H:%M:%S',
+        encoding='utf-8',
+        filemode='a'
+    )
+    schedule = {}
+    for entry in args.schedule:
+        # DATE:attr=value, e.g. 2025-11-24:max_buy_daily=8
+        date, assignment = entry.split(":", 1)
+        attr, value = assignment.split("=", 1)
+        schedule.setdefault(date, {})[attr] = int(value) if value.isdigit() else value
+
+    driver = BacktestDriver(
+        args.run_dir,
+        ArtificialNewsAgent(news_dir=args.news_dir),
+        InfoAPI(os.getenv("INFO_API_TOKEN")),
+        start_date=args.start,
+        end_date=args.end,
+        schedule=schedule,
+        seed_inventory=args.seed_inventory,
+        llm_model=args.model,
+        target_quantity=args.target_quantity,
+        max_buy_daily=args.max_buy_daily,
+    )
+    try:
+        driver.run()
+    finally:
+        driver.close()
+    print("\n=== Backtest Complete ===")
+    print(driver.inventory)
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--demo", action="store_true", help="run demo backtest")
     p.add_argument("--run-agents", action="store_true", help="run the news->sticker agent pipeline")
+    p.add_argument("--backtest", action="store_true", help="run DailyStrategy over a date range (resumable)")
+    p.add_argument("--run-dir", default="backtests/budapest_major", help="checkpoint/log directory for --backtest")
+    p.add_argument("--start", default="2025-11-11")
+    p.add_argument("--end", default="2025-12-20")
+    p.add_argument("--model", default="gemini-3-flash-preview")
+    p.add_argument("--target-quantity", type=int, default=10)
+    p.add_argument("--max-buy-daily", type=int, default=3)
+    p.add_argument("--news-dir", default="cs2_trading/res/news_artificial")
+    p.add_argument("--seed-inventory", default=None, help="inventory JSON to start from on a fresh run")
+    p.add_argument("--schedule", action="append", default=[], metavar="DATE:ATTR=VALUE",
+                   help="strategy override from DATE on, e.g. 2025-11-24:max_buy_daily=8 (repeatable)")
     args = p.parse_args()
     
     if args.demo:
         demo_backtest()
     elif args.run_agents:
         run_agents()
+    elif args.backtest:
+        run_strategy_backtest(args)
     else:
         print("CS2 Trading Agents scaffold.")
         print("Use --demo to run demo backtest.")
         print("Use --run-agents to run the agent pipeline.")
+        print("Use --backtest to run the resumable DailyStrategy backtest.")
 
 
 if __name__ == "__main__":
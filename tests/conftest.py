@@ -0,0 +1,63 @@
+import json
+import re
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def offline_env(monkeypatch, tmp_path):
+    """No persistent stores, no real LLM/API keys: every test runs against temp files and fakes."""
+    monkeypatch.setenv("PRICE_STORE_PATH", "off")
+    monkeypatch.setenv("GOODS_CATALOGUE_PATH", "off")
+    monkeypatch.setenv("INFO_API_TOKEN", "test")
+    # The fake server answers instantly; the real CSQAQ quota would only slow the tests down
+    monkeypatch.setenv("RATE_LIMIT_CSQAQ_RPM", "60000")
+    for key in ("LLM_CACHE_PATH", "TRADE_LEDGER_PATH", "LLM_RECORD_PATH", "LLM_REPLAY_PATH", "LLM_METRICS_PATH", "INFO_API_BASE_URL"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def fake_server():
+    from cs2_trading.data.fake_server import FakeCSQAQServer
+
+    with FakeCSQAQServer() as server:
+        yield server
+
+
+def scripted_reply(messages):
+    """Deterministic answers for every prompt the agents send (sell odd lots, score 60, two candidates)."""
+    last = messages[-1]["content"]
+    if "持仓编号" in last:
+        ids = re.findall(r"^(\d+) \|", last, re.M)
+        return json.dumps({"decisions": [{"id": int(i), "decision": "SELL" if int(i) % 2 else "HOLD", "reason": "test"}
+                                         for i in ids]})
+    if "请做出交易决策" in last:
+        return json.dumps({"decision": "HOLD", "reason": "test"})
+    if "批量打分" in last:
+        names = re.search(r"批量打分: (.*)\n", last)
+        scores = [{"name": n, "score": 60, "reason": "test"} for n in (names.group(1).split(", ") if names else [])]
+        return json.dumps({"scores": scores}, ensure_ascii=False)
+    if "请打分" in last:
+        return json.dumps({"score": 70, "reason": "test"})
+    if "找出印花名称" in last:
+        return json.dumps({"names": ["Candidate A", "Candidate B"]})
+    return "analysis"
+
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    """Offline LLM: wrappers run in replay mode (no keys or clients) and answer from `scripted_reply`."""
+    from cs2_trading.llm.wrapper import LLMWrapper
+
+    replay = tmp_path / "replay.jsonl"
+    replay.write_text("")
+    monkeypatch.setenv("LLM_REPLAY_PATH", str(replay))
+    calls = []
+
+    def complete(self, messages, temperature, response_schema=None):
+        calls.append(messages)
+        return scripted_reply(messages), {}
+
+    monkeypatch.setattr(LLMWrapper, "_complete", complete)
+    return calls
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import re
+from datetime import datetime
+
+import pytest
+
+from cs2_trading.agents.base import AgentBase
+from cs2_trading.agents.market import StickerTrader
+from cs2_trading.data.inventory import Stuff
+from cs2_trading.utils.concurrency import gather_bounded
+
+MODEL = "gemini-3-flash-preview"
+NEWS = "Budapest Major: Vitality win"
+
+
+def _requests(n):
+    return [(Stuff(id=k, name=f"Sticker{k:02d}", bought_price=100.0, purchase_date="2025-11-01T00:00:00",
+                   daily_score=[60] * 3), 100.0 + k, 60 + k, "") for k in range(n)]
+
+
+def test_decide_batch_chunks_in_order_with_hold_fallback(fake_llm):
+    trader = StickerTrader(llm_model=MODEL)
+    prompts = []
+
+    def get_response(prompt, response_schema=None):
+        prompts.append(prompt)
+        ids = [int(i) for i in re.findall(r"^(\d+) \|", prompt, re.M)]
+        # Answer out of order, and leave row 5 out
+        decisions = [{"id": i, "decision": "SELL" if i % 2 else "HOLD", "reason": f"row {i}"}
+                     for i in reversed(ids) if i != 5]
+        return json.dumps({"decisions": decisions})
+
+    trader.get_response = get_response
+    requests = _requests(10)
+    when = datetime(2025, 11, 20)
+    # Every line is the same length; a budget of exactly three lines gives 3 + 3 + 3 + 1
+    line = len(trader._batch_line(10, when, *requests[9]))
+    max_chars = len(NEWS) + 600 + 3 * line + 2
+
+    decisions = trader.decide_batch(requests, NEWS, when, max_prompt_chars=max_chars)
+    assert len(prompts) == 4
+    assert [len(re.findall(r"^\d+ \|", p, re.M)) for p in prompts] == [3, 3, 3, 1]
+    assert all(NEWS in p for p in prompts)
+    assert len(decisions) == 10
+    for row, decision in enumerate(decisions, 1):
+        if row == 5:
+            assert decision.decision == "HOLD" and decision.reason == "批量决策缺失"
+        else:
+            assert decision.reason == f"row {row}"
+            assert decision.decision == ("SELL" if row % 2 else "HOLD")
+    assert not fake_llm  # stubbed: no model call
+
+
+def test_decide_batch_single_request_and_empty(fake_llm):
+    trader = StickerTrader(llm_model=MODEL)
+    calls = []
+    trader.get_response = lambda prompt, response_schema=None: calls.append(prompt) or "not json"
+    assert trader.decide_batch([], NEWS) == []
+    decisions = trader.decide_batch(_requests(4), NEWS)
+    assert len(calls) == 1
+    assert [d.decision for d in decisions] == ["HOLD"] * 4
+
+
+def _agent(**kwargs):
+    agent = AgentBase(llm_model=MODEL, **kwargs)
+    agent.add_system_message("你是一个测试智能体")
+    return agent
+
+
+def test_stateless_keeps_only_system_messages(fake_llm):
+    agent = _agent(memory_policy="stateless")
+    for k in range(3):
+        assert agent.get_response(f"问题 {k}") == "analysis"
+    assert agent.memory == [{"role": "system", "content": "你是一个测试智能体"}]
+    # Every request carries the system prompt and nothing from earlier turns
+    assert [len(messages) for messages in fake_llm] == [2, 2, 2]
+
+
+def test_last_n_keeps_last_turns(fake_llm):
+    agent = _agent(memory_policy="last_n", max_turns=2)
+    for k in range(5):
+        agent.get_response(f"问题 {k}")
+    assert agent.memory[0]["role"] == "system"
+    assert len(agent.memory) == 1 + 2 * 2
+    assert [m["content"] for m in agent.memory[1::2]] == ["问题 3", "问题 4"]
+    assert [m["role"] for m in agent.memory[1:]] == ["user", "assistant"] * 2
+
+
+def test_token_budget_summarises_once(fake_llm):
+    agent = _agent(memory_policy="token_budget", max_prompt_tokens=60)
+    reborn = []
+    original = agent.kill_and_reborn
+
+    def spy(last_words_prompt, system_prompt):
+        reborn.append(system_prompt)
+        original(last_words_prompt, system_prompt)
+
+    agent.kill_and_reborn = spy
+    agent.get_response("短问题")
+    assert not reborn and agent.last_words is None
+    agent.get_response("长问题 " + "x" * 300)
+    # One rollover; the summary request itself must not trigger another one
+    assert reborn == ["你是一个测试智能体"]
+    assert len(fake_llm) == 3
+    assert agent.last_words == "analysis"
+    assert [m["role"] for m in agent.memory] == ["system", "system"]
+    assert agent.memory[0]["content"] == "你是一个测试智能体"
+    assert "analysis" in agent.memory[1]["content"]
+    assert agent.prompt_tokens() <= agent.max_prompt_tokens
+
+
+def test_aget_response_serialises_turns(fake_llm):
+    agent = _agent()
+    questions = [f"问题 {k}" for k in range(6)]
+
+    async def run():
+        return await gather_bounded((agent.aget_response(q) for q in questions), limit=4)
+
+    assert asyncio.run(run()) == ["analysis"] * 6
+    # No turn lost, and each request saw every earlier turn
+    assert [m["content"] for m in agent.memory[1::2]] == questions
+    assert sorted(len(messages) for messages in fake_llm) == [2, 4, 6, 8, 10, 12]
+    # The agent can be driven again from a new event loop
+    asyncio.run(agent.aget_response("问题 6"))
+    assert len(agent.memory) == 1 + 2 * 7
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"memory_policy": "last_n"}, "max_turns"),
+    ({"memory_policy": "token_budget"}, "max_prompt_tokens"),
+    ({"memory_policy": "forever"}, "Unknown memory policy"),
+])
+def test_memory_policy_validation(fake_llm, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        AgentBase(llm_model=MODEL, **kwargs)
@@ -0,0 +1,65 @@
+import pytest
+
+from cs2_trading.data.api import InfoAPI, InfoAPIError
+from cs2_trading.data.fake_server import FakeCSQAQServer, FakeServerConfig
+from cs2_trading.utils.ratelimit import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def make_api():
+    servers = []
+
+    def make(**config):
+        # Seeds below are picked so the first request fails and the second one succeeds
+        server = FakeCSQAQServer(FakeServerConfig(**config)).start()
+        servers.append(server)
+        api = InfoAPI(api_token="test", base_url=server.base_url, backoff=0.0)
+        # A private limiter, so throttling here does not slow down other tests
+        api.limiter = AdaptiveRateLimiter("test", rpm=60000)
+        InfoAPI.stats.reset()
+        return server, api
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+@pytest.mark.parametrize("config, code", [
+    ({"throttle_rate": 0.5, "seed": 1}, "429"),
+    ({"error_rate": 0.5, "error_code": 503, "seed": 9}, "503"),
+])
+def test_retryable_status_is_retried(make_api, config, code):
+    server, api = make_api(**config)
+    assert api.get_good_info(7)["data"]["goods_info"]["id"] == 7
+    assert server.counts == {"info/good": 2, code: 1}
+    calls, errors, retries, _, _ = InfoAPI.stats.snapshot()["info/good"]
+    assert (calls, errors, retries) == (2, 1, 1)
+    assert api.limiter.throttled == 1
+
+
+@pytest.mark.parametrize("endpoint, params, status", [
+    ("info/good", None, 400),
+    ("info/unknown", {"id": 1}, 404),
+])
+def test_client_error_fails_fast(make_api, endpoint, params, status):
+    server, api = make_api()
+    api.limiter.on_throttle()
+    factor = api.limiter.factor
+    with pytest.raises(InfoAPIError) as info:
+        api._request("GET", endpoint, params=params)
+    assert info.value.status_code == status
+    assert server.counts[endpoint] == 1
+    calls, errors, retries, _, _ = InfoAPI.stats.snapshot()[endpoint]
+    assert (calls, errors, retries) == (1, 1, 0)
+    # An error answer must not count as a success for the adaptive rate
+    assert api.limiter.factor == factor
+
+
+def test_gives_up_after_max_retries(make_api):
+    server, api = make_api(error_rate=1.0, error_code=503)
+    api.max_retries = 3
+    with pytest.raises(InfoAPIError) as info:
+        api.get_good_info(7)
+    assert info.value.status_code == 0
+    assert server.counts["503"] == 3
+    assert InfoAPI.stats.snapshot()["info/good"][2] == 3
@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("httpx")
+
+from cs2_trading.data.api import InfoAPI
+from cs2_trading.data.async_api import AsyncInfoAPI
+
+DATES = ["2026-01-05", "2026-02-10"]
+
+
+def test_async_matches_sync(fake_server):
+    sync = InfoAPI(api_token="test", base_url=fake_server.base_url)
+    expected = sync.get_prices([11, 12, 13], DATES)
+
+    async def main():
+        async with AsyncInfoAPI(api_token="test", base_url=fake_server.base_url, concurrency=4) as api:
+            prices = await api.aget_prices(["11", 12, 13], DATES)
+            ids = await api.aresolve_names(["s1mple", "donk"])
+            return prices, ids
+
+    prices, ids = asyncio.run(main())
+    np.testing.assert_array_equal(prices, expected)
+    assert ids == sync.resolve_names(["s1mple", "donk"])
+
+
+def test_sync_methods_still_work(fake_server):
+    # Substitutable for InfoAPI: the inherited methods are not shadowed by coroutines
+    api = AsyncInfoAPI(api_token="test", base_url=fake_server.base_url)
+    assert api.get_good_info(7)["data"]["goods_info"]["id"] == 7
+    assert api.get_prices([7], DATES).shape == (1, 2)
+    assert api.prefetch([7], DATES[-1]) == {7: True}
+
+
+def test_new_loop_closes_old_client(fake_server):
+    api = AsyncInfoAPI(api_token="test", base_url=fake_server.base_url)
+    asyncio.run(api.aget_good_info(1))
+    first = api._client
+    asyncio.run(api.aget_good_info(2))
+    assert first.is_closed and api._client is not first
+    asyncio.run(api.aclose())
+
+
+def test_proxy_is_used(fake_server):
+    # The host only resolves through the proxy (the fake server also accepts absolute-form requests)
+    proxy = fake_server.base_url.split("/api/")[0]
+    api = AsyncInfoAPI(api_token="test", base_url="http://csqaq.invalid/api/v1/", proxy=proxy, max_retries=1)
+
+    async def main():
+        async with api:
+            return await api.aget_good_info(5)
+
+    assert asyncio.run(main())["data"]["goods_info"]["id"] == 5
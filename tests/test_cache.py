@@ -0,0 +1,48 @@
+from cs2_trading.llm.cache import ResponseCache, make_key
+from cs2_trading.llm.wrapper import LLMWrapper
+
+MESSAGES = [{"role": "system", "content": "交易员"}, {"role": "user", "content": "请打分"}]
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key({"a": 1, "b": [1, 2]}) == make_key({"b": [1, 2], "a": 1})
+    assert make_key({"a": 1}) != make_key({"a": 2})
+
+
+def test_wrapper_hit_and_miss(tmp_path, fake_llm):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    llm = LLMWrapper("gemini", "gemini-3-flash-preview", cache=cache)
+
+    first = llm.chat(MESSAGES, temperature=0.2)
+    assert llm.chat(MESSAGES, temperature=0.2) == first
+    assert len(fake_llm) == 1 and (cache.hits, cache.misses) == (1, 1)
+
+    # Anything that can change the answer is part of the key
+    llm.chat(MESSAGES, temperature=0.3)
+    llm.chat(MESSAGES, temperature=0.2, response_schema={"type": "object"})
+    llm.chat(MESSAGES[:1] + [{"role": "user", "content": "请打分!"}], temperature=0.2)
+    LLMWrapper("gemini", "gemini-3-pro-preview", cache=cache).chat(MESSAGES, temperature=0.2)
+    assert len(fake_llm) == 5 and cache.hits == 1
+
+
+def test_read_only_cache(tmp_path, fake_llm):
+    path = str(tmp_path / "cache.sqlite")
+    writer = ResponseCache(path)
+    LLMWrapper("gemini", "gemini-3-flash-preview", cache=writer).chat(MESSAGES)
+    writer.close()
+
+    frozen = ResponseCache(path, read_only=True)
+    llm = LLMWrapper("gemini", "gemini-3-flash-preview", cache=frozen)
+    llm.chat(MESSAGES)
+    llm.chat([{"role": "user", "content": "new"}])
+    llm.chat([{"role": "user", "content": "new"}])
+    assert len(fake_llm) == 3 and frozen.stats()["entries"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=10)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    cache.get("a")
+    cache.put("c", "12345")
+    assert cache.get("b") is None and cache.get("a") == "12345" and cache.get("c") == "12345"
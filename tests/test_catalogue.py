@@ -0,0 +1,26 @@
+from cs2_trading.data.catalogue import GoodsCatalogue, normalize_name, variant_tokens
+
+
+def test_normalize_name():
+    assert normalize_name("印花 ｜ S1mple") == normalize_name("印花 | s1mple")
+
+
+def test_fuzzy_lookup_never_crosses_variants(tmp_path):
+    catalogue = GoodsCatalogue(str(tmp_path / "goods.sqlite"))
+    catalogue.add(1, name_zh="印花 | s1mple（金色） | 2025年奥斯汀锦标赛")
+    assert variant_tokens(normalize_name("印花 | s1mple（全息） | 2025年奥斯汀锦标赛")) == {"全息"}
+    # One character apart (ratio ~0.92), but a different good
+    assert catalogue.lookup("印花 | s1mple（全息） | 2025年奥斯汀锦标赛") is None
+    assert catalogue.lookup("印花 | s1mple | 2025年奥斯汀锦标赛") is None
+    # A typo within the same variant still resolves locally
+    assert catalogue.lookup("印花 | s1mpIe（金色） | 2025年奥斯汀锦标赛") == 1
+
+
+def test_stattrak_and_wear_are_variants(tmp_path):
+    catalogue = GoodsCatalogue(str(tmp_path / "goods.sqlite"))
+    catalogue.add(2, name_en="AK-47 | Redline (Field-Tested)")
+    catalogue.add(3, name_en="StatTrak™ AK-47 | Redline (Field-Tested)")
+    assert catalogue.lookup("AK-47 | Redline (Well-Worn)") is None
+    assert catalogue.lookup("StatTrak™ AK-47 | Redline (Field-Tested)") == 3
+    assert catalogue.lookup("StatTrak AK-47 | Redline (Field-Tested)") == 3
+    assert catalogue.lookup("AK47 | Redline (Field-Tested)") == 2
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from cs2_trading.utils.dag import StageError, StageGraph
+
+
+def recorder():
+    order, lock = [], threading.Lock()
+
+    def stage(name, value=None, sleep=0.0):
+        def fn(inputs):
+            time.sleep(sleep)
+            with lock:
+                order.append(name)
+            return value if value is not None else {**inputs, name: True}
+        return fn
+    return order, stage
+
+
+def test_dependencies_run_first_and_branches_overlap():
+    order, stage = recorder()
+    graph = StageGraph(max_workers=4)
+    graph.add("news", stage("news"))
+    graph.add("a", stage("a", sleep=0.2), ["news"])
+    graph.add("b", stage("b", sleep=0.2), ["news"])
+    graph.add("join", stage("join"), ["a", "b"])
+
+    started = time.perf_counter()
+    results = graph.run()
+    assert time.perf_counter() - started < 0.35  # a and b overlapped
+    assert order[0] == "news" and order[-1] == "join"
+    assert set(results["join"].output) == {"a", "b", "join"}
+
+
+def test_failure_stops_dependents_and_keeps_finished_results():
+    order, stage = recorder()
+
+    def boom(inputs):
+        raise ValueError("boom")
+
+    graph = StageGraph()
+    graph.add("news", stage("news"))
+    graph.add("bad", boom, ["news"])
+    graph.add("slow", stage("slow", sleep=0.1), ["news"])
+    graph.add("after", stage("after"), ["bad"])
+
+    with pytest.raises(StageError) as info:
+        graph.run()
+    err = info.value
+    assert err.stage == "bad" and isinstance(err.cause, ValueError)
+    assert "after" not in order
+    # A stage already running when the failure happened is allowed to finish
+    assert err.results["slow"].error is None and err.results["bad"].error == "boom"
+
+
+def test_completed_stages_are_restored_not_rerun():
+    order, stage = recorder()
+    restored = []
+    graph = StageGraph()
+    graph.add("news", stage("news"))
+    graph.add("sell", stage("sell"), ["news"], restore=lambda inputs, output: restored.append((inputs, output)))
+    graph.add("restock", stage("restock"), ["sell"])
+    seen = []
+
+    results = graph.run(completed={"news": {"n": 1}, "sell": {"s": 1}}, on_complete=lambda r: seen.append(r.name))
+    assert order == ["restock"]
+    assert restored == [({"news": {"n": 1}}, {"s": 1})]
+    assert results["news"].restored and results["sell"].restored
+    assert seen == ["restock"]
+
+
+def test_graph_validation():
+    graph = StageGraph()
+    graph.add("a", lambda inputs: 1)
+    with pytest.raises(ValueError):
+        graph.add("a", lambda inputs: 2)
+    with pytest.raises(ValueError):
+        graph.add("b", lambda inputs: 2, ["missing"])
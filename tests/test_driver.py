@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from cs2_trading.backtest.driver import BacktestDriver
+from cs2_trading.data.api import InfoAPI
+from cs2_trading.utils.dag import StageError
+
+RES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cs2_trading", "res")
+
+
+class FakeNews:
+    def get_market_news(self, target_object=None, date=None):
+        return [f"{date}: Budapest Major news about s1mple and donk"]
+
+
+def make_driver(tmp_path, fake_server):
+    api = InfoAPI(api_token="test", base_url=fake_server.base_url)
+    return BacktestDriver(str(tmp_path / "run"), FakeNews(), api, "2025-11-12", "2025-11-20",
+                          seed_inventory=os.path.join(RES, "budapest_backtest_inventory.json"),
+                          schedule={"2025-11-14": {"max_buy_daily": 3}},
+                          llm_model="gemini-3-flash-preview", target_quantity=12, max_buy_daily=2)
+
+
+def test_driver_smoke_run(tmp_path, fake_server, fake_llm):
+    driver = make_driver(tmp_path, fake_server)
+    try:
+        assert driver.run() == "2025-11-20"
+    finally:
+        driver.close()
+    assert driver.strategy.max_buy_daily == 3
+    assert len(os.listdir(tmp_path / "run" / "stages")) == 9
+
+    metrics = driver.strategy.metrics
+    assert metrics.days == 9
+    ledger = driver.strategy.ledger
+    fills = ledger.fills(run=driver.strategy.run_id)
+    assert not fills.duplicated(["lot", "side"]).any()
+    assert ledger.realized_pnl(run=driver.strategy.run_id) == pytest.approx(metrics.realized_pnl)
+
+    # Running the finished range again does nothing
+    again = make_driver(tmp_path, fake_server)
+    try:
+        assert again.strategy.run_id == driver.strategy.run_id
+        assert again.run() == "2025-11-20"
+    finally:
+        again.close()
+
+
+def test_failed_stage_resumes(tmp_path, fake_server, fake_llm):
+    driver = make_driver(tmp_path, fake_server)
+    sell = driver.strategy._stage_sell
+    failing = {"on": True}
+
+    def flaky_sell(date, inputs):
+        if date.day == 19 and failing["on"]:
+            raise RuntimeError("sell exploded")
+        return sell(date, inputs)
+
+    driver.strategy._stage_sell = flaky_sell
+    journal = driver.inventory.journal
+    with pytest.raises(StageError):
+        driver.run()
+    assert driver.last_date == "2025-11-18"
+    # The old journal's file was closed before the inventory was reopened
+    assert journal._file is None and driver.inventory.journal is not journal
+
+    failing["on"] = False
+    try:
+        assert driver.run() == "2025-11-20"
+    finally:
+        driver.close()
+    fills = driver.strategy.ledger.fills()
+    assert not fills.duplicated(["lot", "side"]).any()
+    assert driver.strategy.ledger.realized_pnl() == pytest.approx(driver.strategy.metrics.realized_pnl)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from cs2_trading.backtest.engine import enforce_lockup, hysteresis_positions, run_vectorized
+
+
+def test_lockup_defers_sales():
+    # Bought on day 0, asked to sell on day 2; with T+3 the sale waits until day 3
+    target = np.array([[[1.0, 1.0, 0.0, 0.0, 0.0]]])
+    held, blocked = enforce_lockup(target, lockup_days=3)
+    assert held[0, 0].tolist() == [1.0, 1.0, 1.0, 0.0, 0.0]
+    assert blocked.tolist() == [1.0]
+    free, none_blocked = enforce_lockup(target, lockup_days=0)
+    assert free[0, 0].tolist() == target[0, 0].tolist() and none_blocked.tolist() == [0.0]
+
+
+def test_lockup_only_holds_recent_units():
+    # 1 unit from day 0, another from day 3; on day 4 only the recent one is locked
+    target = np.array([[[1.0, 1.0, 1.0, 2.0, 0.0, 0.0]]])
+    held, blocked = enforce_lockup(target, lockup_days=3)
+    assert held[0, 0].tolist() == [1.0, 1.0, 1.0, 2.0, 1.0, 1.0]
+    assert blocked.tolist() == [2.0]
+
+
+def test_fees_and_equity():
+    prices = np.array([[100.0, 110.0, 120.0]])
+    positions = np.array([[1.0, 1.0, 0.0]])
+    res = run_vectorized(prices, positions, fee=0.025, buy_fee=0.01, lockup_days=0, initial_capital=1000.0)
+    assert res.fees[0].tolist() == pytest.approx([1.0, 0.0, 3.0])
+    # 1000 - 100 - 1 (buy fee) + 120 - 3 (sale fee)
+    assert res.equity[0].tolist() == pytest.approx([999.0, 1009.0, 1016.0])
+    assert res.total_return[0] == pytest.approx(0.016)
+    assert res.turnover[0, 0] == pytest.approx(0.1)
+
+
+def test_default_capital_is_peak_outlay_and_nan_prices():
+    prices = np.array([[np.nan, 50.0, np.nan, 60.0]])
+    positions = np.array([[1.0, 1.0, 1.0, 1.0]])
+    res = run_vectorized(prices, positions, lockup_days=0)
+    # Nothing can be held before the first price; gaps are forward-filled
+    assert res.holdings[0, 0].tolist() == [0.0, 1.0, 1.0, 1.0]
+    assert res.capital.tolist() == [50.0]
+    assert res.equity[0].tolist() == pytest.approx([50.0, 50.0, 50.0, 60.0])
+
+
+def test_many_strategies_in_one_pass():
+    scores = np.array([[40.0, 80.0, 70.0, 50.0, 30.0]])
+    positions = hysteresis_positions(scores, enter=[75, 90], exit=[60, 60])
+    assert positions.shape == (2, 1, 5)
+    assert positions[0, 0].tolist() == [0.0, 1.0, 1.0, 0.0, 0.0]
+    assert not positions[1].any()
+    res = run_vectorized(np.full((1, 5), 10.0), positions, lockup_days=0)
+    assert res.summary(["a", "b"]).index.tolist() == ["a", "b"]
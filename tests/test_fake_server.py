@@ -0,0 +1,24 @@
+from cs2_trading.data.api import InfoAPI
+from cs2_trading.data.fake_server import FakeCSQAQServer, FakeServerConfig, Fixtures, record_fixtures
+
+
+def test_record_then_replay(fake_server, tmp_path):
+    live = InfoAPI(api_token="test", base_url=fake_server.base_url)
+    recorded = live.get_good_info(4242)["data"]["goods_info"]
+    path = str(tmp_path / "fixtures.json")
+    record_fixtures(live, [4242], ["s1mple"], path)
+    assert Fixtures.load(path).goods[4242] == recorded
+
+    with FakeCSQAQServer(FakeServerConfig(fixtures_path=path)) as replay:
+        api = InfoAPI(api_token="test", base_url=replay.base_url)
+        assert api.get_good_info(4242)["data"]["goods_info"] == recorded
+        # Names without a recorded suggest answer are matched against the recorded goods
+        assert api.get_good_id(recorded["name"]) == [4242]
+        assert api.get_good_id(recorded["name"].split(" | ")[1]) == [4242]
+        assert api.get_good_id("s1mple") == live.get_good_id("s1mple")
+
+
+def test_load_unwraps_old_fixtures(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text('{"goods": {"7": {"goods_info": {"id": 7, "name": "x"}}}}', encoding="utf-8")
+    assert Fixtures.load(str(path)).goods[7] == {"id": 7, "name": "x"}
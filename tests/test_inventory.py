@@ -0,0 +1,86 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from cs2_trading.data.api import InfoAPI
+from cs2_trading.data.inventory import BINARY_MAGIC, PRICE_TYPECODE, SCORE_TYPECODE, Inventory
+
+RES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cs2_trading", "res")
+
+
+def test_shipped_inventory_ids_are_ints():
+    inv = Inventory.load(os.path.join(RES, "budapest_backtest_inventory.json"))
+    assert len(inv) > 0
+    assert all(type(item.id) is int for item in inv.items)
+
+
+def test_shipped_inventory_prices(fake_server):
+    inv = Inventory.load(os.path.join(RES, "budapest_backtest_inventory.json"))
+    api = InfoAPI(api_token="test", base_url=fake_server.base_url)
+    ids = [item.id for item in inv.items]
+    date = np.datetime64("today", "D").astype(str)
+
+    fetched = api.prefetch(ids, date)
+    assert set(fetched) == set(ids) and all(fetched.values())
+    prices = api.get_prices(ids, [date])
+    assert not np.isnan(prices).any()
+    # String ids (older callers, raw JSON) reach the same history
+    assert api.get_historical_price(str(ids[0]), date) == prices[0, 0]
+
+
+def _sample_inventory():
+    inv = Inventory()
+    a = inv.add_item(1, "印花 | s1mple（全息）", 1739.0, datetime(2025, 11, 11))
+    b = inv.add_item("420", "100 Thieves", 12.5, datetime(2025, 11, 12))
+    for price, score in ((0.1 + 0.2, 92), (1234.5678901234567, -5), (1e-9, 100)):
+        inv.record_price(a, price)
+        inv.record_score(a, score)
+    inv.record_price(b, 13.25)
+    # b has one price and no scores; a third lot has no history at all
+    inv.add_item(3, "Empty", 1.0, datetime(2025, 11, 13))
+    return inv
+
+
+def test_binary_round_trip(tmp_path):
+    inv = _sample_inventory()
+    path = str(tmp_path / "x.bin")
+    inv.save(path)
+    with open(path, "rb") as f:
+        assert f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+    loaded = Inventory.load(path)
+    assert [i.to_dict() for i in loaded.items] == [i.to_dict() for i in inv.items]
+    a, b, empty = loaded.items
+    assert [i.lot_id for i in loaded.items] == [i.lot_id for i in inv.items]
+    assert all(type(i.id) is int for i in loaded.items) and b.id == 420
+    # float64 prices survive bit for bit, scores stay int8
+    assert list(a.daily_price) == [0.1 + 0.2, 1234.5678901234567, 1e-9]
+    assert a.daily_price.typecode == PRICE_TYPECODE and a.daily_score.typecode == SCORE_TYPECODE
+    assert list(a.daily_score) == [92, -5, 100]
+    assert list(b.daily_price) == [13.25] and len(b.daily_score) == 0
+    assert len(empty.daily_price) == 0 and len(empty.daily_score) == 0
+
+
+def test_binary_without_magic_is_rejected(tmp_path):
+    path = tmp_path / "x.bin"
+    path.write_bytes(b"[]" + bytes(16))
+    with pytest.raises(ValueError):
+        Inventory.load(str(path))
+
+
+def test_json_stays_plain_lists(tmp_path):
+    inv = _sample_inventory()
+    path = str(tmp_path / "x.json")
+    inv.save(path)
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    assert raw[0]["daily_price"] == [0.1 + 0.2, 1234.5678901234567, 1e-9]
+    assert raw[0]["daily_score"] == [92, -5, 100]
+    assert raw[2]["daily_price"] == [] and raw[1]["id"] == 420
+
+    loaded = Inventory.load(path)
+    assert [i.to_dict() for i in loaded.items] == [i.to_dict() for i in inv.items]
+    assert loaded.items[0].daily_price.typecode == PRICE_TYPECODE
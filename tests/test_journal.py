@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from cs2_trading.data.inventory import Inventory
+from cs2_trading.data.journal import InventoryJournal
+
+
+def _day(inventory, n):
+    """One trading day's worth of events: a buy, a price for every lot, the day marker."""
+    inventory.add_item(100 + n, f"Item{n}", 10.0 * n, datetime(2025, 11, n))
+    for item in inventory.items:
+        inventory.record_price(item, 10.0 * n + 1)
+    inventory.mark("last_date", f"2025-11-{n:02d}")
+
+
+def test_replay_restores_committed_days(tmp_path):
+    base = str(tmp_path / "inv")
+    inv = Inventory.open_journaled(base)
+    for n in (1, 2):
+        _day(inv, n)
+        inv.save(base + ".json")
+    inv.journal.close()
+
+    again = Inventory.open_journaled(base)
+    assert again.meta["last_date"] == "2025-11-02"
+    assert [item.id for item in again.items] == [101, 102]
+    assert list(again.items[0].daily_price) == [11.0, 21.0]
+
+
+@pytest.mark.parametrize("keep", ["half_batch", "no_marker", "torn_marker"])
+def test_replay_drops_torn_commit(tmp_path, keep):
+    base = str(tmp_path / "inv")
+    inv = Inventory.open_journaled(base)
+    _day(inv, 1)
+    inv.save(base + ".json")
+    committed = open(base + ".journal.jsonl", encoding="utf-8").read()
+    _day(inv, 2)
+    inv.save(base + ".json")
+    inv.journal.close()
+
+    # Cut the second commit short: a prefix of whole events, all events without the
+    # marker, or the marker itself half written
+    lines = open(base + ".journal.jsonl", encoding="utf-8").read()[len(committed):].splitlines(keepends=True)
+    tail = {"half_batch": "".join(lines[:2]) + lines[2][:5],
+            "no_marker": "".join(lines[:-1]),
+            "torn_marker": "".join(lines[:-1]) + lines[-1][:8]}[keep]
+    with open(base + ".journal.jsonl", "w", encoding="utf-8") as f:
+        f.write(committed + tail)
+
+    recovered = Inventory.open_journaled(base)
+    assert recovered.journal.torn
+    assert recovered.meta["last_date"] == "2025-11-01"
+    assert [item.id for item in recovered.items] == [101]
+    assert list(recovered.items[0].daily_price) == [11.0]
+
+    # The torn batch was compacted away: redoing the day recovers cleanly
+    _day(recovered, 2)
+    recovered.save(base + ".json")
+    recovered.journal.close()
+    final = Inventory.open_journaled(base)
+    assert final.meta["last_date"] == "2025-11-02"
+    assert list(final.items[0].daily_price) == [11.0, 21.0]
+
+
+def test_marker_mismatch_is_corruption(tmp_path):
+    journal = InventoryJournal(str(tmp_path / "inv"))
+    journal.append("meta", key="last_date", value="2025-11-01")
+    journal.commit()
+    journal.close()
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"commit": 9, "events": 3}) + "\n")
+    with pytest.raises(ValueError):
+        InventoryJournal(journal.base_path).read()
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from cs2_trading.data.ledger import TradeLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "ledger.sqlite"))
+    yield ledger
+    ledger.close()
+
+
+def test_round_trip(ledger):
+    ledger.record_many([
+        ("BUY", "L000001", 1, "A", "2025-11-01", 100.0, 0.0, "score 80"),
+        ("BUY", "L000002", 2, "B", "2025-11-01", 50.0, 0.0, "score 70"),
+    ], run="r1")
+    ledger.record("SELL", "L000001", 1, "A", "2025-11-10", 120.0, fee=1.2, reason="take profit", run="r1")
+
+    trips = ledger.round_trips(marks={2: 40.0}).set_index("lot")
+    assert trips.loc["L000001", "realized_pnl"] == pytest.approx(120.0 - 1.2 - 100.0)
+    assert trips.loc["L000001", "holding_days"] == 9
+    assert trips.loc["L000002", "unrealized_pnl"] == pytest.approx(-10.0)
+    assert ledger.realized_pnl() == pytest.approx(18.8)
+    assert ledger.stats() == {"buys": 2, "sells": 1}
+
+    held = ledger.positions(["2025-11-01", "2025-11-09", "2025-11-10"])
+    assert held[1].tolist() == [1.0, 1.0, 0.0]
+    assert held[2].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_replayed_fill_is_a_noop(ledger):
+    fill = ("SELL", "L000001", 1, "A", "2025-11-10", 120.0, 1.2, "take profit")
+    assert ledger.record_many([fill], run="r1") == 1
+    assert ledger.record_many([fill], run="r1") == 0
+    assert len(ledger.fills()) == 1
+
+
+def test_conflicting_fill_raises(ledger):
+    ledger.record("BUY", "L000001", 1, "A", "2025-11-01", 100.0, run="r1")
+    with pytest.raises(sqlite3.IntegrityError):
+        ledger.record_many([
+            ("BUY", "L000002", 2, "B", "2025-11-01", 50.0, 0.0, None),
+            ("BUY", "L000001", 1, "A", "2025-11-01", 90.0, 0.0, None),
+        ], run="r1")
+    # The whole batch was rolled back
+    assert ledger.fills()["lot"].tolist() == ["L000001"]
+
+
+def test_runs_sharing_a_ledger(ledger):
+    # Lot ids restart in every run; the same (lot, side, day) must not collide
+    for run, price in (("r1", 100.0), ("r2", 80.0)):
+        ledger.record("BUY", "L000001", 1, "A", "2025-11-01", price, run=run)
+        ledger.record("SELL", "L000001", 1, "A", "2025-11-10", 110.0, run=run)
+    assert ledger.runs() == ["r1", "r2"]
+    assert ledger.realized_pnl(run="r1") == pytest.approx(10.0)
+    assert ledger.realized_pnl(run="r2") == pytest.approx(30.0)
+    assert ledger.realized_pnl() == pytest.approx(40.0)
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from cs2_trading.llm.metrics import estimate_cost
+from cs2_trading.llm.wrapper import gemini_usage, openai_usage
+
+
+def test_openai_reasoning_tokens_billed_once():
+    # completion_tokens (300) already contains the 200 reasoning tokens
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=300,
+                            completion_tokens_details=SimpleNamespace(reasoning_tokens=200))
+    tokens = openai_usage(usage)
+    assert tokens == {"prompt_tokens": 1000, "completion_tokens": 100, "thinking_tokens": 200}
+    assert estimate_cost("gpt-3.5-turbo", **tokens) == pytest.approx((1000 * 0.50 + 300 * 1.50) / 1e6)
+
+
+def test_openai_without_details():
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, completion_tokens_details=None)
+    assert openai_usage(usage) == {"prompt_tokens": 10, "completion_tokens": 5, "thinking_tokens": 0}
+    assert openai_usage(None) == {}
+
+
+def test_gemini_thoughts_billed_on_top():
+    # candidates and thoughts are reported separately; both bill as output
+    meta = SimpleNamespace(prompt_token_count=1000, candidates_token_count=100, thoughts_token_count=200)
+    tokens = gemini_usage(meta)
+    assert tokens == {"prompt_tokens": 1000, "completion_tokens": 100, "thinking_tokens": 200}
+    assert estimate_cost("gemini-3-flash-preview", **tokens) == pytest.approx((1000 * 0.50 + 300 * 3.00) / 1e6)
+
+
+def test_unknown_model_is_free():
+    assert estimate_cost("no-such-model", 1000, 1000, 1000) == 0.0
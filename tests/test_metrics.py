@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+from cs2_trading.backtest.metrics import StreamingMetrics, read_rows
+
+
+def _run(sink=None):
+    m = StreamingMetrics(initial_capital=1000.0, fee=0.025)
+    m.set_sink(sink)
+    m.open_positions(200.0)                                          # seed lots: cash 800, nav 1000
+    m.update("2025-11-01", 250.0, 300.0, buys=[100.0])               # cash 700, nav 950
+    m.update("2025-11-02", 180.0, 150.0, sells=[(160.0, 150.0)])     # +156 net of 4 fee: cash 856, nav 1036
+    m.update("2025-11-03", 0.0, 0.0, sells=[(100.0, 150.0)])         # +97.5 net of 2.5 fee: cash 953.5
+    return m
+
+
+def test_known_path():
+    m = _run()
+    assert m.cash == pytest.approx(953.5)
+    assert m.nav == pytest.approx(953.5)
+    assert m.total_pnl == pytest.approx(-46.5)
+    assert m.realized_pnl == pytest.approx((156.0 - 150.0) + (97.5 - 150.0))
+    assert m.fees == pytest.approx(6.5)
+    assert (m.buys, m.sells, m.days) == (1, 2, 3)
+    assert m.win_rate == pytest.approx(0.5)
+    assert m.peak_nav == pytest.approx(1036.0)
+    assert m.max_drawdown == pytest.approx(953.5 / 1036.0 - 1.0)
+
+    returns = np.array([950.0 / 1000.0 - 1.0, 1036.0 / 950.0 - 1.0, 953.5 / 1036.0 - 1.0])
+    assert m.mean_return == pytest.approx(returns.mean())
+    assert m.volatility == pytest.approx(np.std(returns, ddof=1))
+    expected = (returns.mean() - 0.02 / 365) / np.std(returns, ddof=1) * math.sqrt(365)
+    assert m.sharpe(0.02) == pytest.approx(expected)
+    assert m.summary()["sharpe"] == pytest.approx(returns.mean() / np.std(returns, ddof=1) * math.sqrt(365))
+
+
+def test_closed_date_is_a_noop(tmp_path):
+    sink = str(tmp_path / "metrics.jsonl")
+    m = _run(sink)
+    before = m.to_dict()
+    row = m.update("2025-11-03", 999.0, 999.0, buys=[5.0], sells=[(1.0, 2.0)])
+    m.update("2025-11-02", 999.0, 999.0)
+    assert m.to_dict() == before
+    assert row["nav"] == pytest.approx(953.5)
+    assert [r["date"] for r in read_rows(sink)] == ["2025-11-01", "2025-11-02", "2025-11-03"]
+
+
+def test_state_round_trip():
+    m = _run()
+    restored = StreamingMetrics.from_dict({**m.to_dict(), "unknown_field": 1})
+    assert restored.to_dict() == m.to_dict()
+    # The restored accumulator carries on exactly like the original
+    m.update("2025-11-04", 0.0, 0.0)
+    restored.update("2025-11-04", 0.0, 0.0)
+    assert restored.to_dict() == m.to_dict()
+    assert restored.sharpe() == m.sharpe()
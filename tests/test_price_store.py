@@ -0,0 +1,33 @@
+import datetime
+import time
+
+import pytest
+
+from cs2_trading.data.price_store import PriceSeries, from_epoch_days
+
+
+@pytest.fixture
+def berlin(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("needs time.tzset")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_from_chart_dst_inside_series(berlin):
+    # Winter -> summer -> winter: both endpoints share one offset, the middle does not
+    days = [datetime.date(2025, 1, 1) + datetime.timedelta(days=k) for k in range(365)]
+    stamps = [datetime.datetime.combine(d, datetime.time()).timestamp() * 1000 for d in days]
+    series = PriceSeries.from_chart(stamps, [float(k) for k in range(365)])
+    assert from_epoch_days(series.days) == [d.isoformat() for d in days]
+    assert series.asof(int(series.days[180])) == 180.0
+
+
+def test_from_chart_keeps_last_point_of_day():
+    noon = datetime.datetime(2025, 6, 1, 12).timestamp() * 1000
+    series = PriceSeries.from_chart([noon, noon + 3600_000, noon + 86400_000], [1.0, 2.0, 3.0])
+    assert from_epoch_days(series.days) == ["2025-06-01", "2025-06-02"]
+    assert series.prices.tolist() == [2.0, 3.0]
@@ -0,0 +1,49 @@
+import pytest
+
+from cs2_trading.utils import ratelimit
+from cs2_trading.utils.ratelimit import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_spacing(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=60, burst=2)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    # Burst spent: each further request waits one more second (60 rpm)
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock[0] += 10
+    assert limiter.reserve() == 0.0
+
+
+def test_tokens_per_minute(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=600, tpm=6000, burst=10)
+    assert limiter.reserve(tokens=6000) == 0.0
+    assert limiter.reserve(tokens=1000) == pytest.approx(10.0)
+
+
+def test_aimd(clock):
+    limiter = AdaptiveRateLimiter("test", rpm=60, burst=1, min_fraction=0.2, recovery_step=0.1)
+    limiter.on_throttle(backoff=5.0)
+    assert limiter.factor == 0.5
+    # Everyone is paused for the back-off, then refills at half the rate
+    assert limiter.reserve() == pytest.approx(5.0)
+    clock[0] += 5
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(2.0)
+
+    for _ in range(3):
+        limiter.on_throttle()
+    assert limiter.factor == 0.2  # multiplicative decrease stops at min_fraction
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.factor == pytest.approx(0.5)  # additive increase
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.factor == 1.0
+    assert limiter.stats()["throttled"] == 4
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from cs2_trading.llm.wrapper import LLMWrapper
+
+# The real method, captured before `fake_llm` swaps in the scripted backend
+REAL_COMPLETE = LLMWrapper._complete
+MODEL = "gemini-3-flash-preview"
+QUESTION = [{"role": "system", "content": "你是一个测试智能体"}, {"role": "user", "content": "请分析一下市场"}]
+
+
+def test_record_then_replay(fake_llm, monkeypatch, tmp_path):
+    log = tmp_path / "exchanges.jsonl"
+    # Record against the scripted backend: a normal provider wrapper, minus the SDK client
+    monkeypatch.delenv("LLM_REPLAY_PATH")
+    monkeypatch.setattr(LLMWrapper, "_setup_client", lambda self: None)
+    recorder = LLMWrapper("gemini", MODEL, record_path=str(log))
+    answer = recorder.chat(QUESTION)
+    assert answer == "analysis"
+    assert len(fake_llm) == 1
+
+    records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 1
+    assert records[0]["provider"] == "gemini" and records[0]["model"] == MODEL
+    assert records[0]["messages"] == QUESTION and records[0]["response"] == answer
+
+    # Replay: the real _complete answers from the log, the backend is never called
+    monkeypatch.setattr(LLMWrapper, "_complete", REAL_COMPLETE)
+    replayer = LLMWrapper("replay", MODEL, replay_path=str(log))
+    assert replayer.client is None and replayer.recorder is None
+    assert replayer.chat(QUESTION) == answer
+    assert replayer.chat(QUESTION) == answer
+    assert len(fake_llm) == 1
+    assert replayer.replay.hits == 2
+
+    # A conversation that was never recorded fails loudly instead of reaching a provider
+    unknown = [{"role": "user", "content": "没有录过的问题"}]
+    with pytest.raises(LookupError, match="No recorded exchange"):
+        replayer._complete(unknown, 0.7)
+    assert replayer.chat(unknown).startswith("[LLM Error]: No recorded exchange")
+    assert len(fake_llm) == 1
+    # Replaying never appends to the log
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 1
@@ -0,0 +1,25 @@
+import os
+from datetime import datetime
+
+from cs2_trading.data.api import InfoAPI
+from cs2_trading.data.inventory import Inventory
+from cs2_trading.strategy import DailyStrategy
+
+RES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cs2_trading", "res")
+
+
+class NoNews:
+    def get_market_news(self, target_object=None, date=None):
+        return []
+
+
+def test_stage_prices_on_budapest_seed(fake_server, fake_llm):
+    inv = Inventory.load(os.path.join(RES, "budapest_backtest_inventory.json"))
+    # A caller that still hands over a string id must not break the stage
+    inv.add_item("420", "100 Thieves", 1739.0, datetime(2025, 11, 11))
+    api = InfoAPI(api_token="test", base_url=fake_server.base_url)
+    strategy = DailyStrategy(inv, NoNews(), api, save_path="inventory.json")
+
+    prices = strategy._stage_prices(datetime.now(), {})
+    assert set(prices) == {str(item.id) for item in inv.items}
+    assert all(p is not None for p in prices.values())